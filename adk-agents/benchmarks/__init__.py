@@ -0,0 +1 @@
+# Benchmarks for the agent pipelines (run as scripts from the adk-agents directory)
@@ -0,0 +1,286 @@
+"""End-to-end benchmark of the three pipelines against a stubbed model.
+
+Every request runs the full root agent through an in-process ADK runner.
+Reports p50/p95/p99 latency, throughput at increasing concurrency, peak RSS,
+model calls, tokens and loop iterations per request, and p95 per agent and tool.
+
+Usage (from the adk-agents directory):
+    python benchmarks/e2e.py --requests 20 --output results.json
+    python benchmarks/e2e.py --baseline results.json
+    python benchmarks/e2e.py --replay ~/.cache/sahayak/cassettes --timing-scale 1.0
+
+With --replay, model calls are served from sessions recorded with
+CASSETTE_MODE=record (<dir>/<pipeline>/*.jsonl.gz) instead of the stubs,
+cycling through the recorded sessions request by request.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import pathlib
+import resource
+import statistics
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Spans feed the per-stage breakdown; must be set before the agents are imported
+os.environ.setdefault("METRICS_ENABLED", "true")
+os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "benchmark-project")
+os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "us-central1")
+os.environ.setdefault("GCS_BUCKET_NAME", "")
+# Keep call counts comparable between runs; enable the caches explicitly to measure them warm
+os.environ.setdefault("RESPONSE_STORE_ENABLED", "false")
+os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "false")
+# Measure the pipelines, not the production quota
+for variable in ("TEXT_RATE_LIMIT_RPM", "IMAGE_RATE_LIMIT_RPM", "TEXT_RATE_LIMIT_BURST", "IMAGE_RATE_LIMIT_BURST"):
+    os.environ.setdefault(variable, "1000000")
+
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from benchmarks.stubs import install_stubs, request_stats  # noqa: E402
+from shared.cassettes import REPLAY, install_cassette_llms, use_cassette  # noqa: E402
+from shared.instrumentation import ITERATION_KEYS, metrics  # noqa: E402
+from shared.usage import ledger  # noqa: E402
+
+PIPELINES = {
+    "image_scoring": (
+        "image_scoring.agent",
+        [
+            "Monsoon rains bring relief to farmers across Maharashtra after a long dry spell.",
+            "City school opens a new science lab built by volunteers over the summer.",
+        ],
+    ),
+    "hyper_local_content": (
+        "hyper_local_content.agent",
+        [
+            "Create a story in Marathi about farmers in Maharashtra for grade 3 students",
+            "Write a Hindi lesson about water conservation in Rajasthan villages",
+        ],
+    ),
+    "differentiated_materials": (
+        "differentiated_materials.agent",
+        [
+            "Create worksheets for grades 3, 5 and 7 from this textbook page about photosynthesis",
+            "Make differentiated worksheets for grades 4 and 8 on fractions",
+        ],
+    ),
+}
+
+QUANTILES = (50, 95, 99)
+
+
+def percentile(values, quantile):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(quantile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return round(usage / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def run_request(runner, message, cassette=None, timing_scale=0.0):
+    """Run one request in a new session; return (seconds, call and token counts, loop iterations)."""
+    stats = {}
+    request_stats.set(stats)
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id="benchmark")
+    content = types.Content(role="user", parts=[types.Part(text=message)])
+    replay = use_cassette(cassette, REPLAY, timing_scale) if cassette else contextlib.nullcontext()
+
+    start = time.perf_counter()
+    with replay:
+        async for _ in runner.run_async(user_id="benchmark", session_id=session.id, new_message=content):
+            pass
+    elapsed = time.perf_counter() - start
+
+    session = await runner.session_service.get_session(
+        app_name=runner.app_name, user_id="benchmark", session_id=session.id
+    )
+    iterations = next((session.state[key] for key in ITERATION_KEYS if key in session.state), 0)
+    totals = ledger.session_summary(session.id)["totals"]
+    stats["tokens"] = totals["prompt_tokens"] + totals["output_tokens"]
+    return elapsed, stats, iterations
+
+
+async def run_batch(runner, messages, concurrency, cassettes=None, timing_scale=0.0):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(index, message):
+        cassette = cassettes[index % len(cassettes)] if cassettes else None
+        async with semaphore:
+            return await run_request(runner, message, cassette, timing_scale)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(limited(index, message) for index, message in enumerate(messages)))
+    return results, time.perf_counter() - start
+
+
+def stage_summary():
+    """p50/p95 wall time (ms) per agent and tool from the instrumentation histograms."""
+    stages = {}
+    for (metric, labels), histogram in metrics.histograms.items():
+        labels = dict(labels)
+        if metric != "wall_time" or labels.get("kind") not in ("agent", "tool"):
+            continue
+        stages[f"{labels['kind']}:{labels['name']}"] = {
+            "count": histogram.count,
+            "p50_ms": round(histogram.percentile(0.5) / 1000, 3),
+            "p95_ms": round(histogram.percentile(0.95) / 1000, 3),
+        }
+    return dict(sorted(stages.items()))
+
+
+def recorded_sessions(replay_dir, name):
+    """Cassettes recorded for one pipeline, oldest first."""
+    directory = pathlib.Path(replay_dir) / name
+    cassettes = sorted(directory.glob("*.jsonl*"), key=lambda path: path.stat().st_mtime)
+    if not cassettes:
+        raise SystemExit(f"No recorded sessions for {name} in {directory}")
+    return [str(path) for path in cassettes]
+
+
+async def benchmark_pipeline(name, requests, concurrency_levels, llm_latency, client_latency,
+                             replay_dir=None, timing_scale=0.0):
+    module_name, prompts = PIPELINES[name]
+    root_agent = importlib.import_module(module_name).root_agent
+    cassettes = None
+    if replay_dir:
+        cassettes = recorded_sessions(replay_dir, name)
+        install_cassette_llms(root_agent)
+    else:
+        install_stubs(root_agent, llm_latency, client_latency)
+    runner = InMemoryRunner(agent=root_agent, app_name=name)
+
+    # Warm-up request so imports and caches do not skew the first sample
+    await run_request(runner, prompts[0], cassettes[0] if cassettes else None)
+    metrics.reset()
+
+    messages = [prompts[index % len(prompts)] for index in range(requests)]
+    results, _ = await run_batch(runner, messages, 1, cassettes, timing_scale)
+    latencies = [elapsed * 1000 for elapsed, _, _ in results]
+    llm_calls = [stats.get("llm", 0) for _, stats, _ in results]
+    client_calls = [stats.get("client", 0) for _, stats, _ in results]
+    tokens = [stats.get("tokens", 0) for _, stats, _ in results]
+    iterations = [loops for _, _, loops in results]
+    stages = stage_summary()
+    tool_errors = sum(
+        value for (metric, labels), value in metrics.counters.items()
+        if metric == "errors" and dict(labels).get("kind") == "tool"
+    )
+
+    throughput = {}
+    for concurrency in concurrency_levels:
+        _, elapsed = await run_batch(runner, messages, concurrency, cassettes, timing_scale)
+        throughput[str(concurrency)] = round(len(messages) / elapsed, 2)
+
+    return {
+        "requests": requests,
+        "latency_ms": {
+            **{f"p{q}": round(percentile(latencies, q), 2) for q in QUANTILES},
+            "mean": round(statistics.mean(latencies), 2),
+        },
+        "throughput_rps": throughput,
+        "model_calls_per_request": round(statistics.mean(llm_calls) + statistics.mean(client_calls), 2),
+        "llm_calls_per_request": round(statistics.mean(llm_calls), 2),
+        "client_calls_per_request": round(statistics.mean(client_calls), 2),
+        "tokens_per_request": round(statistics.mean(tokens), 1),
+        "loop_iterations_per_request": round(statistics.mean(iterations), 2),
+        "tool_errors_per_request": round(tool_errors / requests, 2),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stages,
+    }
+
+
+def compare(results, baseline, max_latency_regression):
+    """Return regression messages versus a previous results file."""
+    failures = []
+    for name, result in results.items():
+        previous = baseline.get("pipelines", {}).get(name)
+        if not previous:
+            continue
+        old_p95, new_p95 = previous["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        change = (new_p95 - old_p95) / old_p95 if old_p95 else 0.0
+        print(f"{name}: p95 {old_p95}ms -> {new_p95}ms ({change:+.0%})")
+        if change > max_latency_regression:
+            failures.append(f"{name}: p95 latency up {change:.0%}")
+        for metric in ("model_calls_per_request", "tokens_per_request", "loop_iterations_per_request",
+                       "tool_errors_per_request"):
+            if result[metric] > previous.get(metric, result[metric]):
+                failures.append(f"{name}: {metric} {previous[metric]} -> {result[metric]}")
+        for stage, stats in result["stages"].items():
+            old = previous.get("stages", {}).get(stage)
+            if old and old["count"] and stats["count"] > old["count"]:
+                failures.append(f"{name}: {stage} ran {stats['count']} times (was {old['count']})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pipeline", action="append", choices=sorted(PIPELINES),
+                        help="Pipeline to run (repeatable, default all)")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per measurement")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated latency per agent model call")
+    parser.add_argument("--client-latency-ms", type=float, default=0.0, help="Simulated latency per tool model call")
+    parser.add_argument("--replay", metavar="DIR", help="Serve model calls from sessions recorded under DIR")
+    parser.add_argument("--timing-scale", type=float, default=0.0,
+                        help="With --replay, multiply recorded model latencies (1.0 = original timing)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result")
+    parser.add_argument("--max-latency-regression", type=float, default=0.25,
+                        help="Allowed p95 slowdown versus the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    concurrency_levels = [int(level) for level in args.concurrency.split(",") if level]
+    results = {}
+    for name in args.pipeline or PIPELINES:
+        result = asyncio.run(benchmark_pipeline(
+            name, args.requests, concurrency_levels, args.llm_latency_ms / 1000, args.client_latency_ms / 1000,
+            args.replay, args.timing_scale,
+        ))
+        results[name] = result
+        latency = result["latency_ms"]
+        print(
+            f"{name}: p50 {latency['p50']}ms p95 {latency['p95']}ms p99 {latency['p99']}ms, "
+            f"{result['model_calls_per_request']} model calls/request, "
+            f"{result['tokens_per_request']} tokens/request, "
+            f"{result['loop_iterations_per_request']} loop iterations/request, "
+            f"{result['tool_errors_per_request']} tool errors/request, "
+            f"throughput {result['throughput_rps']} req/s, peak RSS {result['peak_rss_mb']}MB"
+        )
+
+    report = {
+        "python": sys.version.split()[0],
+        "settings": {
+            "requests": args.requests,
+            "concurrency": concurrency_levels,
+            "llm_latency_ms": args.llm_latency_ms,
+            "client_latency_ms": args.client_latency_ms,
+            "replay": args.replay,
+            "timing_scale": args.timing_scale,
+        },
+        "pipelines": results,
+    }
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        failures = compare(results, json.loads(pathlib.Path(args.baseline).read_text()), args.max_latency_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
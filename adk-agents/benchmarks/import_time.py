@@ -0,0 +1,151 @@
+"""Import-time benchmark for the agent packages.
+
+Imports each root agent in a fresh interpreter several times and reports the
+median wall time, the slowest modules from ``python -X importtime`` and
+whether any model or storage client was built at import.
+
+Usage (from the adk-agents directory):
+    python benchmarks/import_time.py --runs 5 --output import_time.json
+    python benchmarks/import_time.py --baseline import_time.json
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+PACKAGES = (
+    "image_scoring.agent",
+    "hyper_local_content.agent",
+    "differentiated_materials.agent",
+)
+
+# Runs in the child interpreter; prints one JSON line after the import
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+from shared import model_clients
+print(json.dumps({{
+    "seconds": elapsed,
+    "clients_created": len(model_clients._clients),
+    "storage_imported": "google.cloud.storage" in sys.modules,
+    "modules_loaded": len(sys.modules),
+}}))
+"""
+
+
+def parse_importtime(stderr, top):
+    """Return the modules with the highest cumulative import time (microseconds)."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append((int(cumulative_us), int(self_us), name.strip()))
+    modules.sort(reverse=True)
+    # Packages imported via their submodules are reported twice; keep the larger entry
+    seen = set()
+    modules = [entry for entry in modules if not (entry[2] in seen or seen.add(entry[2]))]
+    return [
+        {"module": name, "cumulative_ms": cumulative / 1000, "self_ms": own / 1000}
+        for cumulative, own, name in modules[:top]
+    ]
+
+
+def measure(module, runs, top):
+    """Import a module in `runs` fresh interpreters and summarize the results."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    env.setdefault("GOOGLE_CLOUD_PROJECT", "benchmark-project")
+    env.setdefault("GOOGLE_CLOUD_LOCATION", "us-central1")
+
+    timings = []
+    probe = None
+    slowest = []
+    for run in range(runs):
+        command = [sys.executable, "-c", PROBE.format(module=module)]
+        if run == 0:
+            command.insert(1, "-X")
+            command.insert(2, "importtime")
+        result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        if run == 0:
+            # The importtime run is slower, so it only feeds the module breakdown
+            slowest = parse_importtime(result.stderr, top)
+            if runs > 1:
+                continue
+        timings.append(probe["seconds"] * 1000)
+
+    return {
+        "median_ms": round(statistics.median(timings), 1),
+        "min_ms": round(min(timings), 1),
+        "max_ms": round(max(timings), 1),
+        "runs": len(timings),
+        "clients_created": probe["clients_created"],
+        "storage_imported": probe["storage_imported"],
+        "modules_loaded": probe["modules_loaded"],
+        "slowest_modules": slowest,
+    }
+
+
+def compare(results, baseline, max_regression):
+    """Return the packages whose median import time regressed past the limit."""
+    regressions = []
+    for module, result in results.items():
+        previous = baseline.get("packages", {}).get(module)
+        if not previous:
+            continue
+        change = (result["median_ms"] - previous["median_ms"]) / previous["median_ms"]
+        print(f"{module}: {previous['median_ms']}ms -> {result['median_ms']}ms ({change:+.0%})")
+        if change > max_regression:
+            regressions.append(module)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per package")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to report")
+    parser.add_argument("--package", action="append", help="Module to import (repeatable)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed median slowdown versus the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = {}
+    for module in args.package or PACKAGES:
+        result = measure(module, max(args.runs, 1), args.top)
+        results[module] = result
+        print(
+            f"{module}: median {result['median_ms']}ms (min {result['min_ms']}ms), "
+            f"{result['modules_loaded']} modules, clients at import: {result['clients_created']}, "
+            f"google.cloud.storage imported: {result['storage_imported']}"
+        )
+        for entry in result["slowest_modules"][:5]:
+            print(f"    {entry['cumulative_ms']:8.1f}ms  {entry['module']}")
+
+    report = {"python": sys.version.split()[0], "packages": results}
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(pathlib.Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"Import time regressed for: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
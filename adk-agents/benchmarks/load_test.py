@@ -0,0 +1,362 @@
+"""Open-loop load test of the agent pipelines through the in-process ADK runner.
+
+Requests arrive on a schedule that does not wait for earlier requests to
+finish: Poisson arrivals at a target rate, or the timestamps of a recorded
+trace. Each request is drawn from a corpus mixing agents, languages, content
+types and grades. With --max-concurrency the process serves at most that many
+requests at once and the rest wait, which shows up as queueing delay.
+
+Reports latency percentiles, queueing delay, requests in flight and error and
+fallback rates, overall and per time window.
+
+Usage (from the adk-agents directory):
+    python benchmarks/load_test.py --rps 5 --duration 60 --llm-latency-ms 400
+    python benchmarks/load_test.py --rps 2 --duration 120 --model real --max-concurrency 8
+    python benchmarks/load_test.py --trace trace.jsonl --speedup 4 --output load.json
+
+A trace is JSON lines with the arrival offset in seconds and optionally the
+agent and message, e.g. {"t": 0.8, "agent": "hyper_local_content"}; missing
+fields are drawn from the corpus.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import itertools
+import json
+import pathlib
+import random
+import sys
+import time
+from collections import Counter
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+AGENTS = ("image_scoring", "hyper_local_content", "differentiated_materials")
+
+LANGUAGES = {
+    "English": "Maharashtra",
+    "Hindi": "Uttar Pradesh",
+    "Marathi": "Maharashtra",
+    "Tamil": "Tamil Nadu",
+    "Bengali": "West Bengal",
+    "Kannada": "Karnataka",
+}
+CONTENT_TYPES = ("story", "lesson", "poem", "activity")
+TOPICS = ("farmers and the monsoon", "water conservation", "the local market", "festivals", "forests and wildlife")
+SUBJECTS = ("photosynthesis", "fractions", "the water cycle", "Indian freedom struggle", "simple machines")
+GRADE_SETS = ((3, 5), (4, 6, 8), (2, 3, 4), (6, 7, 8), (5, 9))
+HEADLINES = (
+    "Monsoon rains bring relief to farmers across {region}",
+    "Village school in {region} opens a new science lab",
+    "Students in {region} plant a thousand trees",
+)
+
+QUANTILES = (50, 95, 99)
+
+# Tool results that mean the model was skipped or failed and templates answered:
+# hyper_local_content only uses its templates when the circuit is open or the call
+# failed (e.g. rate limited). Worksheets always come from templates
+# (generation_method "enhanced_template"), so only their last-resort path counts.
+FALLBACK_MARKERS = {
+    "generated_by": ("enhanced_template",),
+    "generation_method": ("fallback_template",),
+}
+
+
+def build_corpus():
+    """Every combination of agent, language, content type and grade in the request mix."""
+    corpus = []
+    for (language, region), content_type, topic in itertools.product(LANGUAGES.items(), CONTENT_TYPES, TOPICS):
+        corpus.append({
+            "agent": "hyper_local_content",
+            "language": language,
+            "content_type": content_type,
+            "message": f"Create a {content_type} in {language} about {topic} in {region} for grade 3 students",
+        })
+    for grades, subject in itertools.product(GRADE_SETS, SUBJECTS):
+        corpus.append({
+            "agent": "differentiated_materials",
+            "grades": list(grades),
+            "content_type": "worksheet",
+            "message": f"Create worksheets for grades {', '.join(map(str, grades))} from this textbook page about {subject}",
+        })
+    for headline, region in itertools.product(HEADLINES, sorted(set(LANGUAGES.values()))):
+        corpus.append({
+            "agent": "image_scoring",
+            "content_type": "image",
+            "message": headline.format(region=region),
+        })
+    return corpus
+
+
+def load_corpus(path):
+    """Corpus entries from a JSON lines file: {"agent": ..., "message": ..., other tags}."""
+    with open(path, encoding="utf-8") as corpus_file:
+        return [json.loads(line) for line in corpus_file if line.strip()]
+
+
+def parse_mix(text, agents):
+    """Agent weights from "name=weight,..."; equal weights when empty."""
+    if not text:
+        return {agent: 1.0 for agent in agents}
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name not in AGENTS:
+            raise SystemExit(f"Unknown agent in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def poisson_arrivals(rps, duration, rng):
+    """Arrival offsets of a Poisson process at rps for duration seconds."""
+    offset = rng.expovariate(rps)
+    while offset < duration:
+        yield offset
+        offset += rng.expovariate(rps)
+
+
+def trace_arrivals(path, speedup):
+    """(offset, entry) pairs from a trace file, offsets relative to its first arrival."""
+    entries = load_corpus(path)
+    entries.sort(key=lambda entry: entry["t"])
+    first = entries[0]["t"] if entries else 0.0
+    return [((entry["t"] - first) / speedup, entry) for entry in entries]
+
+
+def build_schedule(args, corpus, rng):
+    """List of (offset, request) in arrival order."""
+    mix = parse_mix(args.mix, sorted({entry["agent"] for entry in corpus}))
+    by_agent = {agent: [entry for entry in corpus if entry["agent"] == agent] for agent in mix}
+    agents = [agent for agent in mix if by_agent[agent]]
+    weights = [mix[agent] for agent in agents]
+
+    def draw(agent=None):
+        agent = agent or rng.choices(agents, weights)[0]
+        return dict(rng.choice(by_agent.get(agent) or [{"agent": agent, "message": "Benchmark request"}]))
+
+    if args.trace:
+        schedule = []
+        for offset, entry in trace_arrivals(args.trace, args.speedup):
+            request = draw(entry.get("agent"))
+            request.update({key: value for key, value in entry.items() if key != "t"})
+            schedule.append((offset, request))
+        return schedule
+    return [(offset, draw()) for offset in poisson_arrivals(args.rps, args.duration, rng)]
+
+
+def percentile(values, quantile):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(quantile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def inspect_events(events):
+    """(tool errors, fallback) for one request from its function responses."""
+    tool_errors = 0
+    fallback = False
+    stack = [call.response for event in events for call in event.get_function_responses()]
+    while stack:
+        payload = stack.pop()
+        if isinstance(payload, dict):
+            if payload.get("status") == "error":
+                tool_errors += 1
+            for key, values in FALLBACK_MARKERS.items():
+                if payload.get(key) in values:
+                    fallback = True
+            stack.extend(payload.values())
+        elif isinstance(payload, list):
+            stack.extend(payload)
+    return tool_errors, fallback
+
+
+class LoadTest:
+    """Fires a schedule of requests at the runners and keeps per-request records."""
+
+    def __init__(self, runners, max_concurrency=0):
+        self.runners = runners
+        self.slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.in_flight = 0
+        self.queued = 0
+        self.records = []
+        self.samples = []
+
+    async def send(self, start, offset, request):
+        from google.genai import types
+
+        runner = self.runners[request["agent"]]
+        record = {
+            "agent": request["agent"],
+            "arrival": offset,
+            "tags": {key: value for key, value in request.items() if key not in ("agent", "message")},
+            "error": None,
+        }
+        self.queued += 1
+        if self.slots is not None:
+            await self.slots.acquire()
+        self.queued -= 1
+        self.in_flight += 1
+        # Includes scheduler lag, so an overloaded event loop shows up here too
+        record["queue_ms"] = (time.perf_counter() - start - offset) * 1000
+        began = time.perf_counter()
+        events = []
+        try:
+            session = await runner.session_service.create_session(app_name=runner.app_name, user_id="load")
+            message = types.Content(role="user", parts=[types.Part(text=request["message"])])
+            async for event in runner.run_async(user_id="load", session_id=session.id, new_message=message):
+                events.append(event)
+            await runner.session_service.delete_session(
+                app_name=runner.app_name, user_id="load", session_id=session.id
+            )
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            self.in_flight -= 1
+            if self.slots is not None:
+                self.slots.release()
+        record["service_ms"] = (time.perf_counter() - began) * 1000
+        record["latency_ms"] = record["queue_ms"] + record["service_ms"]
+        record["finish"] = time.perf_counter() - start
+        record["tool_errors"], record["fallback"] = inspect_events(events)
+        self.records.append(record)
+
+    async def sample(self, start, interval):
+        while True:
+            self.samples.append((time.perf_counter() - start, self.in_flight, self.queued))
+            await asyncio.sleep(interval)
+
+    async def run(self, schedule, sample_interval=0.1):
+        start = time.perf_counter()
+        sampler = asyncio.create_task(self.sample(start, sample_interval))
+        tasks = []
+        for offset, request in schedule:
+            delay = offset - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self.send(start, offset, request)))
+        await asyncio.gather(*tasks)
+        sampler.cancel()
+        return time.perf_counter() - start
+
+
+def summarize(records, samples):
+    """Latency, queueing, concurrency and error/fallback figures for a group of requests."""
+    completed = [record for record in records if not record["error"]]
+    latencies = [record["latency_ms"] for record in completed]
+    queue = [record["queue_ms"] for record in records]
+    in_flight = [running for _, running, _ in samples]
+    return {
+        "requests": len(records),
+        "errors": len(records) - len(completed),
+        "error_rate": round((len(records) - len(completed)) / len(records), 3) if records else 0.0,
+        "fallback_rate": round(sum(record["fallback"] for record in records) / len(records), 3) if records else 0.0,
+        "tool_errors": sum(record["tool_errors"] for record in records),
+        "latency_ms": {f"p{q}": round(percentile(latencies, q), 1) for q in QUANTILES},
+        "queue_ms": {"mean": round(sum(queue) / len(queue), 1) if queue else 0.0,
+                     "p95": round(percentile(queue, 95), 1)},
+        "in_flight": {"mean": round(sum(in_flight) / len(in_flight), 2) if in_flight else 0.0,
+                      "max": max(in_flight, default=0)},
+        "max_queued": max((queued for _, _, queued in samples), default=0),
+    }
+
+
+def windows(records, samples, window, elapsed):
+    """summarize() per window of `window` seconds, requests grouped by arrival time."""
+    series = []
+    for index in range(int(elapsed // window) + 1):
+        low, high = index * window, (index + 1) * window
+        group = [record for record in records if low <= record["arrival"] < high]
+        group_samples = [sample for sample in samples if low <= sample[0] < high]
+        if group or group_samples:
+            series.append({"start_s": low, **summarize(group, group_samples)})
+    return series
+
+
+def prepare_runners(agents, args):
+    from google.adk.runners import InMemoryRunner
+
+    runners = {}
+    for agent in agents:
+        root_agent = importlib.import_module(f"{agent}.agent").root_agent
+        if args.model == "stub":
+            from benchmarks.stubs import install_stubs
+
+            install_stubs(root_agent, args.llm_latency_ms / 1000, args.client_latency_ms / 1000)
+        runners[agent] = InMemoryRunner(agent=root_agent, app_name=agent)
+    return runners
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rps", type=float, default=2.0, help="Mean Poisson arrival rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of Poisson arrivals")
+    parser.add_argument("--trace", help="Replay arrivals from a JSON lines trace instead of Poisson")
+    parser.add_argument("--speedup", type=float, default=1.0, help="Compress trace time by this factor")
+    parser.add_argument("--corpus", help="JSON lines request corpus (default: built-in mix)")
+    parser.add_argument("--mix", help="Agent weights, e.g. hyper_local_content=3,image_scoring=1")
+    parser.add_argument("--model", choices=("stub", "real"), default="stub", help="Scripted stubs or the configured models")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="Stub latency per agent model call")
+    parser.add_argument("--client-latency-ms", type=float, default=500.0, help="Stub latency per tool model call")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="Requests served at once (0 = unbounded)")
+    parser.add_argument("--window", type=float, default=5.0, help="Seconds per reporting window")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for arrivals and the request mix")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = load_corpus(args.corpus) if args.corpus else build_corpus()
+    schedule = build_schedule(args, corpus, rng)
+    if not schedule:
+        raise SystemExit("No arrivals scheduled")
+    agents = sorted({request["agent"] for _, request in schedule})
+
+    async def run():
+        test = LoadTest(prepare_runners(agents, args), args.max_concurrency)
+        elapsed = await test.run(schedule)
+        return test, elapsed
+
+    with contextlib.ExitStack() as stack:
+        if args.model == "stub":
+            # Offline: no project, no persistent caches or cassettes, no quota pacing
+            from eval.parallel_eval import offline_settings
+
+            stack.enter_context(offline_settings())
+        test, elapsed = asyncio.run(run())
+    records = sorted(test.records, key=lambda record: record["arrival"])
+    report = {
+        "settings": {key: value for key, value in vars(args).items() if key != "output"},
+        "elapsed_s": round(elapsed, 2),
+        "offered_rps": round(len(schedule) / (max(schedule[-1][0], 1e-9) if args.trace else args.duration), 2),
+        "achieved_rps": round(len(records) / elapsed, 2),
+        "mix": dict(Counter(record["agent"] for record in records)),
+        "overall": summarize(records, test.samples),
+        "per_agent": {
+            agent: summarize([record for record in records if record["agent"] == agent], [])
+            for agent in agents
+        },
+        "windows": windows(records, test.samples, args.window, elapsed),
+    }
+
+    overall = report["overall"]
+    print(f"{overall['requests']} requests in {report['elapsed_s']}s "
+          f"(offered {report['offered_rps']} rps, achieved {report['achieved_rps']} rps), mix {report['mix']}")
+    print(f"latency {overall['latency_ms']}ms, queue {overall['queue_ms']}ms, in flight {overall['in_flight']}, "
+          f"error rate {overall['error_rate']}, fallback rate {overall['fallback_rate']}")
+    print(f"{'window':>8} {'reqs':>5} {'p50':>8} {'p95':>8} {'queue':>8} {'inflight':>8} {'err':>6} {'fallbk':>6}")
+    for window in report["windows"]:
+        print(f"{window['start_s']:>7.0f}s {window['requests']:>5} {window['latency_ms']['p50']:>8} "
+              f"{window['latency_ms']['p95']:>8} {window['queue_ms']['mean']:>8} {window['in_flight']['max']:>8} "
+              f"{window['error_rate']:>6} {window['fallback_rate']:>6}")
+    if args.output:
+        report["requests"] = records
+        pathlib.Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
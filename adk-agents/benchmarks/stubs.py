@@ -0,0 +1,182 @@
+"""Deterministic stand-ins for Gemini used by the benchmarks.
+
+ScriptedLlm replaces the model of every LlmAgent: it calls each of the
+agent's tools once, in declaration order, with synthesized arguments and then
+answers with a short text. FakeGenaiClient replaces the genai client used
+inside tools. Both can add a fixed latency and count calls per request.
+"""
+
+import asyncio
+import base64
+import contextvars
+import json
+import time
+from typing import AsyncGenerator
+
+from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+from shared.model_clients import register_genai_client
+
+# 1x1 transparent PNG returned for every image generation
+PNG_BYTES = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+DEFAULT_SCORE = 45
+
+# Model calls made on behalf of the current request (set per request task)
+request_stats = contextvars.ContextVar("request_stats", default=None)
+
+
+def count_call(kind: str) -> None:
+    stats = request_stats.get()
+    if stats is not None:
+        stats[kind] = stats.get(kind, 0) + 1
+
+
+def _declarations(llm_request: LlmRequest):
+    for tool in (llm_request.config.tools or []) if llm_request.config else []:
+        for declaration in getattr(tool, "function_declarations", None) or []:
+            yield declaration
+
+
+def _current_turn(llm_request: LlmRequest):
+    """Return (called tool names, last function responses) for this agent's turn."""
+    called = []
+    responses = []
+    for content in reversed(llm_request.contents):
+        parts = content.parts or []
+        if content.role == "user" and any(part.text for part in parts):
+            break
+        for part in parts:
+            if part.function_call:
+                called.append(part.function_call.name)
+            if part.function_response:
+                responses.append(part.function_response.response or {})
+    return called, responses
+
+
+def _request_text(llm_request: LlmRequest) -> str:
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if content.role == "user" and part.text:
+                return part.text
+    return "benchmark request"
+
+
+def _find_score(responses):
+    for response in responses:
+        for payload in (response, response.get("result"), response.get("validation_results")):
+            if isinstance(payload, dict) and isinstance(payload.get("total_score"), (int, float)):
+                return int(payload["total_score"])
+    return None
+
+
+def _arguments(declaration, llm_request: LlmRequest, responses) -> dict:
+    schema = declaration.parameters
+    properties = dict(schema.properties or {}) if schema else {}
+    if not properties and declaration.parameters_json_schema:
+        properties = declaration.parameters_json_schema.get("properties", {})
+
+    arguments = {}
+    for name, prop in properties.items():
+        kind = prop.get("type") if isinstance(prop, dict) else prop.type
+        kind = str(getattr(kind, "value", kind)).lower()
+        if kind in ("integer", "number"):
+            score = _find_score(responses)
+            arguments[name] = score if score is not None else DEFAULT_SCORE
+        elif kind == "boolean":
+            arguments[name] = True
+        else:
+            arguments[name] = _request_text(llm_request)
+    return arguments
+
+
+def _usage(prompt, output_text: str) -> types.GenerateContentResponseUsageMetadata:
+    """Rough token counts (4 characters per token) so the usage ledger has numbers."""
+    prompt_tokens = len(json.dumps(prompt, default=str)) // 4
+    return types.GenerateContentResponseUsageMetadata(
+        prompt_token_count=prompt_tokens,
+        candidates_token_count=len(output_text) // 4,
+        total_token_count=prompt_tokens + len(output_text) // 4,
+    )
+
+
+class ScriptedLlm(BaseLlm):
+    """Calls every declared tool once per turn, then replies with text."""
+
+    model: str = "scripted-benchmark-model"
+    latency: float = 0.0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        count_call("llm")
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        called, responses = _current_turn(llm_request)
+        prompt = [content.model_dump(exclude_none=True) for content in llm_request.contents]
+        for declaration in _declarations(llm_request):
+            if declaration.name not in called:
+                call = types.FunctionCall(
+                    name=declaration.name, args=_arguments(declaration, llm_request, responses)
+                )
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(function_call=call)]),
+                    usage_metadata=_usage(prompt, json.dumps(call.args, default=str)),
+                )
+                return
+
+        summary = json.dumps(responses[0], default=str)[:200] if responses else "Done."
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=summary)]),
+            usage_metadata=_usage(prompt, summary),
+        )
+
+
+class _FakeModels:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def _wait(self):
+        count_call("client")
+        if self.latency:
+            time.sleep(self.latency)
+
+    def generate_content(self, model, contents, config=None):
+        self._wait()
+        text = (
+            "# Benchmark content\n\nThis text stands in for a model response.\n\n"
+            "1. What did you learn? ____\n2. Explain the main idea.\n\n**Answer Key:** 1. varies 2. varies"
+        )
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=[types.Part(text=text)]))],
+            usage_metadata=_usage(contents, text),
+        )
+
+    def generate_images(self, model, prompt, config=None):
+        self._wait()
+        return types.GenerateImagesResponse(
+            generated_images=[types.GeneratedImage(image=types.Image(image_bytes=PNG_BYTES, mime_type="image/png"))]
+        )
+
+
+class FakeGenaiClient:
+    """Minimal synchronous stand-in for genai.Client."""
+
+    def __init__(self, latency: float = 0.0):
+        self.models = _FakeModels(latency)
+
+
+def install_stubs(root_agent, llm_latency: float = 0.0, client_latency: float = 0.0) -> None:
+    """Point every LlmAgent in the tree and the shared genai client at the stubs."""
+    register_genai_client(FakeGenaiClient(client_latency))
+    stack = [root_agent]
+    while stack:
+        agent = stack.pop()
+        if isinstance(agent, LlmAgent):
+            agent.model = ScriptedLlm(latency=llm_latency)
+        stack.extend(agent.sub_agents)
@@ -12,8 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Deployment script for Image Scoring."""
+"""Deployment script for the Sahayak agents (image_scoring, hyper_local_content, differentiated_materials)."""
 
+import importlib
 import os
 
 from absl import app
@@ -23,16 +24,20 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from image_scoring.agent import root_agent
 import vertexai
 from vertexai import agent_engines
-from vertexai.preview.reasoning_engines import AdkApp
+from shared.agent_engine import WarmAdkApp
+
+AGENTS = ("image_scoring", "hyper_local_content", "differentiated_materials")
+# Every deployment ships all agent packages, so one bundle serves whichever agent is selected
+EXTRA_PACKAGES = [f"./{package}" for package in AGENTS] + ["./shared"]
 
 FLAGS = flags.FLAGS
 flags.DEFINE_string("project_id", None, "GCP project ID.")
 flags.DEFINE_string("location", None, "GCP location.")
 flags.DEFINE_string("bucket", None, "GCP bucket.")
 flags.DEFINE_string("resource_id", None, "ReasoningEngine resource ID.")
+flags.DEFINE_enum("agent", "image_scoring", AGENTS, "Agent to deploy.")
 
 flags.DEFINE_bool("list", False, "List all agents.")
 flags.DEFINE_bool("create", False, "Creates a new agent.")
@@ -40,9 +45,14 @@ flags.DEFINE_bool("delete", False, "Deletes an existing agent.")
 flags.mark_bool_flags_as_mutual_exclusive(["create", "delete"])
 
 
-def create() -> None:
-    """Creates an agent engine for Image Scoring."""
-    adk_app = AdkApp(agent=root_agent, enable_tracing=True)
+def create(agent_name: str) -> None:
+    """Creates an agent engine for the selected agent.
+
+    The app preloads its data and runs a synthetic warm-up request during
+    container init, so the first real request does not pay the cold start.
+    """
+    root_agent = importlib.import_module(f"{agent_name}.agent").root_agent
+    adk_app = WarmAdkApp(agent=root_agent, enable_tracing=True)
 
     remote_agent = agent_engines.create(
         adk_app,
@@ -55,8 +65,9 @@ def create() -> None:
             "absl-py (>=2.2.1,<3.0.0)",
             "google-cloud-storage(>=2.14.0,<=3.1.0)",
             "pillow (>=10.3.0,<11.0.0)",
+            "numpy (>=1.26.0)",
         ],
-        extra_packages=["./image_scoring"],
+        extra_packages=EXTRA_PACKAGES,
     )
     print(f"Created remote agent: {remote_agent.resource_name}")
 
@@ -82,10 +93,6 @@ def list_agents() -> None:
 
 def main(argv: list[str]) -> None:
 
-    # print all load environment variables
-    for key, value in os.environ.items():
-        print(f"{key}: {value}")
-
     project_id = (
         FLAGS.project_id if FLAGS.project_id else os.getenv("GOOGLE_CLOUD_PROJECT")
     )
@@ -95,6 +102,7 @@ def main(argv: list[str]) -> None:
     print(f"PROJECT: {project_id}")
     print(f"LOCATION: {location}")
     print(f"BUCKET: {bucket}")
+    print(f"AGENT: {FLAGS.agent}")
 
     if not project_id:
         print("Missing required environment variable: GOOGLE_CLOUD_PROJECT")
@@ -115,7 +123,7 @@ def main(argv: list[str]) -> None:
     if FLAGS.list:
         list_agents()
     elif FLAGS.create:
-        create()
+        create(FLAGS.agent)
     elif FLAGS.delete:
         if not FLAGS.resource_id:
             print("resource_id is required for delete")
@@ -6,8 +6,17 @@ from .sub_agents.worksheet_planning.planning_agent import worksheet_planning_age
 from .sub_agents.worksheet_generation.generation_agent import worksheet_generation_agent
 from .sub_agents.validation.validation_agent import worksheet_validation_agent
 from .checker_agent import worksheet_quality_checker_agent
+from .fast_path import FAST_STAGES
 from google.adk.agents import SequentialAgent, LoopAgent
 from google.adk.agents.callback_context import CallbackContext
+from shared.cassettes import apply_cassettes
+from shared.context_cache import apply_context_cache
+from shared.instrumentation import instrument_agent_tree
+from shared.profiling import profile_tools
+from shared.scheduler import apply_scheduler
+from shared.tool_stage import fast_path
+from shared.usage import track_usage
+from shared.state_budget import apply_state_budget
 
 
 def set_worksheet_session(callback_context: CallbackContext):
@@ -31,6 +40,7 @@ def set_worksheet_session(callback_context: CallbackContext):
 # The process continues until either:
 # - The worksheet quality score meets the threshold
 # - The maximum number of iterations is reached
+# With FAST_PATH_ENABLED the pure-Python stages run their tools without a model turn.
 
 differentiated_worksheet_generation_agent = SequentialAgent(
     name="differentiated_worksheet_generation_agent",
@@ -46,10 +56,10 @@ differentiated_worksheet_generation_agent = SequentialAgent(
     ),
     sub_agents=[
         image_processing_agent,
-        grade_detection_agent,
-        worksheet_planning_agent,
+        fast_path(grade_detection_agent, FAST_STAGES),
+        fast_path(worksheet_planning_agent, FAST_STAGES),
         worksheet_generation_agent,
-        worksheet_validation_agent
+        fast_path(worksheet_validation_agent, FAST_STAGES)
     ],
 )
 
@@ -63,10 +73,42 @@ differentiated_materials = LoopAgent(
     description="Repeatedly runs worksheet generation process and checks quality until threshold is met.",
     sub_agents=[
         differentiated_worksheet_generation_agent,  # First, run the sequential worksheet generation process
-        worksheet_quality_checker_agent,  # Second, check the quality and potentially stop the loop
+        fast_path(worksheet_quality_checker_agent, FAST_STAGES),  # Second, check the quality and potentially stop the loop
     ],
     before_agent_callback=set_worksheet_session,
 )
 
 # Export root agent (following same pattern as other agents)
 root_agent = differentiated_materials
+
+# Token and cost ledger per session
+track_usage(root_agent)
+
+# Per-tool and per-agent spans, only when METRICS_ENABLED is set
+instrument_agent_tree(root_agent)
+
+# Sampled tool profiles, only when PROFILE_TOOLS is set
+profile_tools(root_agent)
+
+# Priority and fair-share queueing of model calls, only when SCHEDULER_ENABLED is set
+apply_scheduler(root_agent)
+
+# Per-session model traffic recording, only when CASSETTE_MODE=record
+apply_cassettes(root_agent)
+
+# Cached static prompt prefixes, only when CONTEXT_CACHE_ENABLED is set
+apply_context_cache(root_agent)
+
+# Move per-iteration payloads out of session state into artifacts
+apply_state_budget(root_agent)
+
+
+def preload():
+    """Load grade guidelines, grade plans and worksheet templates."""
+    from .sub_agents.tools.fetch_grade_guidelines_tool import load_grade_guidelines
+    from .sub_agents.worksheet_generation.tools.worksheet_templates import preload_templates
+    from .sub_agents.worksheet_planning.tools.worksheet_planning_tool import get_grade_plan_table
+
+    load_grade_guidelines()
+    get_grade_plan_table()
+    preload_templates()
@@ -0,0 +1,20 @@
+# Worksheet export module
+from .pdf import UnsupportedTextError, iter_worksheets_pdf, write_worksheets_pdf
+from .docx import iter_worksheets_docx, write_worksheets_docx
+from .markdown import ordered_worksheets, parse_worksheet_markdown
+
+
+EXPORT_FORMATS = {
+    'pdf': (iter_worksheets_pdf, 'application/pdf'),
+    'docx': (iter_worksheets_docx, 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+}
+
+
+def iter_session_export(state, export_format='pdf'):
+    """Stream the latest generated worksheets of a session in the requested format."""
+
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    worksheets = state.get('latest_generated_worksheets', {}).get('worksheets', {})
+    iter_export, _ = EXPORT_FORMATS[export_format]
+    return iter_export(worksheets)
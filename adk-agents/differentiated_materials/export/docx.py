@@ -0,0 +1,135 @@
+import zipfile
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from .markdown import ordered_worksheets, parse_worksheet_markdown
+
+
+CONTENT_TYPES = b'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types"><Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/><Default Extension="xml" ContentType="application/xml"/><Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/><Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/></Types>'''
+
+PACKAGE_RELS = b'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"><Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/></Relationships>'''
+
+DOCUMENT_RELS = b'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"><Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/></Relationships>'''
+
+STYLES = b'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:docDefaults><w:rPrDefault><w:rPr><w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" w:cs="Nirmala UI"/><w:sz w:val="22"/></w:rPr></w:rPrDefault><w:pPrDefault><w:pPr><w:spacing w:after="80"/></w:pPr></w:pPrDefault></w:docDefaults><w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style><w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/><w:pPr><w:spacing w:before="240"/></w:pPr><w:rPr><w:b/><w:sz w:val="36"/></w:rPr></w:style><w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/><w:basedOn w:val="Normal"/><w:pPr><w:spacing w:before="200"/></w:pPr><w:rPr><w:b/><w:sz w:val="28"/></w:rPr></w:style><w:style w:type="paragraph" w:styleId="Heading3"><w:name w:val="heading 3"/><w:basedOn w:val="Normal"/><w:pPr><w:spacing w:before="160"/></w:pPr><w:rPr><w:b/><w:sz w:val="24"/></w:rPr></w:style></w:styles>'''
+
+DOCUMENT_START = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+)
+# A4 page with 1.8 cm margins
+DOCUMENT_END = (
+    b'<w:sectPr><w:pgSz w:w="11906" w:h="16838"/>'
+    b'<w:pgMar w:top="1020" w:right="1020" w:bottom="1020" w:left="1020" w:header="708" w:footer="708" w:gutter="0"/>'
+    b'</w:sectPr></w:body></w:document>'
+)
+PAGE_BREAK = b'<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+RULE = b'<w:p><w:pPr><w:pBdr><w:bottom w:val="single" w:sz="6" w:space="1" w:color="auto"/></w:pBdr></w:pPr></w:p>'
+
+
+def _runs_xml(runs):
+    return ''.join(
+        f'<w:r>{"<w:rPr><w:b/></w:rPr>" if bold else ""}<w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+        for text, bold in runs
+    )
+
+
+def _table_xml(rows):
+    columns = max(len(row) for row in rows)
+    cells = []
+    for row_index, row in enumerate(rows):
+        row_cells = ''.join(
+            f'<w:tc><w:p>{_runs_xml(((row[i] if i < len(row) else "", row_index == 0),))}</w:p></w:tc>'
+            for i in range(columns)
+        )
+        cells.append(f'<w:tr>{row_cells}</w:tr>')
+    borders = ''.join(
+        f'<w:{side} w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+        for side in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV')
+    )
+    return f'<w:tbl><w:tblPr><w:tblW w:w="5000" w:type="pct"/><w:tblBorders>{borders}</w:tblBorders></w:tblPr>{"".join(cells)}</w:tbl>'
+
+
+def _block_xml(kind, payload):
+    if kind == 'heading':
+        level, text = payload
+        return f'<w:p><w:pPr><w:pStyle w:val="Heading{level}"/></w:pPr>{_runs_xml(((text, False),))}</w:p>'
+    if kind == 'paragraph':
+        indented, runs = payload
+        indent = '<w:pPr><w:ind w:left="360"/></w:pPr>' if indented else ''
+        return f'<w:p>{indent}{_runs_xml(runs)}</w:p>'
+    if kind == 'bullet':
+        return f'<w:p><w:pPr><w:ind w:left="360" w:hanging="220"/></w:pPr>{_runs_xml((("• ", False),) + payload)}</w:p>'
+    if kind == 'table':
+        return _table_xml(payload) + '<w:p/>'
+    if kind == 'rule':
+        return RULE.decode()
+    return ''
+
+
+@lru_cache(maxsize=256)
+def worksheet_body_xml(content):
+    """WordprocessingML body fragment for one worksheet, cached per content."""
+
+    return ''.join(_block_xml(kind, payload) for kind, payload in parse_worksheet_markdown(content)).encode('utf-8')
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_worksheets_docx(worksheets):
+    """Stream all grade worksheets of a session as one DOCX document.
+
+    The zip container is written without seeking, so chunks can be sent as
+    soon as each worksheet has been compressed.
+    """
+
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES)
+        archive.writestr('_rels/.rels', PACKAGE_RELS)
+        archive.writestr('word/_rels/document.xml.rels', DOCUMENT_RELS)
+        archive.writestr('word/styles.xml', STYLES)
+        yield sink.drain()
+
+        with archive.open('word/document.xml', 'w') as document:
+            document.write(DOCUMENT_START)
+            for index, worksheet in enumerate(ordered_worksheets(worksheets)):
+                if index:
+                    document.write(PAGE_BREAK)
+                document.write(worksheet_body_xml(str(worksheet.get('content', ''))))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+            document.write(DOCUMENT_END)
+    yield sink.drain()
+
+
+def write_worksheets_docx(worksheets, stream):
+    """Write the DOCX export to a binary file-like object; returns the byte count."""
+
+    size = 0
+    for chunk in iter_worksheets_docx(worksheets):
+        stream.write(chunk)
+        size += len(chunk)
+    return size
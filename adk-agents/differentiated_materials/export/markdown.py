@@ -0,0 +1,74 @@
+import re
+from functools import lru_cache
+
+
+TABLE_SEPARATOR = re.compile(r'^\|?[\s:|-]+\|?$')
+
+
+def ordered_worksheets(worksheets):
+    """Return the worksheets of a generation summary sorted by grade."""
+
+    def grade_of(item):
+        grade_key, worksheet = item
+        grade = worksheet.get('grade_level')
+        if isinstance(grade, int):
+            return grade
+        digits = re.sub(r'\D', '', str(grade_key))
+        return int(digits) if digits else 0
+
+    return [worksheet for _, worksheet in sorted(worksheets.items(), key=grade_of)]
+
+
+def split_bold(text):
+    """Split a line into (text, is_bold) runs on ** markers."""
+
+    runs = []
+    for index, part in enumerate(text.split('**')):
+        if part:
+            runs.append((part, index % 2 == 1))
+    return tuple(runs)
+
+
+def _table_cells(line):
+    return tuple(cell.strip() for cell in line.strip().strip('|').split('|'))
+
+
+@lru_cache(maxsize=256)
+def parse_worksheet_markdown(content):
+    """Parse worksheet Markdown into a tuple of layout blocks.
+
+    Blocks are (kind, payload) pairs: heading (level, text), paragraph
+    (indented, runs), bullet runs, table rows, rule and blank. The result is cached because the
+    same template worksheets are exported for many sessions.
+    """
+
+    blocks = []
+    table = []
+    for raw_line in content.strip('\n').splitlines():
+        line = raw_line.strip()
+
+        if line.startswith('|'):
+            if not TABLE_SEPARATOR.match(line):
+                table.append(_table_cells(line))
+            continue
+        if table:
+            blocks.append(('table', tuple(table)))
+            table = []
+
+        if not line:
+            if blocks and blocks[-1][0] != 'blank':
+                blocks.append(('blank', None))
+        elif line.startswith('#'):
+            level = len(line) - len(line.lstrip('#'))
+            blocks.append(('heading', (min(level, 3), line.lstrip('#').strip())))
+        elif set(line) <= {'-', '*', '_'} and len(line) >= 3:
+            blocks.append(('rule', None))
+        elif line[:2] in ('- ', '• ', '* '):
+            blocks.append(('bullet', split_bold(line[2:].strip())))
+        else:
+            indented = raw_line[:1].isspace()
+            blocks.append(('paragraph', (indented, split_bold(line))))
+
+    if table:
+        blocks.append(('table', tuple(table)))
+    return tuple(blocks)
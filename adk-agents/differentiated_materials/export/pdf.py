@@ -0,0 +1,339 @@
+import zlib
+from functools import lru_cache
+
+from .markdown import ordered_worksheets, parse_worksheet_markdown
+
+
+# A4 page in points
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 50
+TEXT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+
+BODY_SIZE = 11
+TABLE_SIZE = 9
+MIN_TABLE_SIZE = 6
+HEADING_SIZES = {1: 18, 2: 14, 3: 12}
+LINE_SPACING = 1.35
+INDENT = 18
+
+# Standard Type1 fonts need no embedding, so every export shares the same font objects
+FONTS = {
+    'regular': ('F1', 'Helvetica'),
+    'bold': ('F2', 'Helvetica-Bold'),
+    'mono': ('F3', 'Courier'),
+}
+
+# AFM advance widths (1/1000 em) for ASCII 32-126
+_HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+# Widths of the WinAnsi characters the worksheets use outside ASCII
+_EXTRA_WIDTHS = {'•': 350, '°': 400, '²': 333, '³': 333, '–': 556, '—': 1000, '×': 584, '’': 222, '“': 333, '”': 333}
+
+FONT_WIDTHS = {
+    'regular': {chr(32 + i): width for i, width in enumerate(_HELVETICA_WIDTHS)},
+    'bold': {chr(32 + i): width for i, width in enumerate(_HELVETICA_BOLD_WIDTHS)},
+}
+
+# Glyphs missing from WinAnsiEncoding and their closest printable form
+SUBSTITUTIONS = str.maketrans({
+    '→': '->', '←': '<-', '○': 'o', '△': '^', '₂': '2', '₃': '3', '₄': '4',
+    '≤': '<=', '≥': '>=', '≠': '!=', '✓': 'v', '…': '...',
+})
+
+
+class UnsupportedTextError(ValueError):
+    """Raised for worksheets with characters the built-in PDF fonts cannot show."""
+
+
+def unsupported_characters(text):
+    """Characters of text outside WinAnsiEncoding after substitutions, in order of appearance."""
+
+    missing = {}
+    for char in text.translate(SUBSTITUTIONS):
+        if char not in missing:
+            try:
+                char.encode('cp1252')
+            except UnicodeEncodeError:
+                missing[char] = None
+    return list(missing)
+
+
+def check_pdf_text(worksheets):
+    """Raise UnsupportedTextError unless every worksheet can be exported without losing text.
+
+    The standard fonts only cover Western European scripts; Devanagari and
+    other Indic text would need an embedded font and a shaping engine, so
+    such worksheets are exported as DOCX instead.
+    """
+
+    for worksheet in ordered_worksheets(worksheets):
+        missing = unsupported_characters(str(worksheet.get('content', '')))
+        if missing:
+            sample = ' '.join(missing[:8])
+            raise UnsupportedTextError(
+                f"Grade {worksheet.get('grade_level', '?')} worksheet contains characters the PDF export "
+                f"cannot render ({sample}); export it as DOCX (format=docx) instead"
+            )
+
+
+def pdf_text(text):
+    """Encode text for a PDF string literal in WinAnsiEncoding."""
+
+    encoded = text.translate(SUBSTITUTIONS).encode('cp1252', errors='replace')
+    return encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+@lru_cache(maxsize=4096)
+def text_width(text, font, size):
+    """Width of a string in points."""
+
+    if font == 'mono':
+        return len(text.translate(SUBSTITUTIONS)) * 0.6 * size
+    widths = FONT_WIDTHS[font]
+    return sum(widths.get(char, _EXTRA_WIDTHS.get(char, 556)) for char in text) * size / 1000
+
+
+@lru_cache(maxsize=2048)
+def layout_runs(runs, size, width):
+    """Word-wrap bold/regular runs into lines of (font, x offset, text) segments."""
+
+    # Each word remembers how many spaces precede it, so run boundaries inside a
+    # word (e.g. "**bold**,") stay glued and aligned option lists keep their gaps
+    words = []
+    spaces = 0
+    for text, bold in runs:
+        font = 'bold' if bold else 'regular'
+        for index, word in enumerate(text.split(' ')):
+            if index:
+                spaces += 1
+            if word:
+                words.append((word, font, spaces))
+                spaces = 0
+
+    lines = []
+    line = []
+    x = 0.0
+    for word, font, spaces in words:
+        gap = text_width(' ', font, size) * spaces if line else 0.0
+        word_width = text_width(word, font, size)
+        if line and x + gap + word_width > width:
+            lines.append(tuple(line))
+            line, x, gap = [], 0.0, 0.0
+        if line and line[-1][0] == font:
+            _, offset, previous = line[-1]
+            line[-1] = (font, offset, previous + ' ' * spaces + word)
+        else:
+            line.append((font, x + gap, word))
+        x += gap + word_width
+    if line:
+        lines.append(tuple(line))
+    return tuple(lines)
+
+
+def _text_op(font, size, x, y, text):
+    return b'BT /%s %d Tf %.2f %.2f Td (%s) Tj ET\n' % (
+        FONTS[font][0].encode(), size, x, y, pdf_text(text)
+    )
+
+
+@lru_cache(maxsize=512)
+def layout_table(rows, width):
+    """Render table rows as monospace lines and return (font size, lines)."""
+
+    columns = max(len(row) for row in rows)
+    widths = [max(len(row[i]) if i < len(row) else 0 for row in rows) for i in range(columns)]
+    characters = sum(widths) + 3 * (columns - 1)
+    size = TABLE_SIZE
+    while size > MIN_TABLE_SIZE and characters * 0.6 * size > width:
+        size -= 1
+    max_characters = int(width / (0.6 * size))
+
+    lines = []
+    for row in rows:
+        cells = [(row[i] if i < len(row) else '').ljust(widths[i]) for i in range(columns)]
+        lines.append(' | '.join(cells).rstrip()[:max_characters])
+    return size, tuple(lines)
+
+
+class _PageLayout:
+    """Lays out worksheet blocks onto A4 pages, yielding each finished page."""
+
+    def __init__(self):
+        self.pages = []
+        self._new_page()
+
+    def _new_page(self):
+        self.ops = []
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def _finish_page(self):
+        self.pages.append(self.ops)
+        self._new_page()
+
+    def _reserve(self, height):
+        if self.y - height < MARGIN and self.ops:
+            self._finish_page()
+        self.y -= height
+
+    def text_lines(self, lines, size, indent=0.0, marker=None):
+        line_height = size * LINE_SPACING
+        for index, line in enumerate(lines):
+            self._reserve(line_height)
+            if marker and index == 0:
+                self.ops.append(_text_op('regular', size, MARGIN + 6, self.y, marker))
+            for font, offset, text in line:
+                self.ops.append(_text_op(font, size, MARGIN + indent + offset, self.y, text))
+
+    def add_block(self, kind, payload):
+        if kind == 'heading':
+            level, text = payload
+            size = HEADING_SIZES[level]
+            self._reserve(size * 0.4)
+            self.text_lines(layout_runs(((text, True),), size, TEXT_WIDTH), size)
+        elif kind == 'paragraph':
+            indented, runs = payload
+            indent = INDENT if indented else 0.0
+            self.text_lines(layout_runs(runs, BODY_SIZE, TEXT_WIDTH - indent), BODY_SIZE, indent)
+        elif kind == 'bullet':
+            lines = layout_runs(payload, BODY_SIZE, TEXT_WIDTH - INDENT)
+            self.text_lines(lines, BODY_SIZE, INDENT, marker='•')
+        elif kind == 'table':
+            size, lines = layout_table(payload, TEXT_WIDTH)
+            self.text_lines([(('mono', 0.0, line),) for line in lines], size)
+        elif kind == 'rule':
+            self._reserve(BODY_SIZE)
+            self.ops.append(b'0.5 w %.2f %.2f m %.2f %.2f l S\n' % (
+                MARGIN, self.y + BODY_SIZE / 2, PAGE_WIDTH - MARGIN, self.y + BODY_SIZE / 2
+            ))
+        elif kind == 'blank':
+            self._reserve(BODY_SIZE * 0.6)
+
+    def take_pages(self):
+        """Return the pages completed so far."""
+        pages, self.pages = self.pages, []
+        return pages
+
+    def close(self):
+        if self.ops:
+            self._finish_page()
+        return self.take_pages()
+
+
+class _PdfWriter:
+    """Serializes PDF objects in order, tracking byte offsets for the xref table."""
+
+    def __init__(self):
+        self.offset = 0
+        self.offsets = {}
+        self.page_ids = []
+        # 1 = catalog, 2 = page tree, 3.. = fonts, pages follow
+        self.next_id = 3 + len(FONTS)
+
+    def _object(self, object_id, body):
+        data = b'%d 0 obj\n%s\nendobj\n' % (object_id, body)
+        self.offsets[object_id] = self.offset
+        self.offset += len(data)
+        return data
+
+    def header(self):
+        chunks = [b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n']
+        self.offset = len(chunks[0])
+        for index, (_, base_font) in enumerate(FONTS.values()):
+            chunks.append(self._object(3 + index, _FONT_OBJECTS[base_font]))
+        return b''.join(chunks)
+
+    def page(self, ops, page_number):
+        ops = ops + [_text_op('regular', 8, PAGE_WIDTH / 2 - 12, MARGIN / 2, f'Page {page_number}')]
+        stream = zlib.compress(b''.join(ops))
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        self.page_ids.append(page_id)
+        return self._object(
+            content_id,
+            b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream),
+        ) + self._object(
+            page_id,
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R >>'
+            % (PAGE_WIDTH, PAGE_HEIGHT, _RESOURCES, content_id),
+        )
+
+    def trailer(self):
+        kids = b' '.join(b'%d 0 R' % page_id for page_id in self.page_ids)
+        chunks = [
+            self._object(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self.page_ids))),
+            self._object(1, b'<< /Type /Catalog /Pages 2 0 R >>'),
+        ]
+        xref_offset = self.offset
+        count = self.next_id
+        xref = [b'xref\n0 %d\n0000000000 65535 f \n' % count]
+        xref.extend(b'%010d 00000 n \n' % self.offsets[object_id] for object_id in range(1, count))
+        chunks.append(b''.join(xref))
+        chunks.append(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (count, xref_offset))
+        return b''.join(chunks)
+
+
+_FONT_OBJECTS = {
+    base_font: b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>' % base_font.encode()
+    for _, base_font in FONTS.values()
+}
+_RESOURCES = b'<< /Font << %s >> >>' % b' '.join(
+    b'/%s %d 0 R' % (name.encode(), 3 + index) for index, (name, _) in enumerate(FONTS.values())
+)
+
+
+def iter_worksheets_pdf(worksheets):
+    """Stream all grade worksheets of a session as one paginated PDF.
+
+    Each worksheet starts on a new page; bytes are yielded page by page.
+    Raises UnsupportedTextError up front, before any bytes are produced,
+    when a worksheet holds text the PDF fonts cannot render.
+    """
+
+    check_pdf_text(worksheets)
+    return _iter_pdf(worksheets)
+
+
+def _iter_pdf(worksheets):
+    writer = _PdfWriter()
+    yield writer.header()
+
+    page_number = 0
+    for worksheet in ordered_worksheets(worksheets):
+        layout = _PageLayout()
+        for kind, payload in parse_worksheet_markdown(str(worksheet.get('content', ''))):
+            layout.add_block(kind, payload)
+            for ops in layout.take_pages():
+                page_number += 1
+                yield writer.page(ops, page_number)
+        for ops in layout.close():
+            page_number += 1
+            yield writer.page(ops, page_number)
+
+    if not page_number:
+        yield writer.page([], 1)
+    yield writer.trailer()
+
+
+def write_worksheets_pdf(worksheets, stream):
+    """Write the PDF export to a binary file-like object; returns the byte count."""
+
+    size = 0
+    for chunk in iter_worksheets_pdf(worksheets):
+        stream.write(chunk)
+        size += len(chunk)
+    return size
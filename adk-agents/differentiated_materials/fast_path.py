@@ -0,0 +1,24 @@
+"""Tool steps of the stages that skip their model turn when FAST_PATH_ENABLED is set.
+
+Image processing and worksheet generation keep their model turns; see
+shared/tool_stage.py.
+"""
+
+from shared.tool_stage import find_value
+from .sub_agents.grade_detection.tools.grade_identification_tool import identify_grade_levels
+from .sub_agents.validation.tools.set_worksheet_score_tool import set_worksheet_quality_score
+from .sub_agents.validation.tools.worksheet_validation_tool import validate_worksheet_quality
+from .sub_agents.worksheet_planning.tools.worksheet_planning_tool import plan_differentiated_worksheets
+from .tools.worksheet_quality_condition_tool import check_worksheet_quality_condition
+
+
+def _validation_score(ctx, responses):
+    return {"quality_score": find_value(responses, "total_score") or 0}
+
+
+FAST_STAGES = {
+    "grade_detection_agent": [(identify_grade_levels, None)],
+    "worksheet_planning_agent": [(plan_differentiated_worksheets, None)],
+    "worksheet_validation_agent": [(validate_worksheet_quality, None), (set_worksheet_quality_score, _validation_score)],
+    "worksheet_quality_checker_agent": [(check_worksheet_quality_condition, None)],
+}
@@ -10,5 +10,5 @@ grade_detection_agent = Agent(
     description="Identifies appropriate grade levels for worksheet differentiation",
     instruction=GRADE_DETECTION_PROMPT,
     tools=[identify_grade_levels],
-    output_key="grade_analysis",
+    output_key="grade_analysis_summary",
 )
@@ -1,13 +1,11 @@
 from google.adk.tools import ToolContext
-from google import genai
 from google.genai import types
 from .... import config
+from shared.circuit_breaker import CircuitOpenError
+from shared.model_calls import generate_content_async
 import base64
 import json
 
-# Initialize Gemini client (following same pattern as other agents)
-client = genai.Client(vertexai=True)
-
 
 def extract_image_content(image_description: str, tool_context: ToolContext) -> dict:
     """
@@ -56,7 +54,7 @@ def extract_image_content(image_description: str, tool_context: ToolContext) ->
         }
         
         # TODO: Replace with actual Gemini Vision implementation
-        # actual_analysis = analyze_with_gemini_vision(image_data)
+        # actual_analysis = await analyze_with_gemini_vision(image_data)
         
         # Store analysis in session state
         tool_context.state['image_content_analysis'] = content_analysis
@@ -74,7 +72,7 @@ def extract_image_content(image_description: str, tool_context: ToolContext) ->
         }
 
 
-def analyze_with_gemini_vision(image_data):
+async def analyze_with_gemini_vision(image_data):
     """
     Actual implementation for Gemini Vision analysis.
     This will be activated when proper image upload is implemented.
@@ -113,16 +111,17 @@ def analyze_with_gemini_vision(image_data):
         }
         """
         
-        # Generate content using Gemini Vision
-        response = client.models.generate_content(
-            model=config.GENAI_MODEL,
-            contents=[
+        # Generate content using Gemini Vision; a re-uploaded page is served from the response store
+        response = await generate_content_async(
+            config.GENAI_MODEL,
+            [
                 types.Part.from_text(vision_prompt),
                 types.Part.from_bytes(
                     data=base64.b64decode(image_b64),
                     mime_type="image/jpeg"  # Adjust based on actual image type
                 )
-            ]
+            ],
+            cache=True,
         )
         
         # Extract and parse the response
@@ -144,6 +143,10 @@ def analyze_with_gemini_vision(image_data):
         
         return None
         
+    except CircuitOpenError as e:
+        print(f"{e} - skipping Gemini Vision analysis")
+        return None
+        
     except Exception as e:
         print(f"Gemini Vision analysis failed: {str(e)}")
         return None
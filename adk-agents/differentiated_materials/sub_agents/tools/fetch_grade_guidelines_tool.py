@@ -1,16 +1,21 @@
 import os
-import json
 
+from shared.guidelines import guidelines
 
-def get_grade_guidelines():
-    """Fetch grade guidelines from the JSON file."""
-    # Get the directory where the current script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    # Construct the full path to the grade guidelines file
-    guidelines_file_path = os.path.join(script_dir, "../../grade_guidelines.json")
+# Parsed once and reloaded only when the file changes
+GUIDELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../grade_guidelines.json")
+guidelines.register(
+    "grade_guidelines", GUIDELINES_FILE,
+    required_keys=("grade_levels", "content_adaptation_rules", "quality_standards"),
+)
+
+
+def load_grade_guidelines():
+    """Return the parsed, read-only grade guidelines."""
+    return guidelines.data("grade_guidelines")
 
-    with open(guidelines_file_path, "r") as file:
-        guidelines_text = file.read()
-    
-    guidelines_data = {"grade_guidelines": guidelines_text}
+
+def get_grade_guidelines():
+    """Fetch grade guidelines as compact JSON."""
+    guidelines_data = {"grade_guidelines": guidelines.prompt_text("grade_guidelines")}
     return guidelines_data
@@ -0,0 +1,274 @@
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from ... import config
+
+
+QUESTION_LINE = re.compile(r'^(\d+)\.\s+(.*)')
+OPTION_LINE = re.compile(r'^[a-d]\)\s')
+ANSWER_NUMBER = re.compile(r'(?:^|\s)(\d+)[a-z]?(?:-(\d+))?\.')
+TITLE_GRADE = re.compile(r'^#\s+Grade\s+(\d+)', re.IGNORECASE)
+WORD = re.compile(r"[A-Za-zऀ-෿']+")
+VOWEL_GROUP = re.compile(r'[aeiouy]+')
+SENTENCE_END = re.compile(r'[.!?]+(?:\s|$)')
+
+# Section title keywords and the question type they imply, checked in order
+SECTION_TYPES = (
+    ('multiple choice', 'multiple_choice'),
+    ('circle', 'multiple_choice'),
+    ('fill in', 'fill_blank'),
+    ('true or false', 'true_false'),
+    ('draw', 'drawing'),
+    ('vocabulary', 'vocabulary'),
+    ('word problem', 'word_problem'),
+    ('short answer', 'short_answer'),
+)
+
+# Question text keywords and the question type they imply, checked in order
+QUESTION_TYPES = (
+    ('____', 'fill_blank'),
+    ('draw', 'drawing'),
+    ('design', 'analysis'),
+    ('evaluate', 'analysis'),
+    ('analy', 'analysis'),
+    ('compare', 'comparison'),
+    ('explain', 'explanation'),
+    ('describe', 'explanation'),
+    ('write', 'writing'),
+)
+
+ASSESSMENT_MARKERS = ('rubric', 'assessment criteria', '**assessment:**')
+
+# Point weights for one worksheet (40) and for covering the target grades (10)
+WORKSHEET_WEIGHTS = {
+    'header': 4,
+    'parts': 6,
+    'questions': 10,
+    'variety': 6,
+    'answer_key': 8,
+    'readability': 6,
+}
+GRADE_COVERAGE_POINTS = 10
+
+
+def count_syllables(word):
+    """Approximate English syllable count; non-Latin words count as one per word."""
+
+    word = word.lower()
+    if not word.isascii():
+        return 1
+    groups = len(VOWEL_GROUP.findall(word))
+    if word.endswith('e') and groups > 1 and not word.endswith('le'):
+        groups -= 1
+    return max(1, groups)
+
+
+def _section_type(title):
+    title = title.lower()
+    for keyword, question_type in SECTION_TYPES:
+        if keyword in title:
+            return question_type
+    return None
+
+
+def _question_type(text, section_type):
+    if section_type:
+        return section_type
+    text = text.lower()
+    for keyword, question_type in QUESTION_TYPES:
+        if keyword in text:
+            return question_type
+    return 'short_answer'
+
+
+@lru_cache(maxsize=512)
+def analyze_worksheet(content, grade):
+    """Parse a Markdown worksheet in one pass into a compact structure.
+
+    Extracts parts, numbered questions and their types, answer-key coverage
+    and readability statistics. Cached because template worksheets repeat,
+    so the analysis is read-only; copy values before putting them in state.
+    """
+
+    title_grade = None
+    has_name_date = False
+    parts = 0
+    tables = 0
+    questions = {}
+    answered = set()
+    in_answer_key = False
+    has_assessment = False
+    section_type = None
+    last_question = None
+    in_table = False
+    words = sentences = syllables = 0
+
+    for raw_line in content.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        lowered = line.lower()
+
+        if line.startswith('|'):
+            if not in_table:
+                tables += 1
+                in_table = True
+            continue
+        in_table = False
+
+        if 'answer key' in lowered:
+            in_answer_key = True
+        elif any(marker in lowered for marker in ASSESSMENT_MARKERS):
+            has_assessment = True
+            in_answer_key = False
+
+        if in_answer_key:
+            for start, end in ANSWER_NUMBER.findall(line):
+                first = int(start)
+                last = int(end) if end else first
+                answered.update(range(first, min(last, first + 50) + 1))
+            continue
+
+        if line.startswith('#'):
+            match = TITLE_GRADE.match(line)
+            if match and title_grade is None:
+                title_grade = int(match.group(1))
+            if line.startswith('### '):
+                parts += 1
+                section_type = _section_type(line)
+            continue
+
+        if 'name:' in lowered and 'date:' in lowered:
+            has_name_date = True
+            continue
+
+        question = QUESTION_LINE.match(line)
+        if question:
+            last_question = int(question.group(1))
+            questions[last_question] = _question_type(question.group(2), section_type)
+        elif OPTION_LINE.match(line) and last_question is not None and section_type is None:
+            questions[last_question] = 'multiple_choice'
+
+        text = line.replace('*', '')
+        line_words = WORD.findall(text)
+        if line_words:
+            words += len(line_words)
+            syllables += sum(count_syllables(word) for word in line_words)
+            sentences += max(1, len(SENTENCE_END.findall(text)))
+
+    question_types = {}
+    for question_type in questions.values():
+        question_types[question_type] = question_types.get(question_type, 0) + 1
+
+    covered = len(answered & set(questions))
+    if words:
+        average_sentence = words / sentences
+        average_syllables = syllables / words
+        grade_estimate = round(0.39 * average_sentence + 11.8 * average_syllables - 15.59, 1)
+    else:
+        average_sentence = average_syllables = grade_estimate = 0
+
+    return MappingProxyType({
+        'grade': grade,
+        'title_grade': title_grade,
+        'has_name_date': has_name_date,
+        'parts': parts,
+        'tables': tables,
+        'question_count': len(questions),
+        'question_types': MappingProxyType(question_types),
+        'answer_key': bool(answered),
+        'assessment_rubric': has_assessment,
+        'answer_coverage': round(covered / len(questions), 2) if questions else 0.0,
+        'readability': MappingProxyType({
+            'words': words,
+            'sentences': sentences,
+            'avg_sentence_length': round(average_sentence, 1),
+            'avg_syllables_per_word': round(average_syllables, 2),
+            'grade_estimate': grade_estimate,
+        }),
+    })
+
+
+def expected_question_count(grade):
+    """Expected number of questions for a grade's educational level."""
+
+    if grade <= 5:
+        return config.DEFAULT_QUESTION_COUNT['elementary']
+    elif grade <= 8:
+        return config.DEFAULT_QUESTION_COUNT['middle']
+    return config.DEFAULT_QUESTION_COUNT['high']
+
+
+def score_worksheet(analysis):
+    """Score one analyzed worksheet out of 40 points, returning (score, breakdown)."""
+
+    grade = analysis['grade']
+    breakdown = {}
+
+    header = 0
+    if analysis['has_name_date']:
+        header += 2
+    if analysis['title_grade'] == grade:
+        header += 2
+    breakdown['header'] = header
+
+    breakdown['parts'] = min(analysis['parts'], 3) * WORKSHEET_WEIGHTS['parts'] / 3
+
+    expected = expected_question_count(grade)
+    breakdown['questions'] = min(1.0, analysis['question_count'] / expected) * WORKSHEET_WEIGHTS['questions']
+
+    variety = len(analysis['question_types'])
+    breakdown['variety'] = min(variety, 3) * WORKSHEET_WEIGHTS['variety'] / 3
+
+    # Open-ended high-school worksheets are graded by rubric instead of an answer key
+    coverage = analysis['answer_coverage']
+    if analysis['assessment_rubric']:
+        coverage = max(coverage, 0.75)
+    breakdown['answer_key'] = coverage * WORKSHEET_WEIGHTS['answer_key']
+
+    readability_gap = abs(analysis['readability']['grade_estimate'] - grade)
+    if not analysis['readability']['words']:
+        breakdown['readability'] = 0
+    elif readability_gap <= 3:
+        breakdown['readability'] = WORKSHEET_WEIGHTS['readability']
+    elif readability_gap <= 5:
+        breakdown['readability'] = WORKSHEET_WEIGHTS['readability'] * 2 / 3
+    else:
+        breakdown['readability'] = WORKSHEET_WEIGHTS['readability'] / 3
+
+    breakdown = {key: round(value, 1) for key, value in breakdown.items()}
+    return round(sum(breakdown.values())), breakdown
+
+
+def grade_of_worksheet(grade_key, worksheet):
+    """Grade level of a generated worksheet, from its metadata or its key."""
+
+    grade = worksheet.get('grade_level')
+    if isinstance(grade, int):
+        return grade
+    digits = re.sub(r'\D', '', str(grade_key))
+    return int(digits) if digits else 0
+
+
+def score_worksheet_set(worksheets, target_grades):
+    """Score a session's worksheets out of 50 from their structure.
+
+    Returns (total_score, per-grade analysis and score breakdown).
+    """
+
+    per_grade = {}
+    worksheet_scores = []
+    for grade_key, worksheet in worksheets.items():
+        analysis = analyze_worksheet(str(worksheet.get('content', '')), grade_of_worksheet(grade_key, worksheet))
+        score, breakdown = score_worksheet(analysis)
+        worksheet_scores.append(score)
+        per_grade[grade_key] = {'score': score, 'breakdown': breakdown, 'analysis': analysis}
+
+    if target_grades:
+        covered = sum(1 for grade in target_grades if f'grade_{grade}' in worksheets)
+        coverage_points = GRADE_COVERAGE_POINTS * covered / len(target_grades)
+    else:
+        coverage_points = GRADE_COVERAGE_POINTS if worksheets else 0
+
+    average = sum(worksheet_scores) / len(worksheet_scores) if worksheet_scores else 0
+    return min(50, round(coverage_points + average)), per_grade
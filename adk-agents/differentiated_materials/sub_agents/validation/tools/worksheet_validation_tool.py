@@ -1,14 +1,10 @@
 from google.adk.tools import ToolContext
+from ...tools.worksheet_analyzer import score_worksheet_set
 import json
-import time
-import random
 
 
 def validate_worksheet_quality(tool_context: ToolContext) -> dict:
-    """Validate the quality of generated differentiated worksheets with rate limit protection."""
-    
-    # Add delay to help with rate limiting
-    time.sleep(random.uniform(0.3, 0.8))
+    """Validate the quality of generated differentiated worksheets."""
     
     try:
         generated_worksheets = tool_context.state.get('latest_generated_worksheets', {})
@@ -22,8 +18,8 @@ def validate_worksheet_quality(tool_context: ToolContext) -> dict:
         worksheets = generated_worksheets.get('worksheets', {})
         target_grades = generated_worksheets.get('target_grades', [])
         
-        # Quick validation scoring (avoid complex analysis to prevent rate limits)
-        total_score = perform_quick_validation(worksheets, target_grades)
+        # Score from the parsed worksheet structure (no model calls needed)
+        total_score, per_grade = score_worksheet_set(worksheets, target_grades)
         max_score = 50
         
         # Create simplified validation summary
@@ -34,11 +30,23 @@ def validate_worksheet_quality(tool_context: ToolContext) -> dict:
             'overall_assessment': get_quick_assessment(total_score, max_score),
             'classroom_readiness': assess_classroom_readiness(total_score, max_score),
             'worksheets_generated': len(worksheets),
-            'grades_covered': len(target_grades)
+            'grades_covered': len(target_grades),
+            'per_grade': {
+                grade_key: {
+                    'score': result['score'],
+                    'breakdown': result['breakdown'],
+                    'questions': result['analysis']['question_count'],
+                    'question_types': dict(result['analysis']['question_types']),
+                    'answer_coverage': result['analysis']['answer_coverage'],
+                    'readability_grade': result['analysis']['readability']['grade_estimate'],
+                }
+                for grade_key, result in per_grade.items()
+            }
         }
         
-        # Store validation results
+        # Store validation results; the structural score is the quality score
         tool_context.state['worksheet_validation_results'] = validation_summary
+        tool_context.state['worksheet_quality_score'] = total_score
         
         return {
             'status': 'success',
@@ -62,31 +70,6 @@ def validate_worksheet_quality(tool_context: ToolContext) -> dict:
         }
 
 
-def perform_quick_validation(worksheets, target_grades):
-    """Perform quick validation to avoid rate limits."""
-    
-    score = 20  # Base score for successful generation
-    
-    # Check if we have worksheets for target grades
-    if len(worksheets) >= len(target_grades):
-        score += 10
-    
-    # Check worksheet content quality
-    for grade_key, worksheet in worksheets.items():
-        content = str(worksheet.get('content', ''))
-        
-        # Basic content checks (5 points per worksheet, max 15 for 3 worksheets)
-        if len(content) > 500:  # Substantial content
-            score += 2
-        if 'Grade' in content and any(marker in content for marker in ['Name:', 'Date:']):
-            score += 2  
-        if any(section in content for section in ['Part', 'Question', 'Answer']):
-            score += 1
-    
-    # Cap the score at maximum
-    return min(50, score)
-
-
 def get_quick_assessment(total_score, max_score):
     """Get quick overall assessment."""
     percentage = (total_score / max_score) * 100
@@ -1,4 +1,9 @@
 from google.adk.tools import ToolContext
+from shared.circuit_breaker import CircuitOpenError
+from shared.model_calls import generate_content_async
+from shared.rate_limiter import is_rate_limit_error
+from .worksheet_templates import render_worksheet, select_template
+from ...tools.worksheet_analyzer import score_worksheet_set
 import json
 import os
 
@@ -9,15 +14,6 @@ try:
 except ImportError:
     GENAI_MODEL = os.getenv("GENAI_MODEL", "gemini-2.0-flash")
 
-# Initialize Gemini client with error handling
-client = None
-try:
-    from google import genai
-    client = genai.Client(vertexai=True)
-except Exception as e:
-    print(f"Gemini client initialization failed: {e}. Using template generation only.")
-    client = None
-
 
 def generate_differentiated_worksheets(tool_context: ToolContext) -> dict:
     """Generate actual worksheet content for all target grade levels."""
@@ -182,22 +178,15 @@ def generate_grade_specific_worksheet(grade, plan, source_content, concepts, sub
         return None
 
 
-def generate_with_ai(grade, plan, source_content, concepts, subject):
+async def generate_with_ai(grade, plan, source_content, concepts, subject):
     """Generate worksheet using Gemini AI with rate limit handling."""
     
-    if not client:
-        print("Gemini client not available, falling back to template")
-        return None
-        
     try:
         # Create detailed prompt for worksheet generation
         prompt = create_worksheet_generation_prompt(grade, plan, source_content, concepts, subject)
         
-        # Generate using Gemini
-        response = client.models.generate_content(
-            model=GENAI_MODEL,
-            contents=prompt
-        )
+        # Generate using Gemini; identical prompts are served from the response store
+        response = await generate_content_async(GENAI_MODEL, prompt, cache=True)
         
         if response.candidates and len(response.candidates) > 0:
             worksheet_content = response.candidates[0].content.parts[0].text
@@ -215,9 +204,13 @@ def generate_with_ai(grade, plan, source_content, concepts, subject):
         
         return None
         
+    except CircuitOpenError as e:
+        print(f"{e} - using enhanced template for grade {grade}")
+        return None
+        
     except Exception as e:
         error_msg = str(e)
-        if "429" in error_msg or "RESOURCE_EXHAUSTED" in error_msg:
+        if is_rate_limit_error(e):
             print(f"Rate limit hit for grade {grade} worksheet generation - using enhanced template")
         else:
             print(f"Gemini worksheet generation failed: {error_msg}")
@@ -277,19 +270,9 @@ def generate_with_enhanced_template(grade, plan, source_content, concepts, subje
         
         print(f"Generating {level} level worksheet for grade {grade} in {subject}")
         
-        # Generate based on subject and concepts
-        worksheet_content = None
-        
-        if subject.lower() in ['science', 'biology', 'physics', 'chemistry'] and any(concept.lower() in ['reproductive', 'sperm', 'egg', 'vas deferens', 'epididymis'] for concept in concepts):
-            worksheet_content = generate_reproductive_biology_worksheet(grade, level, plan, concepts)
-        elif subject.lower() in ['science', 'biology'] and any(concept.lower() in ['photosynthesis', 'plant', 'chlorophyll'] for concept in concepts):
-            worksheet_content = generate_photosynthesis_worksheet(grade, level, plan)
-        elif subject.lower() == 'mathematics':
-            worksheet_content = generate_math_worksheet(grade, level, plan, concepts)
-        elif subject.lower() == 'english':
-            worksheet_content = generate_english_worksheet(grade, level, plan, concepts)
-        else:
-            worksheet_content = generate_general_worksheet(grade, level, plan, concepts, subject)
+        # Look up the template for the subject and concepts in the prebuilt index
+        template = select_template(subject, concepts)
+        worksheet_content = render_worksheet(template, grade, level, plan, concepts, subject)
         
         if not worksheet_content:
             print(f"Warning: No content generated, creating fallback worksheet")
@@ -324,534 +307,10 @@ def generate_with_enhanced_template(grade, plan, source_content, concepts, subje
         }
 
 
-def generate_reproductive_biology_worksheet(grade, level, plan, concepts):
-    """Generate reproductive biology worksheet for specific grade level."""
-    
-    if level == 'elementary':
-        return f"""
-# Grade {grade} - Basic Life Cycles
-
-**Name: _________________ Date: _________________**
-
-## Learning Goals:
-• Understand that animals have life cycles
-• Learn about how animals grow and change
-• Identify different stages of development
-
----
-
-### Part 1: Fill in the Blanks (Use the word bank)
-**Word Bank: egg, baby, adult, grows, changes**
-
-1. Most animals start as an ____________.
-2. A ____________ animal can have offspring.
-3. Animals ____________ and ____________ as they develop.
-
-### Part 2: Circle the Correct Answer
-
-4. What do most animals need to reproduce?
-   a) Food only    b) A mate    c) Water only
-
-5. How do animals take care of their young?
-   a) Feeding them    b) Protecting them    c) Both a and b
-
-### Part 3: Draw and Label
-6. Draw the life cycle of a butterfly (4 stages)
-
-### Part 4: True or False
-7. All animals start very small. ____
-8. Young animals look exactly like adults. ____
-9. Animals need care when they are young. ____
-
----
-**Answer Key:**
-1. egg  2. adult  3. grows, changes
-4. b  5. c  6. [Drawing: egg→caterpillar→chrysalis→butterfly]  7. True  8. False  9. True
-        """
-    
-    elif level == 'middle':
-        return f"""
-# Grade {grade} - Animal Reproduction and Development
-
-**Name: _________________ Date: _________________**
-
-## Learning Objectives:
-• Explain different types of reproduction in animals
-• Describe the process of fertilization
-• Compare internal and external fertilization
-
----
-
-### Part 1: Multiple Choice (Circle the best answer)
-
-1. The process where sperm and egg unite is called:
-   a) Development    b) Fertilization    c) Growth    d) Maturation
-
-2. Internal fertilization occurs in:
-   a) Fish only    b) Mammals    c) Amphibians    d) All animals
-
-3. Which structure produces sperm cells?
-   a) Ovary    b) Testis    c) Uterus    d) Fallopian tube
-
-### Part 2: Short Answer
-
-4. Compare sexual and asexual reproduction (3 differences):
-   a) _________________
-   b) _________________  
-   c) _________________
-
-5. Explain why genetic diversity is important for species survival. (2-3 sentences)
-
-6. List the path an egg travels from ovary to uterus:
-   Ovary → _________ → _________ → _________
-
-### Part 3: Analysis
-
-7. Compare reproduction in mammals and fish by filling in the table:
-
-| Aspect | Mammals | Fish |
-|---------|---------|------|
-| Fertilization type | | |
-| Development location | | |
-| Parental care | | |
-
-8. Explain how reproductive strategies help animals survive in their environments. (3-4 sentences)
-
----
-**Answer Key:**
-1. b  2. b  3. b  
-4. Sexual needs two parents/genetic diversity/slower vs asexual needs one parent/identical offspring/faster
-5. Genetic diversity helps populations adapt to environmental changes and survive diseases
-6. Fallopian tube → Uterus → (if fertilized) Implantation
-7. See completed table  8. Different strategies maximize survival based on environment
-        """
-    
-    else:  # high school
-        return f"""
-# Grade {grade} - Advanced Reproductive Biology
-
-**Name: _________________ Date: _________________**
-
-## Learning Objectives:
-• Analyze hormonal regulation of reproduction
-• Evaluate reproductive technologies and ethics
-• Synthesize understanding of reproductive health
-
----
-
-### Part 1: Hormonal Regulation
-
-1. Create a flowchart showing the hormonal control of the menstrual cycle, including:
-   - FSH, LH, estrogen, progesterone
-   - Feedback mechanisms
-   - Ovarian and uterine changes
-
-2. Explain how hormonal contraceptives work at the molecular level.
-
-### Part 2: Comparative Analysis
-
-3. Compare and contrast reproductive strategies across different animal groups:
-
-| Strategy | Examples | Advantages | Disadvantages | Environmental factors |
-|----------|----------|------------|---------------|---------------------|
-| High offspring number | | | | |
-| Low offspring number | | | | |
-| External fertilization | | | | |
-| Internal fertilization | | | | |
-
-### Part 3: Bioethics and Technology
-
-4. Analyze the ethical considerations of the following reproductive technologies:
-   a) In vitro fertilization (IVF)
-   b) Genetic screening of embryos
-   c) Surrogacy
-   d) Cloning
-
-5. Evaluate the impact of environmental factors on reproductive health:
-   - Endocrine disruptors
-   - Climate change
-   - Pollution
-
-### Part 4: Research Application
-
-6. Design a research study to investigate the effect of a specific environmental factor on reproductive success in a chosen organism. Include:
-   - Research question and hypothesis
-   - Methodology
-   - Variables and controls
-   - Expected outcomes
-   - Potential applications
-
----
-**Rubric:**
-- Scientific accuracy and depth (30%)
-- Critical thinking and analysis (25%)
-- Use of appropriate terminology (20%)
-- Application of concepts (15%)
-- Ethical reasoning (10%)
-        """
-
-
-def generate_photosynthesis_worksheet(grade, level, plan):
-    """Generate photosynthesis worksheet for specific grade level."""
-    
-    if level == 'elementary':
-        return f"""
-# Grade {grade} - Plants and How They Make Food
-
-**Name: _________________ Date: _________________**
-
-## Learning Goals:
-• Understand that plants make their own food
-• Learn what plants need to grow
-• Identify parts of a plant
-
----
-
-### Part 1: Fill in the Blanks (Use the word bank)
-**Word Bank: sunlight, water, leaves, roots, green**
-
-1. Plants need ____________ and ____________ to make food.
-2. The ____________ part of plants helps them make food.
-3. Plants get water through their ____________.
-4. Most leaves are ____________ in color.
-
-### Part 2: Circle the Correct Answer
-
-5. What do plants make during photosynthesis?
-   a) Water    b) Food    c) Dirt
-
-6. Where do plants get energy from?
-   a) The moon    b) The sun    c) The ground
-
-### Part 3: Draw and Label
-7. Draw a simple plant and label: roots, stem, leaves
-
-### Part 4: True or False
-8. Plants can live without sunlight. ____
-9. Leaves help plants make food. ____
-10. Plants need water to survive. ____
-
----
-**Answer Key:**
-1. sunlight, water  2. leaves  3. roots  4. green
-5. b  6. b  7. [Drawing with labels]  8. False  9. True  10. True
-        """
-    
-    elif level == 'middle':
-        return f"""
-# Grade {grade} - Photosynthesis: How Plants Make Energy
-
-**Name: _________________ Date: _________________**
-
-## Learning Objectives:
-• Explain the process of photosynthesis
-• Identify factors that affect photosynthesis
-• Compare photosynthesis and respiration
-
----
-
-### Part 1: Multiple Choice (Circle the best answer)
-
-1. The process by which plants make glucose using sunlight is called:
-   a) Respiration    b) Photosynthesis    c) Digestion    d) Transpiration
-
-2. Which organelle is responsible for photosynthesis?
-   a) Nucleus    b) Mitochondria    c) Chloroplast    d) Ribosome
-
-3. The green pigment that captures light energy is:
-   a) Hemoglobin    b) Chlorophyll    c) Melanin    d) Carotene
-
-### Part 2: Short Answer
-
-4. Write the word equation for photosynthesis:
-   _________ + _________ → _________ + _________
-
-5. Explain why plants appear green. (2-3 sentences)
-
-6. List three factors that can affect the rate of photosynthesis:
-   a) _________________
-   b) _________________  
-   c) _________________
-
-### Part 3: Analysis
-
-7. Compare photosynthesis and cellular respiration by filling in the table:
-
-| Process | Location | Inputs | Outputs | Purpose |
-|---------|----------|---------|---------|---------|
-| Photosynthesis | Chloroplasts | | | |
-| Cellular Respiration | Mitochondria | | | |
-
-8. Explain how photosynthesis is important for all life on Earth. (4-5 sentences)
-
----
-**Answer Key:**
-1. b  2. c  3. b  4. Carbon dioxide + Water → Glucose + Oxygen
-5. Plants appear green because chlorophyll absorbs red and blue light but reflects green light.
-6. Light intensity, temperature, carbon dioxide concentration
-7. See completed table  8. Photosynthesis produces oxygen and food for all living things.
-        """
-    
-    else:  # high school
-        return f"""
-# Grade {grade} - Advanced Photosynthesis: Energy Conversion and Efficiency
-
-**Name: _________________ Date: _________________**
-
-## Learning Objectives:
-• Analyze the light-dependent and light-independent reactions
-• Evaluate factors affecting photosynthetic efficiency
-• Synthesize understanding of energy flow in ecosystems
-
----
-
-### Part 1: Conceptual Analysis
-
-1. Compare and contrast the light-dependent and light-independent reactions of photosynthesis:
-
-| Aspect | Light-Dependent | Light-Independent |
-|--------|-----------------|-------------------|
-| Location | | |
-| Inputs | | |
-| Outputs | | |
-| Energy source | | |
-
-2. Explain the role of ATP and NADPH in photosynthesis. How are they produced and utilized?
-
-### Part 2: Data Analysis
-
-3. A scientist measures the rate of photosynthesis at different light intensities:
-
-| Light Intensity (lux) | 100 | 500 | 1000 | 2000 | 4000 | 8000 |
-|----------------------|-----|-----|------|------|------|------|
-| O₂ Production (mL/min)| 0.5 | 2.1 | 4.2  | 7.8  | 8.0  | 8.1  |
-
-   a) Graph this data and explain the relationship.
-   b) Identify the limiting factor at high light intensities.
-   c) Predict what would happen if temperature increased to 35°C.
-
-### Part 3: Critical Thinking
-
-4. Evaluate the efficiency of photosynthesis as an energy conversion process. Consider:
-   - Theoretical maximum efficiency
-   - Actual efficiency in C3 vs C4 plants
-   - Environmental and evolutionary trade-offs
-
-5. Design an experiment to test the effect of CO₂ concentration on photosynthetic rate. Include:
-   - Hypothesis
-   - Variables (independent, dependent, controlled)
-   - Methodology
-   - Expected results
-
-### Part 4: Application
-
-6. Analyze how climate change might affect global photosynthesis rates and food production. Consider multiple factors and their interactions.
-
----
-**Rubric:**
-- Accuracy of scientific concepts (25%)
-- Quality of analysis and reasoning (25%)
-- Use of appropriate scientific vocabulary (20%)
-- Data interpretation skills (15%)
-- Creative and critical thinking (15%)
-        """
-
-
-def generate_math_worksheet(grade, level, plan, concepts):
-    """Generate mathematics worksheet for specific grade level."""
-    
-    if level == 'elementary':
-        return f"""
-# Grade {grade} - Math Practice
-
-**Name: _________________ Date: _________________**
-
-### Part 1: Addition and Subtraction
-1. 25 + 17 = ____
-2. 43 - 18 = ____
-3. 56 + 29 = ____
-
-### Part 2: Word Problems
-4. Sarah has 15 stickers. She gives 7 to her friend. How many stickers does she have left?
-
-5. There are 23 birds in a tree. 8 more birds come. How many birds are there now?
-
-### Part 3: Patterns
-6. Continue the pattern: 2, 4, 6, 8, ____, ____
-
-7. What comes next? ○, △, ○, △, ○, ____
-
-**Answer Key:** 1. 42  2. 25  3. 85  4. 8 stickers  5. 31 birds  6. 10, 12  7. △
-        """
-    
-    elif level == 'middle':
-        return f"""
-# Grade {grade} - Algebra and Problem Solving
-
-**Name: _________________ Date: _________________**
-
-### Part 1: Solve for x
-1. 3x + 5 = 17
-2. 2(x - 3) = 10
-3. x/4 + 7 = 12
-
-### Part 2: Word Problems
-4. A rectangle has a length of (x + 3) and width of (x - 1). If the perimeter is 24, find x.
-
-5. The sum of two consecutive integers is 47. What are the integers?
-
-### Part 3: Graphing
-6. Graph the equation y = 2x - 3
-
-**Answer Key:** 1. x = 4  2. x = 8  3. x = 20  4. x = 4.5  5. 23 and 24
-        """
-    
-    else:  # high school
-        return f"""
-# Grade {grade} - Advanced Mathematics
-
-**Name: _________________ Date: _________________**
-
-### Part 1: Functions and Analysis
-1. Given f(x) = x² - 4x + 3, find:
-   a) f(-2)
-   b) The vertex of the parabola
-   c) The x-intercepts
-
-### Part 2: Calculus Applications
-2. Find the derivative of f(x) = 3x³ - 2x² + 5x - 1
-
-3. A ball is thrown upward with initial velocity 64 ft/s. Its height is h(t) = -16t² + 64t.
-   a) When does it reach maximum height?
-   b) What is the maximum height?
-
-**Answer Key:** 1a. 15  1b. (2, -1)  1c. x = 1, 3  2. f'(x) = 9x² - 4x + 5  3a. 2 seconds  3b. 64 feet
-        """
-
-
-def generate_english_worksheet(grade, level, plan, concepts):
-    """Generate English worksheet for specific grade level."""
-    
-    if level == 'elementary':
-        return f"""
-# Grade {grade} - Reading and Writing
-
-**Name: _________________ Date: _________________**
-
-### Part 1: Vocabulary
-1. Circle the correct spelling:
-   a) freind / friend
-   b) becuase / because
-   c) thier / their
-
-### Part 2: Reading Comprehension
-Read the short story and answer the questions:
-
-"The little cat climbed the tall tree to catch a bird. But the cat got scared and couldn't come down. A kind firefighter helped the cat get down safely."
-
-2. Who climbed the tree? _______________
-3. Why did the cat climb the tree? _______________
-4. Who helped the cat? _______________
-
-### Part 3: Writing
-5. Write 3 sentences about your favorite animal.
-
-**Answer Key:** 1. friend, because, their  2. The cat  3. To catch a bird  4. A firefighter
-        """
-    
-    elif level == 'middle':
-        return f"""
-# Grade {grade} - Literature and Composition
-
-**Name: _________________ Date: _________________**
-
-### Part 1: Literary Analysis
-Read this excerpt and answer the questions:
-
-"The wind howled through the empty streets like a wild animal seeking shelter."
-
-1. What literary device is used in this sentence?
-2. What mood does this create?
-3. Rewrite the sentence without the literary device.
-
-### Part 2: Grammar
-4. Identify the parts of speech for each underlined word:
-   "The quick brown fox jumped over the lazy dog."
-
-### Part 3: Writing
-5. Write a paragraph (5-7 sentences) describing a place using at least two metaphors.
-
-**Answer Key:** 1. Simile/Personification  2. Eerie/ominous  3. The wind blew strongly through the empty streets.
-        """
-    
-    else:  # high school
-        return f"""
-# Grade {grade} - Advanced Literature and Rhetoric
-
-**Name: _________________ Date: _________________**
-
-### Part 1: Literary Analysis
-Analyze the following passage for:
-1. Tone and mood
-2. Figurative language
-3. Theme development
-4. Author's purpose
-
-### Part 2: Rhetorical Analysis
-5. Identify and explain three rhetorical strategies used in Martin Luther King Jr.'s "I Have a Dream" speech.
-
-### Part 3: Creative Writing
-6. Write a persuasive essay (300 words) on a contemporary social issue, using at least three rhetorical appeals.
-
-**Rubric:** Content (30%), Organization (25%), Language Use (25%), Conventions (20%)
-        """
-
-
-def generate_general_worksheet(grade, level, plan, concepts, subject):
-    """Generate general worksheet for any subject."""
-    
-    return f"""
-# Grade {grade} - {subject.title()} Worksheet
-
-**Name: _________________ Date: _________________**
-
-## Learning Objectives:
-{chr(10).join(plan.get('learning_objectives', [f'Students will understand key {subject} concepts']))}
-
----
-
-### Part 1: Vocabulary ({level} level)
-Define the following terms:
-{chr(10).join([f"{i+1}. {concept}" for i, concept in enumerate(concepts[:5]) if concept])}
-
-### Part 2: Comprehension
-{f"Answer the following questions about {subject}:" if level == 'elementary' else f"Analyze the following concepts in {subject}:"}
-
-{chr(10).join([f"{i+6}. Explain how {concept} relates to {subject}?" for i, concept in enumerate(concepts[:3]) if concept])}
-
-### Part 3: Application
-{f"Draw or describe how you use {subject} in everyday life." if level == 'elementary' else f"Apply your understanding of {subject} to solve the following problems:"}
-
-{f"9. Give an example of {subject} in your daily life." if level == 'elementary' else f"9. How can understanding {concepts[0] if concepts else subject} help in real-world situations?"}
-
-### Part 4: {"Reflection" if level == 'high' else "Review"}
-{f"10. Critically evaluate the importance of {subject} in modern society." if level == 'high' else f"10. What is the most interesting thing you learned about {subject} today?"}
-
----
-**Assessment Criteria:**
-- Understanding of key concepts
-- Application of knowledge  
-- Quality of explanations
-- Use of appropriate vocabulary
-
-**Learning Objectives Met:**
-{chr(10).join([f"• {obj}" for obj in plan.get('learning_objectives', [f'Understand {subject} concepts'])])}
-    """
-
-
 def assess_generation_quality(worksheets):
     """Assess the quality of generated worksheets."""
     
+    structural_score, _ = score_worksheet_set(worksheets, [])
     quality_indicators = {
         'completeness': all('content' in ws for ws in worksheets.values()),
         'grade_differentiation': len(set(ws.get('grade_level') for ws in worksheets.values())) > 1,
@@ -859,7 +318,7 @@ def assess_generation_quality(worksheets):
         'ready_for_classroom': True,
         'content_length': all(len(ws.get('content', '')) > 500 for ws in worksheets.values()),
         'proper_formatting': all('Grade' in ws.get('content', '') for ws in worksheets.values()),
-        'quality_score': 85  # Base score, would be calculated based on actual content analysis
+        'quality_score': structural_score * 2  # Structural score scaled to 0-100
     }
     
     return quality_indicators
@@ -868,46 +327,4 @@ def assess_generation_quality(worksheets):
 def create_fallback_worksheet(grade, level, subject, concepts):
     """Create a basic fallback worksheet when other generation methods fail."""
     
-    concept_list = concepts[:5] if concepts else [subject, 'knowledge', 'understanding', 'application', 'analysis']
-    
-    return f"""
-# Grade {grade} - {subject.title()} Study Worksheet
-
-**Name: _________________ Date: _________________**
-
-## Learning Objectives:
-• Understand key concepts in {subject}
-• Apply knowledge to practical situations
-• Demonstrate understanding through various question types
-
----
-
-### Part 1: Vocabulary ({level} level)
-Define the following terms:
-{chr(10).join([f"{i+1}. {concept}" for i, concept in enumerate(concept_list)])}
-
-### Part 2: Comprehension
-{"Answer the following questions:" if level == 'elementary' else "Analyze the following concepts:"}
-
-{chr(10).join([f"{i+6}. What is the importance of {concept} in {subject}?" for i, concept in enumerate(concept_list[:3])])}
-
-### Part 3: Application
-{"Give examples from everyday life:" if level == 'elementary' else "Apply your knowledge to solve problems:"}
-
-{f"9. How do you see {subject} in your daily life?" if level == 'elementary' else f"9. How can understanding {concept_list[0]} help solve real-world problems?"}
-
-### Part 4: {"Drawing" if level == 'elementary' else "Analysis"}
-{f"10. Draw a picture showing {subject} concepts." if level == 'elementary' else f"10. Analyze the relationship between different {subject} concepts."}
-
----
-**Answer Key:**
-1-5. Student definitions should demonstrate understanding of key vocabulary
-6-8. Responses should show comprehension of fundamental concepts
-9-10. Applications should connect learning to real-world contexts
-
-**Assessment:**
-- Understanding of vocabulary: 25%
-- Comprehension of concepts: 25%  
-- Application skills: 25%
-- Communication and presentation: 25%
-    """
+    return render_worksheet('fallback', grade, level, {}, concepts, subject)
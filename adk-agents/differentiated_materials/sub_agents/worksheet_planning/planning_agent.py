@@ -10,5 +10,5 @@ worksheet_planning_agent = Agent(
     description="Plans differentiated worksheet structures for multiple grade levels",
     instruction=WORKSHEET_PLANNING_PROMPT,
     tools=[plan_differentiated_worksheets],
-    output_key="worksheet_plans",
+    output_key="worksheet_plans_summary",
 )
@@ -1,4 +1,7 @@
 from google.adk.tools import ToolContext
+from functools import lru_cache
+from types import MappingProxyType
+from .... import config
 import json
 
 
@@ -63,24 +66,41 @@ def plan_differentiated_worksheets(tool_context: ToolContext) -> dict:
 def create_grade_specific_plan(grade, subject, concepts, learning_objectives, content_structure, guidelines):
     """Create detailed plan for a specific grade level."""
     
-    # Determine educational level
+    # Start from the precomputed plan and merge in the session-specific parts
+    grade_plan = get_grade_plan(grade, subject)
+    level = grade_plan['educational_level']
+    
+    plan = {
+        'grade_level': grade,
+        'educational_level': level,
+        'learning_objectives': adapt_learning_objectives(learning_objectives, grade, level),
+    }
+    plan.update(get_grade_plan_copy(grade, subject))
+    
+    return plan
+
+
+def get_educational_level(grade):
+    """Map a grade to its educational level."""
+    
     if grade <= 5:
-        level = 'elementary'
+        return 'elementary'
     elif grade <= 8:
-        level = 'middle'
+        return 'middle'
     else:
-        level = 'high'
+        return 'high'
+
+
+def build_grade_plan(grade, subject):
+    """Build the session-independent part of a grade plan."""
     
-    # Get grade-specific characteristics
+    level = get_educational_level(grade)
     level_info = get_level_characteristics(level)
     
-    # Create the plan
-    plan = {
-        'grade_level': grade,
+    return {
         'educational_level': level,
-        'learning_objectives': adapt_learning_objectives(learning_objectives, grade, level),
         'question_distribution': get_question_distribution(level, subject),
-        'content_adaptations': get_content_adaptations(concepts, grade, level, subject),
+        'content_adaptations': get_content_adaptations([], grade, level, subject),
         'vocabulary_adaptations': get_vocabulary_adaptations(grade, level),
         'visual_elements': get_visual_requirements(grade, level),
         'instruction_style': level_info['instruction_style'],
@@ -89,10 +109,63 @@ def create_grade_specific_plan(grade, subject, concepts, learning_objectives, co
         'assessment_criteria': get_assessment_criteria(grade, level, subject),
         'differentiation_features': get_differentiation_features(grade, level, subject)
     }
+
+
+def freeze_plan(value):
+    """Recursively convert a plan into read-only mappings and tuples."""
+    
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze_plan(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_plan(item) for item in value)
+    return value
+
+
+def thaw_plan(value):
+    """Recursively copy a frozen plan back into plain dicts and lists for session state."""
+    
+    if isinstance(value, MappingProxyType):
+        return {key: thaw_plan(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw_plan(item) for item in value]
+    return value
+
+
+@lru_cache(maxsize=1)
+def get_grade_plan_table():
+    """Return the immutable plan table for every supported grade and subject, built once."""
+    
+    return MappingProxyType({
+        (grade, subject): freeze_plan(build_grade_plan(grade, subject))
+        for grade in config.SUPPORTED_GRADE_LEVELS
+        for subject in config.SUPPORTED_SUBJECTS
+    })
+
+
+@lru_cache(maxsize=256)
+def _get_unlisted_grade_plan(grade, subject):
+    """Memoize plans for grades or subjects outside the precomputed table."""
+    return freeze_plan(build_grade_plan(grade, subject))
+
+
+def get_grade_plan(grade, subject):
+    """Return the read-only precomputed plan for a grade and subject."""
     
+    plan = get_grade_plan_table().get((grade, subject))
+    if plan is None:
+        plan = _get_unlisted_grade_plan(grade, subject)
     return plan
 
 
+def get_grade_plan_copy(grade, subject):
+    """Plain-dict copy of a grade plan for session state.
+    
+    Every call thaws a fresh copy of the frozen plan, so no nested value is
+    shared between sessions.
+    """
+    return thaw_plan(get_grade_plan(grade, subject))
+
+
 def get_level_characteristics(level):
     """Get characteristics for educational level."""
     
@@ -502,23 +575,25 @@ def determine_differentiation_approach(target_grades):
         return 'Significant differentiation across multiple developmental stages'
 
 
+# Quality criteria shared by every worksheet plan
+QUALITY_CRITERIA = {
+    'content_accuracy': 'All factual information must be correct',
+    'grade_appropriateness': 'Content complexity matches target grade level',
+    'question_quality': 'Questions are clear, unambiguous, and well-constructed',
+    'differentiation_effectiveness': 'Meaningful differences across grade levels',
+    'educational_value': 'Clear learning objectives and assessment alignment',
+    'engagement_factor': 'Content is interesting and relevant to students',
+    'instructional_clarity': 'Instructions are clear and appropriate for grade level',
+    'visual_design': 'Layout and visual elements support learning',
+    'assessment_validity': 'Questions effectively measure intended learning',
+    'cultural_sensitivity': 'Content is inclusive and culturally appropriate'
+}
+
+
 def define_quality_criteria(target_grades, subject):
     """Define quality criteria for worksheet evaluation."""
     
-    criteria = {
-        'content_accuracy': 'All factual information must be correct',
-        'grade_appropriateness': 'Content complexity matches target grade level',
-        'question_quality': 'Questions are clear, unambiguous, and well-constructed',
-        'differentiation_effectiveness': 'Meaningful differences across grade levels',
-        'educational_value': 'Clear learning objectives and assessment alignment',
-        'engagement_factor': 'Content is interesting and relevant to students',
-        'instructional_clarity': 'Instructions are clear and appropriate for grade level',
-        'visual_design': 'Layout and visual elements support learning',
-        'assessment_validity': 'Questions effectively measure intended learning',
-        'cultural_sensitivity': 'Content is inclusive and culturally appropriate'
-    }
-    
-    return criteria
+    return dict(QUALITY_CRITERIA)
 
 
 def estimate_completion_times(target_grades):
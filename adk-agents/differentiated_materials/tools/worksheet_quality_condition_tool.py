@@ -1,15 +1,10 @@
 from google.adk.tools import ToolContext, FunctionTool
 from .. import config
-import time
-import random
 
 
 def check_worksheet_quality_and_escalate(tool_context: ToolContext) -> dict:
     """Checks worksheet quality and escalates if threshold met or max iterations reached."""
     
-    # Add a small delay to help with rate limiting
-    time.sleep(random.uniform(0.5, 1.5))
-    
     # Increment iteration count
     current_iteration = tool_context.state.get("worksheet_iteration", 0)
     current_iteration += 1
@@ -0,0 +1,7 @@
+import pathlib
+import sys
+
+# Tests import the agent packages and shared/ the way the agents do
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
@@ -0,0 +1,273 @@
+"""Parallel evaluation sweep over the agent datasets in eval/data.
+
+Cases and runs execute concurrently on a worker pool against one in-process
+runner per agent. Modes:
+    stub    scripted models from benchmarks.stubs (offline, checks tool trajectories)
+    record  real models; agent turns and tool-side model calls are written to cassettes
+    replay  every model call served from cassettes (offline)
+    live    real models, nothing recorded
+
+Usage (from the adk-agents directory):
+    python eval/parallel_eval.py --mode stub
+    python eval/parallel_eval.py --mode record --agent hyper_local_content
+    python eval/parallel_eval.py --mode replay --workers 16 --output eval_results.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import pathlib
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+DATA = ROOT / "eval" / "data"
+CASSETTES = ROOT / "eval" / "cassettes"
+
+DATASETS = {
+    "image_scoring": DATA,
+    "hyper_local_content": DATA / "hyper_local_content",
+    "differentiated_materials": DATA / "differentiated_materials",
+}
+
+MODES = ("stub", "record", "replay", "live")
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def load_dataset(agent_name):
+    directory = DATASETS[agent_name]
+    cases = json.loads((directory / "test.json").read_text())
+    criteria = json.loads((directory / "test_config.json").read_text())["criteria"]
+    return cases, criteria
+
+
+def trajectory_score(expected, actual) -> float:
+    """1.0 if the expected tools were called in order (other calls may interleave)."""
+    remaining = iter(actual)
+    return 1.0 if all(tool in remaining for tool in expected) else 0.0
+
+
+def response_match_score(reference, response) -> float:
+    """ROUGE-1 F1 between the reference and the final response."""
+    reference_words = Counter(word.lower() for word in WORD.findall(reference or ""))
+    response_words = Counter(word.lower() for word in WORD.findall(response or ""))
+    overlap = sum((reference_words & response_words).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(response_words.values())
+    recall = overlap / sum(reference_words.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def cassette_path(agent_name, index, run) -> pathlib.Path:
+    return CASSETTES / agent_name / f"case{index:02d}-run{run}.jsonl.gz"
+
+
+# Offline runs: no project, no persistent caches, no uploads, no quota pacing
+OFFLINE_ENVIRONMENT = {
+    "GCS_BUCKET_NAME": "",
+    "RESPONSE_STORE_ENABLED": "false",
+    "SEMANTIC_CACHE_ENABLED": "false",
+    "WARMUP_MODEL_PING": "false",
+    "CASSETTE_MODE": "",
+    "TEXT_RATE_LIMIT_RPM": "1000000",
+    "IMAGE_RATE_LIMIT_RPM": "1000000",
+    "TEXT_RATE_LIMIT_BURST": "1000000",
+    "IMAGE_RATE_LIMIT_BURST": "1000000",
+}
+# shared.config paths that would otherwise point into ~/.cache/sahayak
+CACHE_PATHS = ("RESPONSE_STORE_PATH", "CASSETTE_DIR", "PROFILE_DIR", "ARTIFACT_DIR", "SESSION_DB_PATH")
+
+
+def _restore_environ(name, previous):
+    if previous is None:
+        os.environ.pop(name, None)
+    else:
+        os.environ[name] = previous
+
+
+def _patch(stack, module, name, value):
+    stack.callback(setattr, module, name, getattr(module, name))
+    setattr(module, name, value)
+
+
+@contextlib.contextmanager
+def offline_settings():
+    """Isolate an offline sweep from the user's caches, buckets and quota settings.
+
+    Sets the environment for modules imported during the sweep and patches
+    the config modules that were already imported (e.g. after a .env load);
+    everything is restored on exit and cache paths point at a temporary
+    directory.
+    """
+    with contextlib.ExitStack() as stack:
+        directory = stack.enter_context(tempfile.TemporaryDirectory(prefix="sahayak-eval-"))
+        environment = {**OFFLINE_ENVIRONMENT, **{name: os.path.join(directory, name.lower()) for name in CACHE_PATHS}}
+        for name, value in environment.items():
+            stack.callback(_restore_environ, name, os.environ.get(name))
+            os.environ[name] = value
+        os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "eval-project")
+        os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "us-central1")
+
+        from shared import config
+        from image_scoring import config as image_scoring_config
+
+        _patch(stack, config, "RESPONSE_STORE_ENABLED", False)
+        _patch(stack, config, "SEMANTIC_CACHE_ENABLED", False)
+        _patch(stack, config, "WARMUP_MODEL_PING", False)
+        _patch(stack, config, "CASSETTE_MODE", "")
+        _patch(stack, config, "RATE_LIMITS", {quota_class: (1000000.0, 1000000) for quota_class in config.RATE_LIMITS})
+        for name in CACHE_PATHS:
+            _patch(stack, config, name, environment[name])
+        _patch(stack, image_scoring_config, "GCS_BUCKET_NAME", "")
+        yield directory
+
+
+def prepare_agent(agent_name, mode):
+    """Import a root agent and point its models at stubs or cassettes for the mode."""
+    from benchmarks.stubs import install_stubs
+    from shared.cassettes import install_cassette_llms
+
+    root_agent = importlib.import_module(f"{agent_name}.agent").root_agent
+    if mode == "stub":
+        install_stubs(root_agent)
+    elif mode in ("record", "replay"):
+        install_cassette_llms(root_agent)
+    return root_agent
+
+
+async def run_case(runner, agent_name, index, run, case, mode):
+    from google.genai import types
+    from shared.cassettes import RECORD, REPLAY, use_cassette
+
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id="eval")
+    message = types.Content(role="user", parts=[types.Part(text=case["query"])])
+    tools = []
+    response = ""
+    error = None
+    start = time.perf_counter()
+
+    async def consume():
+        nonlocal response
+        async for event in runner.run_async(user_id="eval", session_id=session.id, new_message=message):
+            tools.extend(call.name for call in event.get_function_calls())
+            if event.content and event.content.parts:
+                text = "".join(part.text or "" for part in event.content.parts if not part.thought)
+                if text.strip():
+                    response = text
+
+    try:
+        if mode in ("record", "replay"):
+            with use_cassette(str(cassette_path(agent_name, index, run)), RECORD if mode == "record" else REPLAY):
+                await consume()
+        else:
+            await consume()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    return {
+        "agent": agent_name,
+        "case": index,
+        "run": run,
+        "query": case["query"],
+        "tools": tools,
+        "response": response[:500],
+        "tool_trajectory_avg_score": trajectory_score(case.get("expected_tool_use", []), tools),
+        "response_match_score": round(response_match_score(case.get("reference", ""), response), 3),
+        "seconds": round(time.perf_counter() - start, 3),
+        "error": error,
+    }
+
+
+async def run_sweep(agent_names=None, mode="stub", workers=8, runs=1):
+    """Run every case of the given agents `runs` times on a pool of `workers`; returns a report.
+
+    Stub and replay sweeps run under offline_settings().
+    """
+    if mode in ("stub", "replay"):
+        with offline_settings():
+            return await _run_sweep(agent_names, mode, workers, runs)
+    return await _run_sweep(agent_names, mode, workers, runs)
+
+
+async def _run_sweep(agent_names, mode, workers, runs):
+    from google.adk.runners import InMemoryRunner
+
+    semaphore = asyncio.Semaphore(workers)
+    jobs = []
+    criteria = {}
+    for agent_name in agent_names or DATASETS:
+        cases, criteria[agent_name] = load_dataset(agent_name)
+        runner = InMemoryRunner(agent=prepare_agent(agent_name, mode), app_name=agent_name)
+        for index, case in enumerate(cases):
+            for run in range(runs):
+                jobs.append((runner, agent_name, index, run, case))
+
+    async def limited(job):
+        async with semaphore:
+            return await run_case(*job, mode)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(limited(job) for job in jobs))
+    elapsed = time.perf_counter() - start
+
+    summary = {}
+    failures = []
+    for agent_name, agent_criteria in criteria.items():
+        agent_results = [result for result in results if result["agent"] == agent_name]
+        scores = {"errors": sum(1 for result in agent_results if result["error"])}
+        for metric in agent_criteria:
+            scores[metric] = round(sum(result[metric] for result in agent_results) / len(agent_results), 3)
+        summary[agent_name] = scores
+        if scores["errors"]:
+            failures.append(f"{agent_name}: {scores['errors']} runs failed")
+        for metric, threshold in agent_criteria.items():
+            # Scripted stub replies are not real answers, so only trajectories are gated in stub mode
+            if mode == "stub" and metric != "tool_trajectory_avg_score":
+                continue
+            if scores[metric] < threshold:
+                failures.append(f"{agent_name}: {metric} {scores[metric]} < {threshold}")
+
+    return {
+        "mode": mode,
+        "workers": workers,
+        "runs": runs,
+        "seconds": round(elapsed, 2),
+        "summary": summary,
+        "failures": failures,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agent", action="append", choices=sorted(DATASETS), help="Agent to evaluate (repeatable)")
+    parser.add_argument("--mode", default="stub", choices=MODES, help="Where model responses come from")
+    parser.add_argument("--workers", type=int, default=8, help="Cases run concurrently")
+    parser.add_argument("--runs", type=int, default=1, help="Runs per case")
+    parser.add_argument("--output", help="Write the full report as JSON to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_sweep(args.agent, args.mode, max(1, args.workers), max(1, args.runs)))
+    print(f"{len(report['results'])} runs in {report['seconds']}s ({args.mode}, {args.workers} workers)")
+    for agent_name, scores in report["summary"].items():
+        print(f"  {agent_name}: {scores}")
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"Report written to {args.output}")
+    for failure in report["failures"]:
+        print(f"FAIL {failure}")
+    if report["failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
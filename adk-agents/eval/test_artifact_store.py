@@ -0,0 +1,109 @@
+"""Local artifact store garbage collection and session retention."""
+
+import asyncio
+import os
+import time
+
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from shared import config, retention
+from shared.artifact_store import LocalArtifactService
+
+
+def _save(store, session_id, filename, data):
+    return asyncio.run(store.save_artifact(
+        app_name="app", user_id="user", session_id=session_id, filename=filename,
+        artifact=types.Part.from_bytes(data=data, mime_type="image/png"),
+    ))
+
+
+def _age(path, seconds):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_identical_payloads_share_one_blob(tmp_path):
+    store = LocalArtifactService(str(tmp_path))
+    _save(store, "s1", "a.png", b"same")
+    _save(store, "s2", "b.png", b"same")
+    assert store.stored_bytes() == 4
+    part = asyncio.run(store.load_artifact(app_name="app", user_id="user", session_id="s2", filename="b.png"))
+    assert part.inline_data.data == b"same"
+
+
+def test_gc_removes_only_old_unreferenced_blobs(tmp_path):
+    store = LocalArtifactService(str(tmp_path))
+    _save(store, "s1", "kept.png", b"kept")
+    _save(store, "s1", "dropped.png", b"dropped")
+    _save(store, "s1", "fresh.png", b"fresh")
+    for filename in ("dropped.png", "fresh.png"):
+        asyncio.run(store.delete_artifact(app_name="app", user_id="user", session_id="s1", filename=filename))
+    for blob in (b"kept", b"dropped"):
+        _age(store.blob_path(store._write_blob(blob)), 120)
+
+    result = store.collect_garbage()
+
+    assert result == {"evicted_versions": 0, "removed_blobs": 1, "freed_bytes": len(b"dropped")}
+    assert os.path.exists(store.blob_path(store._write_blob(b"kept")))
+    assert os.path.exists(store.blob_path(store._write_blob(b"fresh")))
+
+
+def test_dedup_hit_keeps_an_orphaned_blob_from_gc(tmp_path):
+    store = LocalArtifactService(str(tmp_path))
+    _save(store, "s1", "a.png", b"payload")
+    asyncio.run(store.delete_artifact(app_name="app", user_id="user", session_id="s1", filename="a.png"))
+    path = store.blob_path(store._write_blob(b"payload"))
+    _age(path, 120)
+
+    # A new save reuses the orphaned blob before its index row is written
+    store._write_blob(b"payload")
+    store.collect_garbage()
+
+    assert os.path.exists(path)
+
+
+def test_gc_evicts_oldest_session_versions_past_max_bytes(tmp_path):
+    store = LocalArtifactService(str(tmp_path))
+    _save(store, "s1", "old.png", b"o" * 100)
+    _save(store, "s1", "new.png", b"n" * 100)
+    _save(store, None, "user:avatar.png", b"u" * 100)
+    for directory, _, names in os.walk(store.blob_dir):
+        for name in names:
+            _age(os.path.join(directory, name), 120)
+
+    result = store.collect_garbage(max_bytes=250)
+
+    assert result["evicted_versions"] == 1
+    keys = asyncio.run(store.list_artifact_keys(app_name="app", user_id="user", session_id="s1"))
+    assert keys == ["new.png", "user:avatar.png"]
+    assert store.stored_bytes() == 200
+
+
+def test_retention_expires_idle_sessions_and_their_session_artifacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RETENTION_SESSION_HOURS", 1)
+    monkeypatch.setattr(config, "RETENTION_ARTIFACT_MAX_MB", 0)
+    sessions = InMemorySessionService()
+    store = LocalArtifactService(str(tmp_path))
+
+    async def run():
+        idle = await sessions.create_session(app_name="app", user_id="user", session_id="idle")
+        await sessions.create_session(app_name="app", user_id="user", session_id="active")
+        sessions.sessions["app"]["user"]["idle"].last_update_time = idle.last_update_time - 7200
+        for session_id in ("idle", "active"):
+            await store.save_artifact(app_name="app", user_id="user", session_id=session_id, filename="page.png",
+                                      artifact=types.Part.from_bytes(data=session_id.encode(), mime_type="image/png"))
+        await store.save_artifact(app_name="app", user_id="user", filename="user:profile.txt",
+                                  artifact=types.Part(text="kept"))
+        result = await retention.sweep(sessions, store, ["app"])
+        listed = await sessions.list_sessions(app_name="app")
+        idle_keys = await store.list_artifact_keys(app_name="app", user_id="user", session_id="idle")
+        active_keys = await store.list_artifact_keys(app_name="app", user_id="user", session_id="active")
+        return result, [session.id for session in listed.sessions], idle_keys, active_keys
+
+    result, remaining, idle_keys, active_keys = asyncio.run(run())
+
+    assert result["expired_sessions"] == 1
+    assert remaining == ["active"]
+    assert idle_keys == ["user:profile.txt"]
+    assert active_keys == ["page.png", "user:profile.txt"]
@@ -0,0 +1,46 @@
+"""Session cassettes are appended one call at a time and only replays are cached."""
+
+import asyncio
+
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from shared import cassettes
+from shared.cassettes import AGENT_TURN, RECORD, REPLAY, Cassette
+
+
+def _response(text):
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def test_append_mode_writes_each_call(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    cassette = Cassette(path, RECORD, append=True)
+    cassette.record(AGENT_TURN, "agent", "first", [_response("one")], [0.1])
+    assert len(cassettes._read_turns(path)) == 1
+
+    asyncio.run(cassette.record_async(AGENT_TURN, "agent", "second", [_response("two")], [0.2]))
+    assert [turn["fingerprint"] for turn in cassettes._read_turns(path)] == ["first", "second"]
+
+
+def test_later_invocation_extends_session_cassette(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    Cassette(path, RECORD, append=True).record(AGENT_TURN, "agent", "first", [_response("one")], [0.1])
+    later = Cassette(path, RECORD, append=True)
+    later.record(AGENT_TURN, "agent", "second", [_response("two")], [0.2])
+    later.save()
+
+    replay = Cassette(path, REPLAY)
+    assert replay.lookup(AGENT_TURN, "agent", "second")["responses"][0]["content"]["parts"][0]["text"] == "two"
+    assert replay.lookup(AGENT_TURN, "agent", "other")["fingerprint"] == "first"
+
+
+def test_recording_does_not_fill_replay_cache(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    Cassette(path, RECORD, append=True).record(AGENT_TURN, "agent", "first", [_response("one")], [0.1])
+    Cassette(path, RECORD, append=True)
+    assert path not in cassettes._loaded
+
+    Cassette(path, REPLAY)
+    assert path in cassettes._loaded
+    cassettes._loaded.pop(path)
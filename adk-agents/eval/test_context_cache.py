@@ -0,0 +1,114 @@
+"""Context-cache handles replace the static prefix of agent requests."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from shared import config, context_cache
+
+
+class _Caches:
+    def __init__(self):
+        self.created = []
+        self.updated = []
+
+    def create(self, model, config):
+        self.created.append(config)
+        return SimpleNamespace(name=f"cachedContents/{len(self.created)}", expire_time=None,
+                               usage_metadata=SimpleNamespace(total_token_count=5000))
+
+    def update(self, name, config):
+        self.updated.append(name)
+        return SimpleNamespace(expire_time=None)
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    caches = _Caches()
+    monkeypatch.setattr(config, "CONTEXT_CACHE_ENABLED", True)
+    monkeypatch.setattr(config, "CONTEXT_CACHE_MIN_TOKENS", 100)
+    for name in ("_entries", "_pending", "_uncacheable"):
+        monkeypatch.setattr(context_cache, name, {})
+    monkeypatch.setattr(context_cache, "get_genai_client", lambda: SimpleNamespace(caches=caches))
+    return caches
+
+
+def _request(instruction="Plan the worksheet for each grade. " * 20):
+    return LlmRequest(
+        model="gemini-2.0-flash",
+        contents=[types.Content(role="user", parts=[types.Part(text="grade 5 science")])],
+        config=types.GenerateContentConfig(
+            system_instruction=instruction,
+            tools=[types.Tool(function_declarations=[types.FunctionDeclaration(name="plan", description="Plan.")])],
+        ),
+    )
+
+
+def _send(request, agent_name="planner"):
+    context_cache._use_context_cache(SimpleNamespace(agent_name=agent_name), request)
+    return request
+
+
+def _run(*requests):
+    async def run():
+        sent = []
+        for request in requests:
+            sent.append(_send(request))
+            await context_cache.wait_for_context_caches()
+        return sent
+
+    return asyncio.run(run())
+
+
+def test_first_request_goes_uncached_and_later_ones_are_stripped(caches):
+    first, second = _run(_request(), _request())
+
+    assert first.config.cached_content is None and first.config.system_instruction
+    assert len(caches.created) == 1 and caches.created[0].system_instruction == first.config.system_instruction
+    assert second.config.cached_content == "cachedContents/1"
+    assert second.config.system_instruction is None
+    assert second.config.tools is None and second.config.tool_config is None
+    # The conversation itself is never part of the cached prefix
+    assert second.contents == first.contents
+
+
+def test_different_prefixes_get_their_own_handles(caches):
+    _, _, other = _run(_request(), _request(), _request("Check worksheet quality. " * 30))
+
+    assert other.config.cached_content is None
+    assert len(caches.created) == 2
+
+
+def test_short_prefix_is_never_cached(caches):
+    first, second = _run(_request("Be brief."), _request("Be brief."))
+
+    assert not caches.created
+    assert second.config.system_instruction == "Be brief." and second.config.cached_content is None
+
+
+def test_handle_near_expiry_is_refreshed_and_expired_one_replaced(caches, monkeypatch):
+    monkeypatch.setattr(config, "CONTEXT_CACHE_REFRESH_SECONDS", 300)
+    _run(_request())
+    entry = next(iter(context_cache._entries.values()))
+
+    entry.expire_time = time.time() + 120
+    refreshed, = _run(_request())
+    assert refreshed.config.cached_content == entry.name
+    assert caches.updated == [entry.name]
+
+    entry.expire_time = time.time() + 5
+    replaced, = _run(_request())
+    assert replaced.config.cached_content is None and replaced.config.system_instruction
+    assert len(caches.created) == 2
+
+
+def test_disabled_cache_leaves_requests_alone(caches, monkeypatch):
+    monkeypatch.setattr(config, "CONTEXT_CACHE_ENABLED", False)
+    first, second = _run(_request(), _request())
+
+    assert not caches.created
+    assert second.config.system_instruction and second.config.cached_content is None
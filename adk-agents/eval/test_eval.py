@@ -22,3 +22,12 @@ async def test_all():
         str(pathlib.Path(__file__).parent / "data"),
         num_runs=2,
     )
+
+
+@pytest.mark.asyncio
+async def test_offline_sweep():
+    """Every agent's dataset runs offline against scripted models with the expected tool trajectories."""
+    from parallel_eval import run_sweep
+
+    report = await run_sweep(mode="stub", workers=8)
+    assert not report["failures"], report["failures"]
@@ -0,0 +1,85 @@
+"""Gateway endpoints over the differentiated_materials pipeline with scripted models."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from parallel_eval import offline_settings, prepare_agent
+
+
+@pytest.fixture(scope="module")
+def client():
+    with offline_settings():
+        from gateway.app import create_app
+        from shared import config
+
+        prepare_agent("differentiated_materials", "stub")
+        retention = config.RETENTION_SWEEP_SECONDS
+        config.RETENTION_SWEEP_SECONDS = 0
+        try:
+            with TestClient(create_app(["differentiated_materials"])) as client:
+                yield client
+        finally:
+            config.RETENTION_SWEEP_SECONDS = retention
+
+
+def _run(client, **body):
+    response = client.post("/apps/differentiated_materials/run",
+                           json={"user_id": "teacher", "message": "Photosynthesis page for grades 5 and 7", **body})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_healthz_lists_served_agents(client):
+    assert client.get("/healthz").json() == {"status": "ok", "agents": ["differentiated_materials"]}
+
+
+def test_unknown_agent_is_404(client):
+    assert client.post("/apps/image_scoring/run", json={"user_id": "u", "message": "hi"}).status_code == 404
+    assert client.get("/apps/differentiated_materials/users/u/sessions/missing").status_code == 404
+
+
+def test_run_creates_a_session_and_returns_events(client):
+    result = _run(client)
+
+    calls = [part["functionCall"]["name"] for event in result["events"]
+             for part in (event.get("content") or {}).get("parts", []) if "functionCall" in part]
+    assert "generate_differentiated_worksheets" in calls
+    session = client.get(f"/apps/differentiated_materials/users/teacher/sessions/{result['session_id']}").json()
+    assert session["state"]["latest_generated_worksheets"]["worksheets"]
+
+
+def test_run_continues_an_existing_session(client):
+    created = client.post("/apps/differentiated_materials/users/teacher/sessions",
+                          json={"state": {"priority": "batch"}}).json()
+
+    result = _run(client, session_id=created["session_id"])
+
+    session = client.get(f"/apps/differentiated_materials/users/teacher/sessions/{created['session_id']}").json()
+    assert result["session_id"] == created["session_id"]
+    assert session["state"]["priority"] == "batch"
+
+
+def test_run_sse_streams_events_then_done(client):
+    with client.stream("POST", "/apps/differentiated_materials/run_sse",
+                       json={"user_id": "teacher", "message": "Photosynthesis page for grade 5"}) as response:
+        body = "".join(response.iter_text())
+
+    blocks = [block for block in body.split("\n\n") if block]
+    assert blocks[0].startswith("event: session")
+    assert blocks[-1].startswith("event: done")
+    assert not any(block.startswith("event: error") for block in blocks)
+    assert any(json.loads(block[len("data: "):]).get("author") for block in blocks[1:-1])
+
+
+def test_export_and_delete(client):
+    session_id = _run(client)["session_id"]
+    base = f"/apps/differentiated_materials/users/teacher/sessions/{session_id}"
+
+    docx = client.get(f"{base}/export", params={"format": "docx"})
+    assert docx.status_code == 200 and docx.content[:2] == b"PK"
+    assert client.get(f"{base}/export", params={"format": "odt"}).status_code == 400
+
+    assert client.delete(base).json() == {"deleted": session_id}
+    assert client.get(base).status_code == 404
@@ -0,0 +1,78 @@
+"""Guideline documents are parsed once, served read-only and hot-reloaded safely."""
+
+import json
+import os
+
+import pytest
+
+from shared.guidelines import GuidelineError, GuidelineStore, render_prompt_text
+
+
+def _write(path, data, mtime):
+    path.write_text(data if isinstance(data, str) else json.dumps(data), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "guidelines.json"
+    _write(path, {"Grades": {"5": "Short   sentences,\n simple words"}, "Tone": ["warm"]}, 1000)
+    store = GuidelineStore(reload_seconds=0.0001)
+    store.register("grades", str(path), required_keys=("Grades",))
+    return store, path
+
+
+def test_document_is_read_only_and_compact(document):
+    store, _ = document
+
+    data = store.data("grades")
+    with pytest.raises(TypeError):
+        data["Grades"]["5"] = "changed"
+    assert data["Tone"] == ("warm",)
+    assert store.prompt_text("grades") == '{"Grades":{"5":"Short sentences, simple words"},"Tone":["warm"]}'
+    assert store.get("grades") is store.get("grades")
+
+
+def test_changed_file_is_reloaded(document):
+    store, path = document
+    store.get("grades")
+
+    _write(path, {"Grades": {"5": "Updated"}}, 2000)
+
+    assert store.data("grades")["Grades"]["5"] == "Updated"
+
+
+@pytest.mark.parametrize("broken", ["{not json", json.dumps({"Tone": ["warm"]}), json.dumps([])])
+def test_broken_reload_keeps_the_previous_version(document, broken):
+    store, path = document
+    loaded = store.get("grades")
+
+    _write(path, broken, 2000)
+
+    assert store.get("grades") is loaded
+
+
+def test_missing_or_invalid_first_load_raises(tmp_path):
+    store = GuidelineStore()
+    store.register("missing", str(tmp_path / "missing.json"))
+    store.register("invalid", str(tmp_path / "invalid.json"), required_keys=("Grades",))
+    _write(tmp_path / "invalid.json", {"Tone": []}, 1000)
+
+    with pytest.raises(GuidelineError):
+        store.get("missing")
+    with pytest.raises(GuidelineError):
+        store.get("invalid")
+    with pytest.raises(KeyError):
+        store.get("unregistered")
+
+
+def test_shipped_documents_load():
+    from differentiated_materials.sub_agents.tools.fetch_grade_guidelines_tool import load_grade_guidelines
+    from hyper_local_content.sub_agents.tools.fetch_cultural_guidelines_tool import load_cultural_guidelines
+
+    assert load_grade_guidelines()
+    assert "Language Appropriateness" in load_cultural_guidelines()
+
+
+def test_render_prompt_text_collapses_whitespace_only_inside_values():
+    assert render_prompt_text({"a  b": " x \n  y "}) == '{"a  b":"x y"}'
@@ -0,0 +1,40 @@
+"""Open spans are closed when their agent, model call or tool fails."""
+
+import time
+from types import SimpleNamespace
+
+from shared import config, instrumentation
+
+
+def _context(invocation_id, agent_name="agent"):
+    return SimpleNamespace(invocation_id=invocation_id, agent_name=agent_name, state={})
+
+
+def test_stale_agent_spans_are_closed_as_errors(monkeypatch):
+    monkeypatch.setattr(config, "METRICS_SPAN_MAX_SECONDS", 60)
+    monkeypatch.setattr(instrumentation, "_open_spans", instrumentation.OrderedDict())
+    finished = []
+    monkeypatch.setattr(instrumentation.metrics, "write_span", finished.append)
+
+    # The agent of "failed" raised, so its after-callback never ran
+    instrumentation._before_agent(_context("failed"))
+    instrumentation._open_spans[("agent", "failed", "agent")]["_start"] -= 120
+    instrumentation._before_agent(_context("next"))
+
+    assert list(instrumentation._open_spans) == [("agent", "next", "agent")]
+    assert [(span["invocation_id"], span["status"]) for span in finished] == [("failed", "error")]
+
+
+def test_failed_tool_closes_its_span(monkeypatch):
+    monkeypatch.setattr(instrumentation, "_open_spans", instrumentation.OrderedDict())
+    finished = []
+    monkeypatch.setattr(instrumentation.metrics, "write_span", finished.append)
+    tool = SimpleNamespace(name="generate")
+    tool_context = SimpleNamespace(agent_name="agent", invocation_id="i1", function_call_id="call-1", state={})
+
+    instrumentation._before_tool(tool, {}, tool_context)
+    instrumentation._on_tool_error(tool, {}, tool_context, RuntimeError("boom"))
+
+    assert not instrumentation._open_spans
+    assert instrumentation._current_span.get() is None
+    assert finished[0]["name"] == "generate" and finished[0]["status"] == "error"
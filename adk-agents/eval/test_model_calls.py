@@ -0,0 +1,41 @@
+"""Tool-side model calls wait for quota and the model off the event loop."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from google.genai import types
+
+from shared import config, model_calls
+
+
+class _SlowModels:
+    def generate_content(self, model, contents, config=None):
+        time.sleep(0.3)
+        return types.GenerateContentResponse(candidates=[types.Candidate(
+            content=types.Content(role="model", parts=[types.Part(text=f"answer to {contents}")])
+        )])
+
+
+def test_generate_content_async_keeps_the_event_loop_free(monkeypatch):
+    monkeypatch.setattr(config, "RESPONSE_STORE_ENABLED", False)
+    monkeypatch.setattr(model_calls, "get_genai_client", lambda: SimpleNamespace(models=_SlowModels()))
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        response = await model_calls.generate_content_async("test-model", "question")
+        task.cancel()
+        return response, ticks
+
+    response, ticks = asyncio.run(run())
+
+    assert response.text == "answer to question"
+    assert ticks >= 10
@@ -0,0 +1,64 @@
+"""Sampled tool profiles are written, merged and never left running."""
+
+import glob
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from shared import config, profiling
+
+
+def _tool_context(call_id):
+    return SimpleNamespace(function_call_id=call_id, session=SimpleNamespace(id="session/1"))
+
+
+def _busy():
+    return sum(i * i for i in range(20000))
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_TOOLS", ["plan"])
+    monkeypatch.setattr(config, "PROFILE_SAMPLE_PERCENT", 100.0)
+    monkeypatch.setattr(config, "PROFILE_MEMORY", True)
+    monkeypatch.setattr(config, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "_active", {})
+    return tmp_path
+
+
+def test_sampled_call_is_dumped_and_merged(profile_dir):
+    tool = SimpleNamespace(name="plan")
+    for call_id in ("call-1", "call-2"):
+        profiling._before_tool(tool, {}, _tool_context(call_id))
+        _busy()
+        profiling._after_tool(tool, {}, _tool_context(call_id), {"status": "success"})
+
+    profiles = sorted(glob.glob(os.path.join(profile_dir, "plan", "*.prof")))
+    memory = sorted(glob.glob(os.path.join(profile_dir, "plan", "*.mem.json")))
+    assert [os.path.basename(path) for path in profiles] == ["session_1-call-1.prof", "session_1-call-2.prof"]
+    assert len(memory) == 2
+
+    stats = profiling.merge_profiles(profiles)
+    assert any(function[2] == "_busy" for function in stats.stats)
+    assert profiling.merge_memory(memory)["samples"] == 2
+
+
+def test_unselected_tools_are_not_profiled(profile_dir):
+    tool = SimpleNamespace(name="other")
+    profiling._before_tool(tool, {}, _tool_context("call-1"))
+
+    assert not profiling._active
+    assert not os.listdir(profile_dir)
+
+
+def test_failed_call_releases_the_profiler(profile_dir):
+    tool = SimpleNamespace(name="plan")
+    profiling._before_tool(tool, {}, _tool_context("failed"))
+    profiling._on_tool_error(tool, {}, _tool_context("failed"), RuntimeError("boom"))
+
+    assert not profiling._active
+    profiling._before_tool(tool, {}, _tool_context("next"))
+    assert profiling._active
+    profiling._after_tool(tool, {}, _tool_context("next"), {})
+    assert len(glob.glob(os.path.join(profile_dir, "plan", "*.prof"))) == 2
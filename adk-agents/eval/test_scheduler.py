@@ -0,0 +1,94 @@
+"""Priority classes, batch reserve and weighted fair share of the model scheduler."""
+
+import asyncio
+
+import pytest
+
+from shared import config
+from shared.scheduler import BATCH, INTERACTIVE, FairScheduler, SchedulerOverloadedError
+
+
+class _Bucket:
+    """Token bucket that only refills when the test adds tokens."""
+
+    def __init__(self, tokens=0):
+        self.tokens = tokens
+
+    def try_acquire(self, keep=0):
+        if self.tokens >= 1 + keep:
+            self.tokens -= 1
+            return 0.0
+        return 1.0
+
+
+def _grant_order(scheduler, tickets, tokens):
+    """Add tokens one at a time and return the (priority, tenant) of each ticket granted."""
+    order = []
+    waiting = list(tickets)
+    for _ in range(tokens):
+        scheduler.bucket.tokens += 1
+        with scheduler._lock:
+            scheduler._dispatch()
+        for ticket in [ticket for ticket in waiting if ticket.granted]:
+            waiting.remove(ticket)
+            order.append((ticket.priority, ticket.tenant))
+    return order
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(config, "SCHEDULER_BATCH_RESERVE", 0)
+    monkeypatch.setattr(config, "SCHEDULER_TENANT_WEIGHTS", {})
+    return FairScheduler("test", _Bucket())
+
+
+def test_interactive_goes_before_earlier_batch(scheduler):
+    tickets = [scheduler._enqueue(BATCH, "a"), scheduler._enqueue(BATCH, "b"), scheduler._enqueue(INTERACTIVE, "c")]
+
+    order = _grant_order(scheduler, tickets, 3)
+
+    assert order == [(INTERACTIVE, "c"), (BATCH, "a"), (BATCH, "b")]
+
+
+def test_tenants_share_by_weight(scheduler, monkeypatch):
+    monkeypatch.setattr(config, "SCHEDULER_TENANT_WEIGHTS", {"heavy": 2.0})
+    tickets = [scheduler._enqueue(INTERACTIVE, "light") for _ in range(4)]
+    tickets += [scheduler._enqueue(INTERACTIVE, "heavy") for _ in range(8)]
+
+    order = _grant_order(scheduler, tickets, 6)
+
+    # A tenant that queued a burst first does not starve the other, and weight 2 gets twice the share
+    assert [tenant for _, tenant in order].count("heavy") == 4
+    assert [tenant for _, tenant in order].count("light") == 2
+
+
+def test_batch_leaves_reserve_for_interactive(scheduler, monkeypatch):
+    monkeypatch.setattr(config, "SCHEDULER_BATCH_RESERVE", 2)
+    scheduler.bucket.tokens = 2
+    batch = scheduler._enqueue(BATCH, "a")
+    with scheduler._lock:
+        scheduler._dispatch()
+    assert not batch.granted
+
+    interactive = scheduler._enqueue(INTERACTIVE, "b")
+    with scheduler._lock:
+        scheduler._dispatch()
+    assert interactive.granted and not batch.granted
+
+
+def test_full_queue_rejects(scheduler, monkeypatch):
+    monkeypatch.setattr(config, "SCHEDULER_QUEUE_LIMITS", {INTERACTIVE: (1, 30.0), BATCH: (1, 600.0)})
+    scheduler._enqueue(INTERACTIVE, "a")
+
+    with pytest.raises(SchedulerOverloadedError):
+        scheduler._enqueue(INTERACTIVE, "b")
+    assert scheduler.counts[INTERACTIVE]["rejected"] == 1
+
+
+def test_waiter_past_its_deadline_is_rejected(scheduler, monkeypatch):
+    monkeypatch.setattr(config, "SCHEDULER_QUEUE_LIMITS", {INTERACTIVE: (10, 0.05), BATCH: (10, 0.05)})
+
+    with pytest.raises(SchedulerOverloadedError):
+        asyncio.run(scheduler.acquire(INTERACTIVE, "a"))
+    assert scheduler.queued[INTERACTIVE] == 0
+
@@ -0,0 +1,43 @@
+"""Near-duplicate content is only reused for requests about the same subject."""
+
+import pytest
+
+from hyper_local_content.sub_agents.generation.tools.content_generation_tool import semantic_cache_partition
+from shared.semantic_cache import SemanticCache
+
+
+def _partition(request):
+    language_context = {
+        'detected_language': 'english',
+        'target_audience': 'grade 5 students',
+        'original_request': request,
+    }
+    content_plan = {'cultural_region': 'India (General)', 'content_type': 'story', 'educational_topic': 'general'}
+    return semantic_cache_partition(language_context, content_plan)
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache('test', capacity=16, dimensions=1024, threshold=0.88)
+
+
+@pytest.mark.parametrize('cached, requested', [
+    ('Create a story about the water cycle for grade 5 students in Kerala',
+     'Create a story about the rock cycle for grade 5 students in Kerala'),
+    ('Create a story about water conservation for grade 5 students',
+     'Create a story about soil conservation for grade 5 students'),
+    ('Create a story about farmers and the monsoon for grade 5 students',
+     'Create a story about fishermen and the monsoon for grade 5 students'),
+])
+def test_distinct_topics_do_not_hit(cache, cached, requested):
+    cache.insert(cached, _partition(cached), {'main_content': cached})
+    value, _ = cache.lookup(requested, _partition(requested))
+    assert value is None
+
+
+def test_reworded_request_hits(cache):
+    cached = 'Create a story about black soil for farmers for grade 5'
+    requested = 'Create a story about black soil for farmers in grade 5'
+    cache.insert(cached, _partition(cached), {'main_content': 'black soil story'})
+    value, _ = cache.lookup(requested, _partition(requested))
+    assert value == {'main_content': 'black soil story'}
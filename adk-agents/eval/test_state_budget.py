@@ -0,0 +1,89 @@
+"""Per-iteration payloads are offloaded to artifacts, evicted and restored."""
+
+import asyncio
+
+import pytest
+from google.adk.agents import LoopAgent
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from shared import config
+from shared.state_budget import enforce_state_budget, is_offloaded, load_state_value, truncate_text
+from shared.tool_stage import ToolStage
+
+
+def _payload(iteration):
+    return {"iteration": iteration, "worksheets": {"grade_5": "question " * 200}}
+
+
+def generate(tool_context: ToolContext) -> dict:
+    """Write this iteration's payload the way the generation tools do."""
+    iteration = tool_context.state.get("iteration", 0)
+    tool_context.state[f"generated_worksheets_{iteration}"] = _payload(iteration)
+    tool_context.state["small_note_0"] = "kept inline"
+    return {"status": "success"}
+
+
+async def restore(tool_context: ToolContext) -> dict:
+    """Read the payload back and move on to the next iteration."""
+    iteration = tool_context.state.get("iteration", 0)
+    restored = await load_state_value(tool_context, f"generated_worksheets_{iteration}")
+    tool_context.state[f"restored_{iteration}"] = restored == _payload(iteration)
+    tool_context.state["iteration"] = iteration + 1
+    if iteration + 1 >= 3:
+        tool_context.actions.escalate = True
+    return {"status": "success"}
+
+
+def _run(agent):
+    async def run():
+        runner = InMemoryRunner(agent=agent, app_name="test")
+        session = await runner.session_service.create_session(app_name="test", user_id="user")
+        message = types.Content(role="user", parts=[types.Part(text="start")])
+        async for _ in runner.run_async(user_id="user", session_id=session.id, new_message=message):
+            pass
+        session = await runner.session_service.get_session(app_name="test", user_id="user", session_id=session.id)
+        keys = await runner.artifact_service.list_artifact_keys(app_name="test", user_id="user", session_id=session.id)
+        return session.state, keys
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    monkeypatch.setattr(config, "STATE_INLINE_MAX_BYTES", 512)
+    monkeypatch.setattr(config, "STATE_KEEP_ITERATIONS", 1)
+
+
+def test_payloads_are_offloaded_evicted_and_restored(budget):
+    stage = ToolStage(name="stage", steps=[(generate, None), (restore, None)], after_tool_callback=enforce_state_budget)
+
+    state, artifacts = _run(LoopAgent(name="loop", max_iterations=5, sub_agents=[stage]))
+
+    assert state["iteration"] == 3
+    assert all(state[f"restored_{iteration}"] for iteration in range(3))
+    # Only the latest STATE_KEEP_ITERATIONS previous references stay in state
+    assert state["generated_worksheets_0"] is None
+    assert is_offloaded(state["generated_worksheets_1"]) and is_offloaded(state["generated_worksheets_2"])
+    assert state["generated_worksheets_2"]["artifact"] == "state_generated_worksheets_2.json"
+    assert state["small_note_0"] == "kept inline"
+    assert set(artifacts) == {f"state_generated_worksheets_{iteration}.json" for iteration in range(3)}
+
+
+def test_small_payloads_stay_inline(budget, monkeypatch):
+    monkeypatch.setattr(config, "STATE_INLINE_MAX_BYTES", 1_000_000)
+    stage = ToolStage(name="stage", steps=[(generate, None), (restore, None)], after_tool_callback=enforce_state_budget)
+
+    state, artifacts = _run(LoopAgent(name="loop", max_iterations=5, sub_agents=[stage]))
+
+    assert state["generated_worksheets_2"] == _payload(2)
+    assert all(state[f"restored_{iteration}"] for iteration in range(3))
+    assert not artifacts
+
+
+def test_truncate_text_caps_echoed_text(monkeypatch):
+    monkeypatch.setattr(config, "STATE_TEXT_MAX_CHARS", 5)
+
+    assert truncate_text("short") == "short"
+    assert truncate_text("much longer") == "much …"
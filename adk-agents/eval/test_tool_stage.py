@@ -0,0 +1,103 @@
+"""ToolStage tool calls, state and escalation inside a LoopAgent."""
+
+import asyncio
+
+from google.adk.agents import LoopAgent
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from differentiated_materials import config as worksheet_config
+from differentiated_materials.fast_path import FAST_STAGES
+from shared.tool_stage import ToolStage, find_value
+
+
+def count_round(tool_context: ToolContext) -> dict:
+    """Count one loop round."""
+    rounds = tool_context.state.get("rounds", 0) + 1
+    tool_context.state["rounds"] = rounds
+    return {"status": "success", "message": f"round {rounds}", "result": {"rounds": rounds}}
+
+
+def check_rounds(tool_context: ToolContext, rounds: int) -> dict:
+    """Stop the loop after the second round."""
+    if rounds >= 2:
+        tool_context.actions.escalate = True
+        return {"status": "success", "message": "done"}
+    return {"status": "success", "message": "again"}
+
+
+def after_check(tool_context: ToolContext) -> dict:
+    """Must not run once the check has escalated."""
+    tool_context.state["after_check"] = tool_context.state.get("after_check", 0) + 1
+    return {"status": "success"}
+
+
+def _rounds(ctx, responses):
+    return {"rounds": find_value(responses, "rounds") or ctx.session.state.get("rounds", 0)}
+
+
+def _run(agent, text="start", state=None):
+    async def run():
+        runner = InMemoryRunner(agent=agent, app_name="test")
+        session = await runner.session_service.create_session(app_name="test", user_id="user", state=state)
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        events = [event async for event in runner.run_async(user_id="user", session_id=session.id, new_message=message)]
+        session = await runner.session_service.get_session(app_name="test", user_id="user", session_id=session.id)
+        return events, session.state
+
+    return asyncio.run(run())
+
+
+def _calls(events):
+    return [call.name for event in events for call in event.get_function_calls()]
+
+
+def test_escalation_stops_the_loop_and_the_stage():
+    loop = LoopAgent(name="loop", max_iterations=5, sub_agents=[
+        ToolStage(name="counter", steps=[(count_round, None)], output_key="counter_output"),
+        ToolStage(name="checker", steps=[(check_rounds, _rounds), (after_check, None)]),
+    ])
+
+    events, state = _run(loop)
+
+    assert state["rounds"] == 2
+    assert _calls(events) == ["count_round", "check_rounds", "after_check", "count_round", "check_rounds"]
+    assert state["after_check"] == 1
+    assert state["counter_output"] == "round 2"
+    assert events[-1].actions.escalate
+
+
+def test_stage_emits_calls_and_responses_like_an_llm_agent():
+    stage = ToolStage(name="counter", steps=[(count_round, None)], output_key="counter_output")
+
+    events, state = _run(stage)
+
+    call = events[0].get_function_calls()[0]
+    response = events[1].get_function_responses()[0]
+    assert call.name == response.name == "count_round" and call.id == response.id
+    assert response.response["result"] == {"rounds": 1}
+    assert events[-1].content.parts[0].text == "round 1"
+    assert state["counter_output"] == "round 1"
+
+
+def test_worksheet_checker_stage_ends_the_loop_at_max_iterations():
+    checker = ToolStage(name="worksheet_quality_checker_agent",
+                        steps=FAST_STAGES["worksheet_quality_checker_agent"])
+    loop = LoopAgent(name="loop", max_iterations=10, sub_agents=[checker])
+
+    events, state = _run(loop, state={"worksheet_quality_score": 0})
+
+    assert state["worksheet_iteration"] == worksheet_config.MAX_WORKSHEET_ITERATIONS
+    assert len(_calls(events)) == worksheet_config.MAX_WORKSHEET_ITERATIONS
+
+
+def test_worksheet_checker_stage_escalates_once_quality_is_met():
+    checker = ToolStage(name="worksheet_quality_checker_agent",
+                        steps=FAST_STAGES["worksheet_quality_checker_agent"])
+    loop = LoopAgent(name="loop", max_iterations=10, sub_agents=[checker])
+
+    events, state = _run(loop, state={"worksheet_quality_score": worksheet_config.WORKSHEET_QUALITY_THRESHOLD})
+
+    assert state["worksheet_iteration"] == 1
+    assert events[-1].actions.escalate
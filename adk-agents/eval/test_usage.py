@@ -0,0 +1,44 @@
+"""Usage ledger budgets and bounded per-user totals."""
+
+import pytest
+
+from shared import config, usage
+from shared.usage import BudgetExceededError, UsageLedger
+
+
+def test_user_totals_expire_with_the_window():
+    ledger = UsageLedger(max_sessions=10, window_seconds=3600)
+    ledger.record("gemini-2.0-flash", prompt_tokens=100, output_tokens=50, session=("app", "u1", "s1"))
+    assert ledger.user_tokens_used("u1") == 150
+
+    ledger._users["u1"]["start"] -= 3600
+    assert ledger.user_tokens_used("u1") == 0
+    assert "u1" not in ledger._users
+
+    ledger.record("gemini-2.0-flash", prompt_tokens=10, session=("app", "u1", "s2"))
+    assert ledger.user_tokens_used("u1") == 10
+
+
+def test_least_recently_active_users_are_dropped():
+    ledger = UsageLedger(max_sessions=10, max_users=2)
+    for user_id in ("u1", "u2", "u1", "u3"):
+        ledger.record("gemini-2.0-flash", prompt_tokens=1, session=("app", user_id, f"s-{user_id}"))
+    assert list(ledger._users) == ["u1", "u3"]
+
+
+def test_user_budget_spans_sessions(monkeypatch):
+    monkeypatch.setattr(usage, "ledger", UsageLedger(max_sessions=10))
+    monkeypatch.setattr(config, "USAGE_SESSION_TOKEN_BUDGET", 1000)
+    monkeypatch.setattr(config, "USAGE_USER_TOKEN_BUDGET", 300)
+    for session_id in ("s1", "s2"):
+        usage.ledger.record("gemini-2.0-flash", prompt_tokens=150, session=("app", "u1", session_id))
+
+    token = usage._current_session.set(("app", "u1", "s3"))
+    try:
+        with pytest.raises(BudgetExceededError) as raised:
+            usage.check_budget()
+        assert raised.value.user_id == "u1" and raised.value.used == 300
+        usage._current_session.set(("app", "u2", "s4"))
+        usage.check_budget()
+    finally:
+        usage._current_session.reset(token)
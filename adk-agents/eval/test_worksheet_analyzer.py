@@ -0,0 +1,105 @@
+"""Structural worksheet scores of real template output against the quality threshold."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from differentiated_materials import config
+from differentiated_materials.sub_agents.tools.worksheet_analyzer import (
+    WORKSHEET_WEIGHTS,
+    analyze_worksheet,
+    score_worksheet,
+    score_worksheet_set,
+)
+from differentiated_materials.sub_agents.validation.tools.worksheet_validation_tool import validate_worksheet_quality
+from differentiated_materials.sub_agents.worksheet_generation.tools.worksheet_generation_tool import (
+    generate_with_enhanced_template,
+)
+from differentiated_materials.sub_agents.worksheet_generation.tools.worksheet_templates import (
+    render_worksheet,
+    select_template,
+)
+from differentiated_materials.sub_agents.worksheet_planning.tools.worksheet_planning_tool import (
+    create_grade_specific_plan,
+)
+
+
+def _worksheets(subject, concepts, grades):
+    return {
+        f"grade_{grade}": generate_with_enhanced_template(
+            grade, create_grade_specific_plan(grade, subject, concepts, [], {}, {}), "", concepts, subject
+        )
+        for grade in grades
+    }
+
+
+@pytest.mark.parametrize("subject, concepts, grades, passes", [
+    ("science", ["photosynthesis", "chlorophyll"], [3, 5], True),
+    ("science", ["photosynthesis", "chlorophyll"], [5, 7, 9], True),
+    ("science", ["reproduction", "flower"], [9, 11], True),
+    ("english", ["grammar"], [5, 7, 9], True),
+    ("mathematics", ["fractions"], [3, 5], True),
+    ("social_studies", ["history"], [5, 7, 9], True),
+    # The high-school mathematics template has three questions and reads below its grade
+    ("mathematics", ["fractions"], [9, 11], False),
+    # Without concepts the general template has too few questions of too few kinds
+    ("science", [], [5, 7, 9], False),
+])
+def test_template_worksheets_against_threshold(subject, concepts, grades, passes):
+    total, per_grade = score_worksheet_set(_worksheets(subject, concepts, grades), grades)
+
+    assert set(per_grade) == {f"grade_{grade}" for grade in grades}
+    assert (total >= config.WORKSHEET_QUALITY_THRESHOLD) is passes, (total, per_grade)
+
+
+def test_missing_grade_costs_coverage_points():
+    worksheets = _worksheets("science", ["reproduction", "flower"], [5, 7, 9])
+    full, _ = score_worksheet_set(worksheets, [5, 7, 9])
+    partial, _ = score_worksheet_set({"grade_5": worksheets["grade_5"]}, [5, 7, 9])
+
+    assert full >= config.WORKSHEET_QUALITY_THRESHOLD > partial
+
+
+@pytest.mark.parametrize("grade, level", [(3, "elementary"), (7, "middle"), (10, "high")])
+def test_photosynthesis_template_structure(grade, level):
+    template = select_template("science", ["photosynthesis"])
+    analysis = analyze_worksheet(render_worksheet(template, grade, level, {}, ["photosynthesis"], "science"), grade)
+    score, breakdown = score_worksheet(analysis)
+
+    assert template == "photosynthesis"
+    assert analysis["title_grade"] == grade and analysis["has_name_date"]
+    assert breakdown["header"] == WORKSHEET_WEIGHTS["header"]
+    assert breakdown["parts"] == WORKSHEET_WEIGHTS["parts"]
+    assert analysis["answer_key"] or analysis["assessment_rubric"]
+    assert 0 < score <= sum(WORKSHEET_WEIGHTS.values())
+
+
+def test_title_for_another_grade_loses_header_points():
+    content = render_worksheet("photosynthesis", 7, "middle", {}, ["photosynthesis"], "science")
+    _, own = score_worksheet(analyze_worksheet(content, 7))
+    _, other = score_worksheet(analyze_worksheet(content, 3))
+
+    assert own["header"] - other["header"] == 2
+
+
+def test_empty_worksheet_scores_nothing():
+    score, breakdown = score_worksheet(analyze_worksheet("", 5))
+
+    assert score == 0
+    assert not any(breakdown.values())
+
+
+def test_cached_analysis_is_not_shared_through_session_state():
+    content = render_worksheet("photosynthesis", 7, "middle", {}, ["photosynthesis"], "science")
+    worksheets = {"grade_7": {"content": content, "grade_level": 7}}
+    states = [{"latest_generated_worksheets": {"worksheets": worksheets, "target_grades": [7]}} for _ in range(2)]
+    for state in states:
+        validate_worksheet_quality(SimpleNamespace(state=state))
+
+    first, second = (state["worksheet_validation_results"]["per_grade"]["grade_7"] for state in states)
+    first["question_types"]["tampered"] = 99
+
+    assert "tampered" not in second["question_types"]
+    assert "tampered" not in analyze_worksheet(content, 7)["question_types"]
+    with pytest.raises(TypeError):
+        analyze_worksheet(content, 7)["question_types"]["tampered"] = 99
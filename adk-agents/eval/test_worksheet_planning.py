@@ -0,0 +1,27 @@
+"""Grade plans handed to sessions never share mutable values."""
+
+from differentiated_materials.sub_agents.worksheet_planning.tools.worksheet_planning_tool import (
+    create_grade_specific_plan,
+    get_grade_plan_copy,
+)
+
+
+def test_grade_plan_copies_are_independent():
+    first = get_grade_plan_copy(7, "science")
+    first["question_distribution"]["multiple_choice"] = 99
+    first["assessment_criteria"].clear()
+    first["content_adaptations"]["support_materials"].append("mutated")
+
+    second = get_grade_plan_copy(7, "science")
+
+    assert second["question_distribution"].get("multiple_choice") != 99
+    assert second["assessment_criteria"]
+    assert "mutated" not in second["content_adaptations"]["support_materials"]
+
+
+def test_session_plans_do_not_share_nested_values():
+    plans = [create_grade_specific_plan(5, "math", ["fractions"], [], {}, {}) for _ in range(2)]
+    for key, value in plans[0].items():
+        if isinstance(value, (dict, list)):
+            assert value is not plans[1][key], key
+    assert plans[0] == plans[1]
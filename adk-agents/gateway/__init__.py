@@ -0,0 +1,2 @@
+# HTTP gateway serving all agent pipelines from one process
+from .app import create_app
@@ -0,0 +1,13 @@
+import uvicorn
+
+from shared import config
+from .app import create_app
+
+
+def main():
+    # One worker: agents, sessions and caches live in this process
+    uvicorn.run(create_app(), host=config.GATEWAY_HOST, port=config.GATEWAY_PORT)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Async HTTP gateway for the image_scoring, hyper_local_content and
+differentiated_materials pipelines.
+
+Every root agent is imported once at startup; all runners share one session
+service, one artifact service and the process-wide model clients, so a warm
+process serves mixed traffic without building agents per request.
+
+Run with:
+    python -m gateway
+"""
+
+import asyncio
+import importlib
+import json
+import os
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from pydantic import BaseModel
+
+from shared import config
+from shared.artifact_store import LocalArtifactService
+from shared.context_cache import context_cache_status
+from shared.retention import run_retention, sweep
+from shared.scheduler import scheduler_status
+from shared.usage import ledger
+from shared.warmup import warm_up_async
+
+AGENT_MODULES = {
+    "image_scoring": "image_scoring.agent",
+    "hyper_local_content": "hyper_local_content.agent",
+    "differentiated_materials": "differentiated_materials.agent",
+}
+
+
+class SessionRequest(BaseModel):
+    session_id: str | None = None
+    state: dict | None = None
+
+
+class RunRequest(BaseModel):
+    user_id: str
+    session_id: str | None = None
+    message: str
+    state_delta: dict | None = None
+
+
+def create_session_service():
+    """Session service shared by every served agent."""
+    if config.GATEWAY_SESSION_BACKEND == "memory":
+        return InMemorySessionService()
+    if config.GATEWAY_SESSION_BACKEND == "sqlite":
+        # Needs the aiosqlite package
+        from google.adk.sessions.sqlite_session_service import SqliteSessionService
+
+        os.makedirs(os.path.dirname(os.path.abspath(config.SESSION_DB_PATH)), exist_ok=True)
+        return SqliteSessionService(config.SESSION_DB_PATH)
+    raise ValueError(f"Unknown session backend: {config.GATEWAY_SESSION_BACKEND}")
+
+
+def create_artifact_service():
+    """Artifact service shared by every served agent."""
+    if config.GATEWAY_ARTIFACT_BACKEND == "memory":
+        return InMemoryArtifactService()
+    if config.GATEWAY_ARTIFACT_BACKEND == "local":
+        return LocalArtifactService(config.ARTIFACT_DIR)
+    raise ValueError(f"Unknown artifact backend: {config.GATEWAY_ARTIFACT_BACKEND}")
+
+
+def load_runners(agent_names, session_service, artifact_service) -> dict:
+    """Import each root agent once and wrap it in a runner on the shared services."""
+    runners = {}
+    for name in agent_names:
+        if name not in AGENT_MODULES:
+            raise ValueError(f"Unknown agent: {name}")
+        root_agent = importlib.import_module(AGENT_MODULES[name]).root_agent
+        runners[name] = Runner(
+            app_name=name,
+            agent=root_agent,
+            session_service=session_service,
+            artifact_service=artifact_service,
+        )
+        print(f"Gateway loaded {name}")
+    return runners
+
+
+def _event_json(event) -> str:
+    return event.model_dump_json(exclude_none=True, by_alias=True)
+
+
+def create_app(agent_names=None) -> FastAPI:
+    """Build the gateway app serving the given agents (default GATEWAY_AGENTS or all)."""
+    session_service = create_session_service()
+    artifact_service = create_artifact_service()
+    runners = load_runners(agent_names or config.GATEWAY_AGENTS or list(AGENT_MODULES),
+                           session_service, artifact_service)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Serve only once every pipeline has been preloaded and exercised
+        for runner in runners.values():
+            await warm_up_async(runner.agent, session_service, artifact_service)
+        retention = None
+        if config.RETENTION_SWEEP_SECONDS > 0:
+            retention = asyncio.create_task(run_retention(session_service, artifact_service, list(runners)))
+        yield
+        if retention is not None:
+            retention.cancel()
+            with suppress(asyncio.CancelledError):
+                await retention
+
+    app = FastAPI(title="Sahayak agent gateway", lifespan=lifespan)
+    app.state.runners = runners
+    app.state.session_service = session_service
+    app.state.artifact_service = artifact_service
+
+    def get_runner(app_name: str) -> Runner:
+        runner = runners.get(app_name)
+        if runner is None:
+            raise HTTPException(status_code=404, detail=f"Agent {app_name} is not served here")
+        return runner
+
+    async def get_session_or_404(app_name: str, user_id: str, session_id: str):
+        session = await session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+        return session
+
+    async def prepare_run(app_name: str, request: RunRequest):
+        """Return (runner, session id, user message), creating a session when none is given."""
+        runner = get_runner(app_name)
+        if request.session_id:
+            await get_session_or_404(app_name, request.user_id, request.session_id)
+            session_id = request.session_id
+        else:
+            session = await session_service.create_session(app_name=app_name, user_id=request.user_id)
+            session_id = session.id
+        message = types.Content(role="user", parts=[types.Part(text=request.message)])
+        return runner, session_id, message
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok", "agents": sorted(runners)}
+
+    @app.post("/apps/{app_name}/users/{user_id}/sessions")
+    async def create_session(app_name: str, user_id: str, request: SessionRequest | None = None):
+        get_runner(app_name)
+        request = request or SessionRequest()
+        session = await session_service.create_session(
+            app_name=app_name, user_id=user_id, session_id=request.session_id, state=request.state
+        )
+        return {"session_id": session.id, "state": session.state}
+
+    @app.get("/apps/{app_name}/users/{user_id}/sessions/{session_id}")
+    async def get_session(app_name: str, user_id: str, session_id: str):
+        session = await get_session_or_404(app_name, user_id, session_id)
+        return {"session_id": session.id, "state": session.state, "last_update_time": session.last_update_time}
+
+    @app.delete("/apps/{app_name}/users/{user_id}/sessions/{session_id}")
+    async def delete_session(app_name: str, user_id: str, session_id: str):
+        await session_service.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        return {"deleted": session_id}
+
+    @app.post("/apps/{app_name}/run")
+    async def run(app_name: str, request: RunRequest):
+        """Run the pipeline to completion and return every event."""
+        runner, session_id, message = await prepare_run(app_name, request)
+        events = []
+        async for event in runner.run_async(
+            user_id=request.user_id, session_id=session_id, new_message=message, state_delta=request.state_delta
+        ):
+            events.append(event.model_dump(mode="json", exclude_none=True, by_alias=True))
+        return {"session_id": session_id, "events": events}
+
+    @app.post("/apps/{app_name}/run_sse")
+    async def run_sse(app_name: str, request: RunRequest):
+        """Stream agent events as server-sent events while the pipeline runs."""
+        runner, session_id, message = await prepare_run(app_name, request)
+
+        async def stream():
+            yield f"event: session\ndata: {json.dumps({'session_id': session_id})}\n\n"
+            try:
+                async for event in runner.run_async(
+                    user_id=request.user_id,
+                    session_id=session_id,
+                    new_message=message,
+                    state_delta=request.state_delta,
+                    run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+                ):
+                    yield f"data: {_event_json(event)}\n\n"
+            except Exception as e:
+                print(f"Gateway run failed for {app_name}/{session_id}: {e}")
+                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    @app.get("/usage/sessions/{session_id}")
+    async def session_usage(session_id: str):
+        return ledger.session_summary(session_id)
+
+    @app.get("/context_caches")
+    async def context_caches():
+        return context_cache_status()
+
+    @app.get("/scheduler")
+    async def scheduler():
+        return scheduler_status()
+
+    @app.post("/retention/sweep")
+    async def retention_sweep():
+        """Run a retention pass now instead of waiting for the next scheduled one."""
+        return await sweep(session_service, artifact_service, list(runners))
+
+    if "differentiated_materials" in runners:
+        from differentiated_materials.export import EXPORT_FORMATS, UnsupportedTextError, iter_session_export
+
+        @app.get("/apps/differentiated_materials/users/{user_id}/sessions/{session_id}/export")
+        async def export_worksheets(user_id: str, session_id: str, format: str = "pdf"):
+            """Stream the session's latest worksheets as PDF or DOCX."""
+            if format not in EXPORT_FORMATS:
+                raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+            session = await get_session_or_404("differentiated_materials", user_id, session_id)
+            _, media_type = EXPORT_FORMATS[format]
+            try:
+                chunks = iter_session_export(session.state, format)
+            except UnsupportedTextError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+            return StreamingResponse(
+                chunks,
+                media_type=media_type,
+                headers={"Content-Disposition": f'attachment; filename="worksheets-{session_id}.{format}"'},
+            )
+
+    return app
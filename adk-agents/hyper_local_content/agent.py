@@ -5,8 +5,17 @@ from .sub_agents.planning.planning_agent import content_planning_agent
 from .sub_agents.generation.generation_agent import content_generation_agent
 from .sub_agents.validation.validation_agent import cultural_validation_agent
 from .checker_agent import content_quality_checker_agent
+from .fast_path import FAST_STAGES
 from google.adk.agents import SequentialAgent, LoopAgent
 from google.adk.agents.callback_context import CallbackContext
+from shared.cassettes import apply_cassettes
+from shared.context_cache import apply_context_cache
+from shared.instrumentation import instrument_agent_tree
+from shared.profiling import profile_tools
+from shared.scheduler import apply_scheduler
+from shared.tool_stage import fast_path
+from shared.usage import track_usage
+from shared.state_budget import apply_state_budget
 
 
 def set_content_session(callback_context: CallbackContext):
@@ -29,6 +38,7 @@ def set_content_session(callback_context: CallbackContext):
 # The process continues until either:
 # - The content quality score meets the threshold
 # - The maximum number of iterations is reached
+# With FAST_PATH_ENABLED the pure-Python stages run their tools without a model turn.
 
 hyper_local_content_generation_agent = SequentialAgent(
     name="hyper_local_content_generation_agent",
@@ -42,10 +52,10 @@ hyper_local_content_generation_agent = SequentialAgent(
         """
     ),
     sub_agents=[
-        language_detection_agent, 
-        content_planning_agent, 
+        fast_path(language_detection_agent, FAST_STAGES),
+        fast_path(content_planning_agent, FAST_STAGES),
         content_generation_agent, 
-        cultural_validation_agent
+        fast_path(cultural_validation_agent, FAST_STAGES)
     ],
 )
 
@@ -59,10 +69,40 @@ hyper_local_content = LoopAgent(
     description="Repeatedly runs content generation process and checks quality until threshold is met.",
     sub_agents=[
         hyper_local_content_generation_agent,  # First, run the sequential content generation process
-        content_quality_checker_agent,  # Second, check the quality and potentially stop the loop
+        fast_path(content_quality_checker_agent, FAST_STAGES),  # Second, check the quality and potentially stop the loop
     ],
     before_agent_callback=set_content_session,
 )
 
 # Export root agent (following same pattern as image_scoring)
 root_agent = hyper_local_content
+
+# Token and cost ledger per session
+track_usage(root_agent)
+
+# Per-tool and per-agent spans, only when METRICS_ENABLED is set
+instrument_agent_tree(root_agent)
+
+# Sampled tool profiles, only when PROFILE_TOOLS is set
+profile_tools(root_agent)
+
+# Priority and fair-share queueing of model calls, only when SCHEDULER_ENABLED is set
+apply_scheduler(root_agent)
+
+# Per-session model traffic recording, only when CASSETTE_MODE=record
+apply_cassettes(root_agent)
+
+# Cached static prompt prefixes, only when CONTEXT_CACHE_ENABLED is set
+apply_context_cache(root_agent)
+
+# Move per-iteration payloads out of session state into artifacts
+apply_state_budget(root_agent)
+
+
+def preload():
+    """Load cultural guidelines and the content cache before the first request."""
+    from shared.semantic_cache import get_semantic_cache
+    from .sub_agents.tools.fetch_cultural_guidelines_tool import load_cultural_guidelines
+
+    load_cultural_guidelines()
+    get_semantic_cache('hyper_local_content')
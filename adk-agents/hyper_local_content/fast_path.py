@@ -0,0 +1,28 @@
+"""Tool steps of the stages that skip their model turn when FAST_PATH_ENABLED is set.
+
+Content generation keeps its model turn; see shared/tool_stage.py.
+"""
+
+from shared.tool_stage import find_value, user_text
+from .sub_agents.language.tools.language_detection_tool import detect_language_and_context
+from .sub_agents.planning.tools.content_planning_tool import plan_content_structure
+from .sub_agents.tools.fetch_cultural_guidelines_tool import get_cultural_guidelines
+from .sub_agents.validation.tools.cultural_validation_tool import validate_cultural_appropriateness
+from .sub_agents.validation.tools.set_content_score_tool import set_content_quality_score
+from .tools.quality_condition_tool import check_content_quality_condition
+
+
+def _request_text(ctx, responses):
+    return {"request_text": user_text(ctx)}
+
+
+def _validation_score(ctx, responses):
+    return {"quality_score": find_value(responses, "total_score") or 0}
+
+
+FAST_STAGES = {
+    "language_detection_agent": [(detect_language_and_context, _request_text), (get_cultural_guidelines, None)],
+    "content_planning_agent": [(plan_content_structure, None)],
+    "cultural_validation_agent": [(validate_cultural_appropriateness, None), (set_content_quality_score, _validation_score)],
+    "content_quality_checker_agent": [(check_content_quality_condition, None)],
+}
@@ -1,17 +1,14 @@
 from google.adk.tools import ToolContext
-from google import genai
 from .... import config
+from shared.circuit_breaker import CircuitOpenError
+from shared.model_calls import generate_content_async, store_response
+from shared.rate_limiter import is_rate_limit_error
+from shared.semantic_cache import get_semantic_cache, normalize_text
 import json
-import time
-import random
+import re
 
-# Initialize Gemini client (following same pattern as image_generation_tool)
-client = genai.Client(
-    vertexai=True
-)
 
-
-def generate_educational_content(tool_context: ToolContext) -> dict:
+async def generate_educational_content(tool_context: ToolContext) -> dict:
     """Generates educational content based on the planned structure."""
     
     try:
@@ -29,11 +26,26 @@ def generate_educational_content(tool_context: ToolContext) -> dict:
         learning_objectives = content_plan.get('learning_objectives', [])
         cultural_references = content_plan.get('cultural_references', [])
         
-        # Generate content using Gemini based on type and structure
-        generated_content = generate_content_with_gemini(
-            educational_topic, cultural_region, detected_language,
-            content_type, structure, cultural_references, original_request
-        )
+        # A paraphrase of a request whose content already passed validation reuses that content;
+        # refinement iterations always generate afresh
+        iteration_count = tool_context.state.get("content_iteration", 0)
+        cache = get_semantic_cache('hyper_local_content')
+        generated_content = None
+        if cache is not None and original_request and iteration_count == 0:
+            generated_content, similarity = cache.lookup(
+                original_request, semantic_cache_partition(language_context, content_plan)
+            )
+            if generated_content is not None:
+                print(f"Reusing content from a near-duplicate request (similarity {similarity:.2f})")
+                generated_content['semantic_cache_hit'] = True
+        
+        if generated_content is None:
+            # Generate content using Gemini based on type and structure
+            generated_content = await generate_content_with_gemini(
+                educational_topic, cultural_region, detected_language,
+                content_type, structure, cultural_references, original_request,
+                refresh=iteration_count > 0
+            )
         
         # Add metadata
         generated_content.update({
@@ -49,7 +61,6 @@ def generate_educational_content(tool_context: ToolContext) -> dict:
         })
         
         # Store generated content
-        iteration_count = tool_context.state.get("content_iteration", 0)
         tool_context.state[f'generated_content_{iteration_count}'] = generated_content
         tool_context.state['latest_generated_content'] = generated_content
         
@@ -66,8 +77,77 @@ def generate_educational_content(tool_context: ToolContext) -> dict:
         }
 
 
-def generate_content_with_gemini(topic, region, language, content_type, structure, cultural_refs, original_request):
-    """Generate content using Gemini API with proper language support."""
+# Words that describe the request rather than its subject
+REQUEST_FILLER_WORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'on', 'in', 'for', 'about', 'to', 'with', 'from', 'by', 'at', 'into',
+    'how', 'what', 'why', 'is', 'are', 'please', 'me', 'my', 'our', 'their', 'some', 'simple', 'short',
+    'create', 'write', 'make', 'generate', 'give', 'tell', 'explain', 'describe', 'teach',
+    'story', 'stories', 'explanation', 'dialogue', 'lesson', 'example', 'examples',
+    'grade', 'class', 'std', 'standard', 'student', 'students', 'children', 'kids', 'level',
+}
+
+
+def request_topic_words(request_text):
+    """Subject words of a request, lightly normalised so plurals and word order don't matter."""
+    words = set()
+    for word in re.findall(r'\w+', normalize_text(request_text)):
+        if word.isdigit() or word in REQUEST_FILLER_WORDS:
+            continue
+        if word.isascii() and len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        words.add(word)
+    return frozenset(words)
+
+
+def semantic_cache_partition(language_context, content_plan):
+    """Requests only match within the same language, region, audience, content type and topic words.
+
+    educational_topic alone is too coarse (the water cycle and the rock cycle are both
+    "general"), so the subject words of the request have to match exactly as well.
+    """
+    return (
+        language_context.get('detected_language', 'english'),
+        content_plan.get('cultural_region', 'India'),
+        language_context.get('target_audience', 'students'),
+        content_plan.get('content_type', 'story'),
+        content_plan.get('educational_topic', 'general'),
+        request_topic_words(language_context.get('original_request', '')),
+    )
+
+
+def cache_validated_content(tool_context: ToolContext) -> None:
+    """Keep the latest generated content in the semantic cache and response store once it passed validation."""
+    language_context = tool_context.state.get('language_context', {})
+    content_plan = tool_context.state.get('content_plan', {})
+    content = tool_context.state.get('latest_generated_content') or {}
+    original_request = language_context.get('original_request', '')
+    if content.get('generation_method') != 'ai_generated' or content.get('semantic_cache_hit'):
+        return
+    
+    cache = get_semantic_cache('hyper_local_content')
+    if cache is not None and original_request:
+        cache.insert(original_request, semantic_cache_partition(language_context, content_plan), content)
+    
+    # Same prompt as generate_content_with_gemini built for this content
+    from google.genai import types
+    prompt = create_content_generation_prompt(
+        content_plan.get('educational_topic', 'general'), content_plan.get('cultural_region', 'India'),
+        language_context.get('detected_language', 'english'), content_plan.get('content_type', 'story'),
+        content_plan.get('structure', {}), content_plan.get('cultural_references', []), original_request
+    )
+    response = types.GenerateContentResponse(candidates=[types.Candidate(
+        content=types.Content(role='model', parts=[types.Part(text=content['main_content'])])
+    )])
+    store_response(config.GENAI_MODEL, prompt, response)
+
+
+async def generate_content_with_gemini(topic, region, language, content_type, structure, cultural_refs, original_request,
+                                 refresh=False):
+    """Generate content using Gemini API with proper language support.
+
+    refresh=True (refinement iterations) bypasses the response store, which
+    would otherwise hand back the answer that just failed validation.
+    """
     
     try:
         # Create detailed prompt for content generation
@@ -75,11 +155,9 @@ def generate_content_with_gemini(topic, region, language, content_type, structur
             topic, region, language, content_type, structure, cultural_refs, original_request
         )
         
-        # Generate content using Gemini
-        response = client.models.generate_content(
-            model=config.GENAI_MODEL,
-            contents=prompt
-        )
+        # Generate content using Gemini; identical prompts are served from the response store,
+        # which only holds content that passed validation (see cache_validated_content)
+        response = await generate_content_async(config.GENAI_MODEL, prompt, cache=True, refresh=refresh, store=False)
         
         # Extract generated content
         if response.candidates and len(response.candidates) > 0:
@@ -100,12 +178,16 @@ def generate_content_with_gemini(topic, region, language, content_type, structur
             print("No candidates in Gemini response, falling back to enhanced template")
             return generate_enhanced_template_content(topic, region, language, content_type, structure, cultural_refs, original_request)
             
+    except CircuitOpenError as e:
+        # Vertex is degraded; skip the call entirely and answer from templates
+        print(f"{e} - using enhanced template generation")
+        return generate_enhanced_template_content(topic, region, language, content_type, structure, cultural_refs, original_request)
+        
     except Exception as e:
         error_msg = str(e)
         print(f"Gemini generation failed: {error_msg}")
         
-        # Check if it's a rate limit error and provide helpful message
-        if "429" in error_msg or "RESOURCE_EXHAUSTED" in error_msg:
+        if is_rate_limit_error(e):
             print("Rate limit hit - using enhanced template generation instead")
         
         # Always fallback to enhanced template generation
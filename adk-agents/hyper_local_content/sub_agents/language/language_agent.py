@@ -11,5 +11,5 @@ language_detection_agent = Agent(
     description="Detects the language and cultural context of the input request",
     instruction=LANGUAGE_DETECTION_PROMPT,
     tools=[detect_language_and_context, get_cultural_guidelines],
-    output_key="language_context",
+    output_key="language_context_summary",
 )
@@ -1,4 +1,5 @@
 from google.adk.tools import ToolContext
+from shared.state_budget import truncate_text
 import re
 import json
 
@@ -74,6 +75,12 @@ def detect_language_and_context(request_text: str, tool_context: ToolContext) ->
     elif any(word in request_lower for word in ['science', 'विज्ञान', 'विज्ञान']):
         educational_topic = "science"
     
+    # Grade or class the content is for ("grade 3", "class 9", "कक्षा ५", "इयत्ता ४")
+    grade_level = None
+    grade_match = re.search(r'(?:grade|class|std\.?|standard|कक्षा|इयत्ता)\s*(\d{1,2})\b', request_lower)
+    if grade_match:
+        grade_level = int(grade_match.group(1))
+    
     # Determine cultural region based on language
     cultural_regions = {
         'hindi': 'North India',
@@ -92,10 +99,11 @@ def detect_language_and_context(request_text: str, tool_context: ToolContext) ->
         'detected_language': detected_language,
         'content_type': content_type,
         'educational_topic': educational_topic,
-        'original_request': request_text,
+        'original_request': truncate_text(request_text),
         'cultural_region': cultural_regions.get(detected_language, 'India'),
         'script_confidence': script_confidence,
-        'target_audience': 'students'  # can be enhanced
+        'grade_level': grade_level,
+        'target_audience': f'grade {grade_level} students' if grade_level else 'students'
     }
     
     # Store in session state
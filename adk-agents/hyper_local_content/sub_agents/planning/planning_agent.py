@@ -10,5 +10,5 @@ content_planning_agent = Agent(
     description="Plans the structure and approach for culturally relevant content",
     instruction=CONTENT_PLANNING_PROMPT,
     tools=[plan_content_structure],
-    output_key="content_plan",
+    output_key="content_plan_summary",
 )
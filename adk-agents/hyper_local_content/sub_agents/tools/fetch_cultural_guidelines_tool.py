@@ -1,14 +1,18 @@
 import os
 
+from shared.guidelines import guidelines
+
+# Parsed once and reloaded only when the file changes
+GUIDELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../cultural_guidelines.json")
+guidelines.register("cultural_guidelines", GUIDELINES_FILE, required_keys=("Language Appropriateness",))
+
+
+def load_cultural_guidelines():
+    """Return the parsed, read-only cultural guidelines."""
+    return guidelines.data("cultural_guidelines")
+
 
 def get_cultural_guidelines():
-    """Fetch cultural guidelines from the JSON file."""
-    # Get the directory where the current script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    # Construct the full path to the cultural guidelines file
-    guidelines_file_path = os.path.join(script_dir, "../../cultural_guidelines.json")
-
-    with open(guidelines_file_path, "r") as file:
-        guidelines_text = file.read()
-    guidelines_data = {"cultural_guidelines": guidelines_text}
+    """Fetch cultural guidelines as compact JSON."""
+    guidelines_data = {"cultural_guidelines": guidelines.prompt_text("cultural_guidelines")}
     return guidelines_data
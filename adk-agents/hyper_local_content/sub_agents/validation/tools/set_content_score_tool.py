@@ -1,10 +1,14 @@
 from google.adk.tools import ToolContext
+from .... import config
+from ...generation.tools.content_generation_tool import cache_validated_content
 
 
 def set_content_quality_score(tool_context: ToolContext, quality_score: int) -> str:
     """Set the content quality score in the session state."""
     print(f"Content quality score is {quality_score}")
     tool_context.state["content_quality_score"] = quality_score
+    if quality_score >= config.CONTENT_QUALITY_THRESHOLD:
+        cache_validated_content(tool_context)
     
     return {
         'status': 'success',
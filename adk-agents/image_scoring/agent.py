@@ -6,6 +6,12 @@ from .sub_agents.scoring import scoring_images_prompt
 from .checker_agent import checker_agent_instance
 from google.adk.agents import SequentialAgent, LoopAgent
 from google.adk.agents.callback_context import CallbackContext
+from shared.cassettes import apply_cassettes
+from shared.context_cache import apply_context_cache
+from shared.instrumentation import instrument_agent_tree
+from shared.profiling import profile_tools
+from shared.scheduler import apply_scheduler
+from shared.usage import track_usage
 
 
 def set_session(callback_context: CallbackContext):
@@ -58,3 +64,28 @@ image_scoring = LoopAgent(
     before_agent_callback=set_session,
 )
 root_agent = image_scoring
+
+# Token and cost ledger per session
+track_usage(root_agent)
+
+# Per-tool and per-agent spans, only when METRICS_ENABLED is set
+instrument_agent_tree(root_agent)
+
+# Sampled tool profiles, only when PROFILE_TOOLS is set
+profile_tools(root_agent)
+
+# Priority and fair-share queueing of model calls, only when SCHEDULER_ENABLED is set
+apply_scheduler(root_agent)
+
+# Per-session model traffic recording, only when CASSETTE_MODE=record
+apply_cassettes(root_agent)
+
+# Cached static prompt prefixes, only when CONTEXT_CACHE_ENABLED is set
+apply_context_cache(root_agent)
+
+
+def preload():
+    """Load the scoring policy before the first request."""
+    from .sub_agents.tools.fetch_policy_tool import load_policy
+
+    load_policy()
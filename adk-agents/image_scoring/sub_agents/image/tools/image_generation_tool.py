@@ -1,24 +1,20 @@
 from datetime import datetime
-from google import genai
 from google.genai import types
 from google.adk.tools import ToolContext
-from google.cloud import storage
+from shared.model_calls import generate_images as generate_images_call
+from shared.model_clients import get_storage_client
 from .... import config
 
 
-client = genai.Client(
-    vertexai=True
-)
-
-
 async def generate_images(imagen_prompt: str, tool_context: ToolContext):
 
     try:
 
-        response = client.models.generate_images(
-            model="imagen-3.0-generate-002",
-            prompt=imagen_prompt,
-            config=types.GenerateImagesConfig(
+        # Teachers submitting the same prompt at once share one Imagen call
+        response = await generate_images_call(
+            config.IMAGEN_MODEL,
+            imagen_prompt,
+            types.GenerateImagesConfig(
                 number_of_images=1,
                 aspect_ratio="9:16",
                 safety_filter_level="block_low_and_above",
@@ -59,13 +55,12 @@ async def generate_images(imagen_prompt: str, tool_context: ToolContext):
             }
 
     except Exception as e:
-
         return {"status": "error", "message": "No images generated.  {e}"}
 
 
 def save_to_gcs(tool_context: ToolContext, image_bytes, filename: str, counter: str):
     # --- Save to GCS ---
-    storage_client = storage.Client()  # Initialize GCS client
+    storage_client = get_storage_client()
     bucket_name = config.GCS_BUCKET_NAME
 
     unique_id = tool_context.state.get("unique_id", "")
@@ -1,13 +1,17 @@
 import os
 
+from shared.guidelines import guidelines
+
+# Parsed once and reloaded only when the file changes
+POLICY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../policy.json")
+guidelines.register("policy", POLICY_FILE, required_keys=("General Guidelines",))
+
+
+def load_policy():
+    """Return the parsed, read-only scoring policy."""
+    return guidelines.data("policy")
+
 
 def get_policy():
-    # Get the directory where the current script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    # Construct the full path to the policy file
-    policy_file_path = os.path.join(script_dir, "../../policy.json")
-
-    with open(policy_file_path, "r") as file:
-        policy_text = file.read()
-    policy_text_file = {"policy_text": policy_text}
+    policy_text_file = {"policy_text": guidelines.prompt_text("policy")}
     return policy_text_file
@@ -0,0 +1,15 @@
+from vertexai.preview.reasoning_engines import AdkApp
+
+from .warmup import warm_up
+
+
+class WarmAdkApp(AdkApp):
+    """AdkApp that warms its agent up during container init, before serving requests."""
+
+    def __init__(self, *, agent, **kwargs):
+        super().__init__(agent=agent, **kwargs)
+        self.warmup_agent = agent
+
+    def set_up(self):
+        super().set_up()
+        warm_up(self.warmup_agent)
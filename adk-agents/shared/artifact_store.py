@@ -0,0 +1,311 @@
+"""Content-addressed artifact storage on the local filesystem.
+
+LocalArtifactService implements ADK's artifact service for self-hosted runs.
+Payloads (image bytes, text) are written once under blobs/<sha256>, so the
+same image saved by several sessions or iterations takes disk space once, and
+a SQLite index maps (app, user, session, filename, version) to the digest.
+Nothing is held in process memory between calls; a load reads the blob back
+from disk. Parts without a payload (artifact references, file URIs) are
+stored in the index as JSON.
+
+collect_garbage() deletes blobs no version refers to anymore and, past
+max_bytes, the oldest session-scoped versions; retention.py calls it
+periodically.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Union
+
+from google.adk.artifacts import artifact_util
+from google.adk.artifacts.base_artifact_service import ArtifactVersion, BaseArtifactService, ensure_part
+from google.adk.errors.input_validation_error import InputValidationError
+from google.genai import types
+
+from . import config
+
+# Index rows of user-scoped artifacts ("user:" filenames) use this session id
+USER_SCOPE = ""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    digest TEXT,
+    size INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    mime_type TEXT,
+    part TEXT,
+    custom_metadata TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, filename, version)
+);
+CREATE INDEX IF NOT EXISTS artifacts_digest ON artifacts (digest);
+CREATE INDEX IF NOT EXISTS artifacts_create_time ON artifacts (create_time);
+"""
+
+
+def _scope(filename: str, session_id: Optional[str]) -> str:
+    if filename.startswith("user:"):
+        return USER_SCOPE
+    if session_id is None:
+        raise InputValidationError("Session ID must be provided for session-scoped artifacts.")
+    artifact_util.validate_path_segment(session_id, "session_id")
+    return session_id
+
+
+class LocalArtifactService(BaseArtifactService):
+    """Artifact service over a directory of hash-named blobs and a SQLite index."""
+
+    def __init__(self, root: str = None):
+        self.root = os.path.abspath(root or config.ARTIFACT_DIR)
+        self.blob_dir = os.path.join(self.root, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self.root, "index.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    # --- blobs ---------------------------------------------------------------
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _write_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        # Reuse the blob, and mark it fresh so garbage collection spares it until the index row exists
+        with self._lock:
+            try:
+                os.utime(path)
+                return digest
+            except FileNotFoundError:
+                pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as blob_file:
+            blob_file.write(data)
+        os.replace(temporary, path)
+        return digest
+
+    def read_blob(self, digest: str) -> bytes:
+        with open(self.blob_path(digest), "rb") as blob_file:
+            return blob_file.read()
+
+    # --- index ---------------------------------------------------------------
+
+    def _save(self, app_name, user_id, filename, artifact, session_id, custom_metadata) -> int:
+        artifact_util.validate_path_segment(app_name, "app_name")
+        artifact_util.validate_path_segment(user_id, "user_id")
+        scope = _scope(filename, session_id)
+        part = ensure_part(artifact)
+
+        digest, size, part_json = None, 0, None
+        if part.inline_data is not None:
+            kind, mime_type = "bytes", part.inline_data.mime_type
+            data = part.inline_data.data or b""
+        elif part.text is not None:
+            kind, mime_type = "text", "text/plain"
+            data = part.text.encode("utf-8")
+        else:
+            kind, data = "part", None
+            mime_type = part.file_data.mime_type if part.file_data is not None and not artifact_util.is_artifact_ref(part) else None
+            part_json = part.model_dump_json(exclude_none=True)
+        if data is not None:
+            digest, size = self._write_blob(data), len(data)
+
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT MAX(version) FROM artifacts WHERE app_name=? AND user_id=? AND session_id=? AND filename=?",
+                (app_name, user_id, scope, filename),
+            ).fetchone()
+            version = 0 if row[0] is None else row[0] + 1
+            self._db.execute(
+                "INSERT INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (app_name, user_id, scope, filename, version, digest, size, kind, mime_type, part_json,
+                 json.dumps(custom_metadata or {}), time.time()),
+            )
+        return version
+
+    def _row(self, app_name, user_id, filename, session_id, version):
+        scope = _scope(filename, session_id)
+        query = ("SELECT version, digest, kind, mime_type, part, custom_metadata, create_time FROM artifacts"
+                 " WHERE app_name=? AND user_id=? AND session_id=? AND filename=?")
+        params = [app_name, user_id, scope, filename]
+        if version is None:
+            query += " ORDER BY version DESC LIMIT 1"
+        else:
+            query += " AND version=?"
+            params.append(version)
+        with self._lock:
+            return self._db.execute(query, params).fetchone()
+
+    def _load(self, app_name, user_id, filename, session_id, version, remaining_depth) -> Optional[types.Part]:
+        row = self._row(app_name, user_id, filename, session_id, version)
+        if row is None:
+            return None
+        _, digest, kind, mime_type, part_json, _, _ = row
+        if kind == "bytes":
+            return types.Part.from_bytes(data=self.read_blob(digest), mime_type=mime_type)
+        if kind == "text":
+            return types.Part(text=self.read_blob(digest).decode("utf-8"))
+
+        part = types.Part.model_validate_json(part_json)
+        if artifact_util.is_artifact_ref(part):
+            reference = artifact_util.resolve_artifact_reference(
+                file_uri=part.file_data.file_uri, app_name=app_name, user_id=user_id,
+                session_id=session_id, remaining_depth=remaining_depth,
+            )
+            return self._load(reference.app_name, reference.user_id, reference.filename,
+                              reference.session_id, reference.version, remaining_depth - 1)
+        if part == types.Part() or artifact_util._is_rewind_tombstone(part):
+            return None
+        return part
+
+    def _artifact_version(self, app_name, user_id, filename, session_id, row) -> ArtifactVersion:
+        version, _, _, mime_type, _, custom_metadata, create_time = row
+        if filename.startswith("user:"):
+            location = f"users/{user_id}/artifacts/{filename}"
+        else:
+            location = f"users/{user_id}/sessions/{session_id}/artifacts/{filename}"
+        return ArtifactVersion(
+            version=version,
+            canonical_uri=f"file://{self.root}/apps/{app_name}/{location}/versions/{version}",
+            custom_metadata=json.loads(custom_metadata),
+            create_time=create_time,
+            mime_type=mime_type,
+        )
+
+    def _versions(self, app_name, user_id, filename, session_id) -> list:
+        scope = _scope(filename, session_id)
+        with self._lock:
+            return self._db.execute(
+                "SELECT version, digest, kind, mime_type, part, custom_metadata, create_time FROM artifacts"
+                " WHERE app_name=? AND user_id=? AND session_id=? AND filename=? ORDER BY version",
+                (app_name, user_id, scope, filename),
+            ).fetchall()
+
+    def _keys(self, app_name, user_id, session_id) -> list:
+        scopes = [USER_SCOPE] if session_id is None else [USER_SCOPE, session_id]
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT DISTINCT filename FROM artifacts WHERE app_name=? AND user_id=?"
+                f" AND session_id IN ({','.join('?' * len(scopes))})",
+                [app_name, user_id, *scopes],
+            ).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def _delete(self, app_name, user_id, filename, session_id) -> None:
+        scope = _scope(filename, session_id)
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM artifacts WHERE app_name=? AND user_id=? AND session_id=? AND filename=?",
+                (app_name, user_id, scope, filename),
+            )
+
+    # --- BaseArtifactService -------------------------------------------------
+
+    async def save_artifact(self, *, app_name: str, user_id: str, filename: str,
+                            artifact: Union[types.Part, dict[str, Any]], session_id: Optional[str] = None,
+                            custom_metadata: Optional[dict[str, Any]] = None) -> int:
+        return await asyncio.to_thread(self._save, app_name, user_id, filename, artifact, session_id, custom_metadata)
+
+    async def load_artifact(self, *, app_name: str, user_id: str, filename: str,
+                            session_id: Optional[str] = None, version: Optional[int] = None) -> Optional[types.Part]:
+        return await asyncio.to_thread(self._load, app_name, user_id, filename, session_id, version,
+                                       artifact_util._MAX_ARTIFACT_REFERENCE_DEPTH)
+
+    async def list_artifact_keys(self, *, app_name: str, user_id: str, session_id: Optional[str] = None) -> list[str]:
+        return await asyncio.to_thread(self._keys, app_name, user_id, session_id)
+
+    async def delete_artifact(self, *, app_name: str, user_id: str, filename: str,
+                              session_id: Optional[str] = None) -> None:
+        await asyncio.to_thread(self._delete, app_name, user_id, filename, session_id)
+
+    async def list_versions(self, *, app_name: str, user_id: str, filename: str,
+                            session_id: Optional[str] = None) -> list[int]:
+        rows = await asyncio.to_thread(self._versions, app_name, user_id, filename, session_id)
+        return [row[0] for row in rows]
+
+    async def list_artifact_versions(self, *, app_name: str, user_id: str, filename: str,
+                                     session_id: Optional[str] = None) -> list[ArtifactVersion]:
+        rows = await asyncio.to_thread(self._versions, app_name, user_id, filename, session_id)
+        return [self._artifact_version(app_name, user_id, filename, session_id, row) for row in rows]
+
+    async def get_artifact_version(self, *, app_name: str, user_id: str, filename: str,
+                                   session_id: Optional[str] = None,
+                                   version: Optional[int] = None) -> Optional[ArtifactVersion]:
+        row = await asyncio.to_thread(self._row, app_name, user_id, filename, session_id, version)
+        return None if row is None else self._artifact_version(app_name, user_id, filename, session_id, row)
+
+    # --- retention -----------------------------------------------------------
+
+    def stored_bytes(self) -> int:
+        total = 0
+        for directory, _, names in os.walk(self.blob_dir):
+            for name in names:
+                total += os.path.getsize(os.path.join(directory, name))
+        return total
+
+    def collect_garbage(self, max_bytes: int = None) -> dict:
+        """Delete unreferenced blobs, then the oldest session-scoped versions while over max_bytes."""
+        evicted = 0
+        if max_bytes:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT digest, size FROM artifacts WHERE digest IS NOT NULL GROUP BY digest"
+                ).fetchall()
+            sizes = dict(rows)
+            total = sum(sizes.values())
+            while total > max_bytes:
+                with self._lock, self._db:
+                    oldest = self._db.execute(
+                        "SELECT rowid, digest FROM artifacts WHERE session_id != ? AND digest IS NOT NULL"
+                        " ORDER BY create_time LIMIT 1",
+                        (USER_SCOPE,),
+                    ).fetchone()
+                    if oldest is None:
+                        break
+                    self._db.execute("DELETE FROM artifacts WHERE rowid=?", (oldest[0],))
+                    still_used = self._db.execute(
+                        "SELECT 1 FROM artifacts WHERE digest=? LIMIT 1", (oldest[1],)
+                    ).fetchone()
+                evicted += 1
+                if still_used is None:
+                    total -= sizes[oldest[1]]
+
+        with self._lock:
+            referenced = {row[0] for row in self._db.execute("SELECT DISTINCT digest FROM artifacts WHERE digest IS NOT NULL")}
+        removed = freed = 0
+        for directory, _, names in os.walk(self.blob_dir):
+            for name in names:
+                if name in referenced or name.endswith(".tmp"):
+                    continue
+                path = os.path.join(directory, name)
+                # Saves insert their index row under the lock, so check and delete under it too
+                with self._lock:
+                    if self._db.execute("SELECT 1 FROM artifacts WHERE digest=? LIMIT 1", (name,)).fetchone():
+                        continue
+                    try:
+                        # A blob written or reused for a save whose index row isn't committed yet
+                        if time.time() - os.path.getmtime(path) < 60:
+                            continue
+                        size = os.path.getsize(path)
+                        os.remove(path)
+                    except FileNotFoundError:
+                        continue
+                freed += size
+                removed += 1
+        return {"evicted_versions": evicted, "removed_blobs": removed, "freed_bytes": freed}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
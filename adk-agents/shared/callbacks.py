@@ -0,0 +1,20 @@
+def add_callback(agent, field: str, callback) -> None:
+    """Run callback before any callback already set on agent.<field>.
+
+    Going first means an existing callback that returns an override cannot
+    skip ours; our callbacks return None so the existing ones still run.
+    """
+    existing = getattr(agent, field)
+    if existing is None:
+        setattr(agent, field, callback)
+    elif isinstance(existing, list):
+        setattr(agent, field, [callback, *existing])
+    else:
+        setattr(agent, field, [callback, existing])
+
+
+def walk_agents(agent):
+    """Yield an agent and all of its sub-agents, depth first."""
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from walk_agents(sub_agent)
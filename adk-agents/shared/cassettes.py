@@ -0,0 +1,281 @@
+"""Record and replay of model traffic.
+
+Two boundaries are covered: CassetteLlm wraps the model of every LlmAgent,
+and the shared model_calls gateway consults the active cassette for
+generate_content and generate_images. With no cassette active everything
+calls the real model. Inside use_cassette() calls are either recorded
+(request fingerprint, response, timing) or served back without touching the
+model, with the original or scaled timing. A call is matched by its
+fingerprint, falling back to the next recorded call of the same agent or
+model when the request differs (e.g. by a session id in state).
+
+Cassettes are JSON lines, gzip-compressed when the path ends in .gz. With
+CASSETTE_MODE=record every session of an agent tree set up by
+apply_cassettes() is recorded to CASSETTE_DIR/<app>/<session id>.jsonl.gz,
+one appended line (gzip member) per call.
+"""
+
+import asyncio
+import contextvars
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import AsyncGenerator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+
+from . import config
+from .callbacks import add_callback, walk_agents
+from .response_store import response_key
+
+RECORD = "record"
+REPLAY = "replay"
+
+AGENT_TURN = "agent"
+
+_current_cassette = contextvars.ContextVar("cassette", default=None)
+
+# Parsed replay cassettes by path with their mtime, so repeated replays skip the file read
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+class CassetteMissError(Exception):
+    """Raised in replay mode when a cassette has no recorded call for a request."""
+
+
+def current_cassette():
+    return _current_cassette.get()
+
+
+def request_fingerprint(agent_name: str, llm_request: LlmRequest) -> str:
+    config = llm_request.config
+    tools = sorted(
+        declaration.name
+        for tool in (config.tools or [] if config else [])
+        for declaration in (getattr(tool, "function_declarations", None) or [])
+    )
+    return response_key(
+        f"{agent_name}/{llm_request.model}",
+        llm_request.contents,
+        {"system_instruction": config.system_instruction if config else None, "tools": tools},
+    )
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _read_turns(path: str):
+    with _open(path, "r") as cassette_file:
+        return [json.loads(line) for line in cassette_file if line.strip()]
+
+
+def _load_turns(path: str):
+    mtime = os.path.getmtime(path)
+    with _loaded_lock:
+        cached = _loaded.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    turns = _read_turns(path)
+    with _loaded_lock:
+        _loaded[path] = (mtime, turns)
+    return turns
+
+
+class Cassette:
+    """Model calls of one run or session.
+
+    In replay mode timing_scale multiplies the recorded latencies: 1.0
+    replays the original timing, 0.1 compresses it tenfold and 0 serves
+    responses immediately.
+    """
+
+    def __init__(self, path: str, mode: str, timing_scale: float = 0.0, append: bool = False):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.timing_scale = timing_scale
+        # Append each recorded call to the file right away, so a run that fails midway
+        # keeps its calls and later invocations of a session extend its cassette
+        self.append = append
+        self.turns = []
+        self._used = set()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        if mode == REPLAY:
+            self.turns = _load_turns(path)
+        elif not append and os.path.exists(path):
+            # save() rewrites the file, so keep what an earlier run recorded
+            self.turns = _read_turns(path)
+
+    def _add(self, kind: str, name: str, fingerprint: str, responses, offsets) -> dict:
+        turn = {
+            "kind": kind,
+            "name": name,
+            "fingerprint": fingerprint,
+            "offsets": [round(offset, 4) for offset in offsets],
+            "responses": [response.model_dump(mode="json", exclude_none=True) for response in responses],
+        }
+        with self._lock:
+            self.turns.append(turn)
+        return turn
+
+    def _append(self, turn: dict) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._write_lock, _open(self.path, "a") as cassette_file:
+            cassette_file.write(json.dumps(turn, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def record(self, kind: str, name: str, fingerprint: str, responses, offsets) -> None:
+        """Store one call: kind is AGENT_TURN or a gateway method, name the agent or model."""
+        turn = self._add(kind, name, fingerprint, responses, offsets)
+        if self.append:
+            self._append(turn)
+
+    async def record_async(self, kind: str, name: str, fingerprint: str, responses, offsets) -> None:
+        """record() for callers on the event loop; the file append runs in a worker thread."""
+        turn = self._add(kind, name, fingerprint, responses, offsets)
+        if self.append:
+            await asyncio.to_thread(self._append, turn)
+
+    def lookup(self, kind: str, name: str, fingerprint: str) -> dict:
+        """Return the recorded call for a request, preferring an exact fingerprint match."""
+        with self._lock:
+            candidates = [
+                index for index, turn in enumerate(self.turns)
+                if index not in self._used and turn["kind"] == kind and turn["name"] == name
+            ]
+            exact = [index for index in candidates if self.turns[index]["fingerprint"] == fingerprint]
+            chosen = (exact or candidates or [None])[0]
+            if chosen is None:
+                raise CassetteMissError(f"No recorded {kind} call left for {name} in {self.path}")
+            self._used.add(chosen)
+            return self.turns[chosen]
+
+    def delays(self, turn: dict):
+        """Seconds to wait before each recorded response of a call."""
+        previous = 0.0
+        for offset in turn["offsets"]:
+            yield max(0.0, offset - previous) * self.timing_scale
+            previous = offset
+
+    def save(self) -> None:
+        if self.mode != RECORD or self.append:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock, _open(self.path, "w") as cassette_file:
+            for turn in self.turns:
+                cassette_file.write(json.dumps(turn, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+@contextmanager
+def use_cassette(path: str, mode: str, timing_scale: float = 0.0):
+    """Record or replay the model calls made inside the block."""
+    cassette = Cassette(path, mode, timing_scale)
+    token = _current_cassette.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _current_cassette.reset(token)
+        cassette.save()
+
+
+# --- Gateway calls -----------------------------------------------------------
+
+def replay_call(cassette: Cassette, kind: str, model: str, fingerprint: str, response_type):
+    """Serve a recorded gateway call, sleeping for its scaled latency."""
+    turn = cassette.lookup(kind, model, fingerprint)
+    delay = sum(cassette.delays(turn))
+    if delay:
+        time.sleep(delay)
+    return response_type.model_validate(turn["responses"][0])
+
+
+async def replay_call_async(cassette: Cassette, kind: str, model: str, fingerprint: str, response_type):
+    turn = cassette.lookup(kind, model, fingerprint)
+    delay = sum(cassette.delays(turn))
+    if delay:
+        await asyncio.sleep(delay)
+    return response_type.model_validate(turn["responses"][0])
+
+
+# --- Agent model turns -------------------------------------------------------
+
+class CassetteLlm(BaseLlm):
+    """Model wrapper that records or replays turns when a cassette is active."""
+
+    agent_name: str
+    inner: Optional[BaseLlm] = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        cassette = _current_cassette.get()
+        fingerprint = request_fingerprint(self.agent_name, llm_request) if cassette else None
+
+        if cassette is not None and cassette.mode == REPLAY:
+            turn = cassette.lookup(AGENT_TURN, self.agent_name, fingerprint)
+            for delay, response in zip(cassette.delays(turn), turn["responses"]):
+                if delay:
+                    await asyncio.sleep(delay)
+                yield LlmResponse.model_validate(response)
+            return
+
+        start = time.perf_counter()
+        responses = []
+        offsets = []
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            if not response.partial:
+                responses.append(response)
+                offsets.append(time.perf_counter() - start)
+            yield response
+        if cassette is not None:
+            await cassette.record_async(AGENT_TURN, self.agent_name, fingerprint, responses, offsets)
+
+
+def install_cassette_llms(root_agent) -> None:
+    """Wrap the model of every LlmAgent in the tree with a CassetteLlm."""
+    from google.adk.agents import LlmAgent
+
+    for node in walk_agents(root_agent):
+        if isinstance(node, LlmAgent) and not isinstance(node.model, CassetteLlm):
+            inner = node.canonical_model
+            node.model = CassetteLlm(model=inner.model, agent_name=node.name, inner=inner)
+
+
+# --- Per-session recording ---------------------------------------------------
+
+_SAFE_SEGMENT = re.compile(r"[\w.-]{1,128}")
+
+
+def _file_segment(value: str) -> str:
+    """value if it is safe as a single path segment, else its hash (ids can come from clients)."""
+    if _SAFE_SEGMENT.fullmatch(value) and value not in (".", ".."):
+        return value
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+
+
+def session_cassette_path(app_name: str, session_id: str) -> str:
+    return os.path.join(config.CASSETTE_DIR, _file_segment(app_name), f"{_file_segment(session_id)}.jsonl.gz")
+
+
+def _open_session_cassette(callback_context):
+    session = callback_context.session
+    _current_cassette.set(Cassette(session_cassette_path(session.app_name, session.id), RECORD, append=True))
+    return None
+
+
+def apply_cassettes(root_agent) -> None:
+    """Record every session of the tree when CASSETTE_MODE=record; otherwise do nothing."""
+    if config.CASSETTE_MODE != RECORD:
+        return
+    install_cassette_llms(root_agent)
+    add_callback(root_agent, "before_agent_callback", _open_session_cassette)
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from . import config
+from .rate_limiter import is_rate_limit_error, retry_after_seconds
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a model whose circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit for {name} is open, retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker for one model endpoint.
+
+    After failure_threshold consecutive failures (or any quota error) the
+    circuit opens and calls fail immediately. Once probe_interval has passed
+    a single probe call is let through: success closes the circuit, failure
+    opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, probe_interval: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.probe_interval = probe_interval
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == OPEN and now >= self.opened_until:
+                self.state = HALF_OPEN
+                self._probing = False
+                print(f"Circuit for {self.name} is half-open, probing")
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(self.name, max(0.0, self.opened_until - now))
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"Circuit for {self.name} closed")
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self, error: Exception) -> None:
+        with self._lock:
+            self.failures += 1
+            quota_error = is_rate_limit_error(error)
+            if self.state == HALF_OPEN or quota_error or self.failures >= self.failure_threshold:
+                open_for = self.probe_interval
+                if quota_error:
+                    open_for = max(open_for, retry_after_seconds(error) or 0.0)
+                self.state = OPEN
+                self.opened_until = time.monotonic() + open_for
+                self._probing = False
+                print(f"Circuit for {self.name} opened for {open_for:.1f}s after: {error}")
+
+    def release_probe(self) -> None:
+        """Let another caller probe when a probe call was cancelled before finishing."""
+        with self._lock:
+            self._probing = False
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected without a probe."""
+        with self._lock:
+            return self.state == OPEN and time.monotonic() < self.opened_until
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(model: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for a model endpoint."""
+    breaker = _breakers.get(model)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(model)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    model, config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_PROBE_INTERVAL_SECONDS
+                )
+                _breakers[model] = breaker
+    return breaker
@@ -0,0 +1,147 @@
+import json
+import os
+
+# Rate limits per quota class: (requests per minute, burst size)
+RATE_LIMITS = {
+    "text": (
+        float(os.getenv("TEXT_RATE_LIMIT_RPM", 60)),
+        int(os.getenv("TEXT_RATE_LIMIT_BURST", 10)),
+    ),
+    "image": (
+        float(os.getenv("IMAGE_RATE_LIMIT_RPM", 20)),
+        int(os.getenv("IMAGE_RATE_LIMIT_BURST", 2)),
+    ),
+}
+
+# Back-off applied to a 429 that does not carry a Retry-After header
+DEFAULT_RETRY_AFTER_SECONDS = float(os.getenv("DEFAULT_RETRY_AFTER_SECONDS", 5))
+
+# Instrumentation (spans and latency histograms); disabled unless METRICS_ENABLED is set
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+# Append one JSON line per finished span to this file
+METRICS_SPANS_PATH = os.getenv("METRICS_SPANS_PATH", "")
+# Write Prometheus text-format metrics to this file at exit (and on write_prometheus())
+METRICS_PROMETHEUS_PATH = os.getenv("METRICS_PROMETHEUS_PATH", "")
+# Open spans older than this are closed as errors (their agent raised before its after-callback)
+METRICS_SPAN_MAX_SECONDS = float(os.getenv("METRICS_SPAN_MAX_SECONDS", 3600))
+
+# Persistent model response store (SQLite); call sites opt in per call
+RESPONSE_STORE_ENABLED = os.getenv("RESPONSE_STORE_ENABLED", "false").lower() in ("1", "true", "yes")
+RESPONSE_STORE_PATH = os.getenv(
+    "RESPONSE_STORE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "sahayak", "responses.sqlite3"),
+)
+RESPONSE_STORE_MAX_BYTES = int(os.getenv("RESPONSE_STORE_MAX_BYTES", 256 * 1024 * 1024))
+RESPONSE_STORE_TTL_SECONDS = float(os.getenv("RESPONSE_STORE_TTL_SECONDS", 7 * 24 * 3600))
+
+# Circuit breaker per model endpoint
+# Consecutive failures that open the circuit; a 429 opens it immediately
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+# Seconds an open circuit waits before letting one probe request through
+CIRCUIT_PROBE_INTERVAL_SECONDS = float(os.getenv("CIRCUIT_PROBE_INTERVAL_SECONDS", 30))
+
+# Semantic near-duplicate cache for generated content (in memory, per process)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+# Minimum cosine similarity between request vectors for a hit
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.88))
+# Maximum stored requests per cache; the oldest entry is replaced when full
+SEMANTIC_CACHE_CAPACITY = int(os.getenv("SEMANTIC_CACHE_CAPACITY", 2048))
+SEMANTIC_CACHE_DIMENSIONS = int(os.getenv("SEMANTIC_CACHE_DIMENSIONS", 1024))
+
+# Session state budget
+# Per-iteration payloads larger than this (serialized bytes) are stored as artifacts
+STATE_INLINE_MAX_BYTES = int(os.getenv("STATE_INLINE_MAX_BYTES", 4096))
+# Previous iterations whose payload references stay in state; older ones are evicted
+STATE_KEEP_ITERATIONS = int(os.getenv("STATE_KEEP_ITERATIONS", 1))
+# Longest free text (e.g. the original request) echoed into state
+STATE_TEXT_MAX_CHARS = int(os.getenv("STATE_TEXT_MAX_CHARS", 1000))
+
+# Token and cost ledger per session
+# Append one JSON line per model call to this file for offline reports
+USAGE_LEDGER_PATH = os.getenv("USAGE_LEDGER_PATH", "")
+# Sessions kept in memory for the summary API; the oldest are dropped first
+USAGE_MAX_SESSIONS = int(os.getenv("USAGE_MAX_SESSIONS", 10000))
+# Token budget per session (prompt + output); 0 disables the check
+USAGE_SESSION_TOKEN_BUDGET = int(os.getenv("USAGE_SESSION_TOKEN_BUDGET", 0))
+# Token budget per user (tenant) in each USAGE_USER_WINDOW_HOURS window; 0 disables the check
+USAGE_USER_TOKEN_BUDGET = int(os.getenv("USAGE_USER_TOKEN_BUDGET", 0))
+USAGE_USER_WINDOW_HOURS = float(os.getenv("USAGE_USER_WINDOW_HOURS", 24))
+# Users kept in memory; the least recently active are dropped first
+USAGE_MAX_USERS = int(os.getenv("USAGE_MAX_USERS", 10000))
+# Extra or overriding prices as JSON: {"model-prefix": {"input": usd_per_1m, "output": usd_per_1m, "image": usd}}
+MODEL_PRICES = json.loads(os.getenv("MODEL_PRICES", "{}"))
+
+# Sampled cProfile/tracemalloc capture for selected tools (disabled when empty)
+# Comma-separated tool names, or * for every tool
+PROFILE_TOOLS = [name.strip() for name in os.getenv("PROFILE_TOOLS", "").split(",") if name.strip()]
+# Percentage of matching tool invocations that are profiled
+PROFILE_SAMPLE_PERCENT = float(os.getenv("PROFILE_SAMPLE_PERCENT", 10))
+# Also capture allocation snapshots with tracemalloc (slower)
+PROFILE_MEMORY = os.getenv("PROFILE_MEMORY", "false").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sahayak", "profiles"))
+
+# HTTP gateway serving the agent pipelines from one process
+GATEWAY_HOST = os.getenv("GATEWAY_HOST", "127.0.0.1")
+GATEWAY_PORT = int(os.getenv("GATEWAY_PORT", 8080))
+# Comma-separated agent packages to serve; empty serves all of them
+GATEWAY_AGENTS = [name.strip() for name in os.getenv("GATEWAY_AGENTS", "").split(",") if name.strip()]
+# Session storage shared by every served agent: "memory" or "sqlite" (SESSION_DB_PATH)
+GATEWAY_SESSION_BACKEND = os.getenv("GATEWAY_SESSION_BACKEND", "memory")
+# Artifact storage shared by every served agent: "memory" or "local" (content-addressed files in ARTIFACT_DIR)
+GATEWAY_ARTIFACT_BACKEND = os.getenv("GATEWAY_ARTIFACT_BACKEND", "memory")
+
+# Warm start: preload data, build clients and run a synthetic request before serving
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# Also send one tiny real (billed) model request to open the connection and fetch credentials
+WARMUP_MODEL_PING = os.getenv("WARMUP_MODEL_PING", "false").lower() in ("1", "true", "yes")
+
+# Record model traffic per session for offline replay: "record" or empty (off)
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "").lower()
+CASSETTE_DIR = os.getenv("CASSETTE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sahayak", "cassettes"))
+
+# Seconds between mtime checks of guideline/policy JSON files; 0 loads them once
+GUIDELINES_RELOAD_SECONDS = float(os.getenv("GUIDELINES_RELOAD_SECONDS", 5))
+
+# Gemini context caching of each agent's static system instruction and tool declarations
+CONTEXT_CACHE_ENABLED = os.getenv("CONTEXT_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("CONTEXT_CACHE_TTL_SECONDS", 3600))
+# Extend a handle's TTL when it is used this close to expiry
+CONTEXT_CACHE_REFRESH_SECONDS = int(os.getenv("CONTEXT_CACHE_REFRESH_SECONDS", 600))
+# Smallest prefix worth caching; the service rejects shorter ones
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", 1024))
+
+# Run pure-Python pipeline stages (language, planning, validation, checks) without model turns
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Priority classes and per-tenant fair share for model quota across concurrent sessions
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() in ("1", "true", "yes")
+# App name -> "interactive" or "batch", for sessions that don't set a "priority" state key
+SCHEDULER_APP_PRIORITIES = json.loads(os.getenv(
+    "SCHEDULER_APP_PRIORITIES",
+    '{"hyper_local_content": "interactive", "differentiated_materials": "batch", "image_scoring": "batch"}',
+))
+# Tenant -> relative share of tokens within its class; unlisted tenants weigh 1
+SCHEDULER_TENANT_WEIGHTS = json.loads(os.getenv("SCHEDULER_TENANT_WEIGHTS", "{}"))
+# Per class: (most calls waiting, longest wait in seconds) before calls are rejected
+SCHEDULER_QUEUE_LIMITS = {
+    "interactive": (
+        int(os.getenv("SCHEDULER_INTERACTIVE_MAX_QUEUE", 50)),
+        float(os.getenv("SCHEDULER_INTERACTIVE_MAX_WAIT", 30)),
+    ),
+    "batch": (
+        int(os.getenv("SCHEDULER_BATCH_MAX_QUEUE", 500)),
+        float(os.getenv("SCHEDULER_BATCH_MAX_WAIT", 600)),
+    ),
+}
+# Tokens batch calls leave in the bucket for interactive bursts
+SCHEDULER_BATCH_RESERVE = int(os.getenv("SCHEDULER_BATCH_RESERVE", 2))
+
+# Local persistence for self-hosted gateways
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join(os.path.expanduser("~"), ".cache", "sahayak", "sessions.db"))
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sahayak", "artifacts"))
+# Sessions (and their artifacts) untouched for this many hours are deleted; 0 keeps them
+RETENTION_SESSION_HOURS = float(os.getenv("RETENTION_SESSION_HOURS", 168))
+# Oldest session artifacts are evicted once local blobs exceed this many MB; 0 is unbounded
+RETENTION_ARTIFACT_MAX_MB = float(os.getenv("RETENTION_ARTIFACT_MAX_MB", 2048))
+# Seconds between retention sweeps; 0 disables them
+RETENTION_SWEEP_SECONDS = float(os.getenv("RETENTION_SWEEP_SECONDS", 600))
@@ -0,0 +1,224 @@
+"""Model-side context caching of each agent's static request prefix.
+
+The system instruction and tool declarations an LlmAgent sends are the same
+on every turn. With CONTEXT_CACHE_ENABLED they are stored once as a Gemini
+cached content, and requests reference the handle instead of resending them,
+so the prefix is billed at the cached-token rate and the model skips
+re-reading it.
+
+Handles are created during warm-up (warmup.py passes every synthetic agent
+request through prepare()) or, for a prefix seen for the first time, in the
+background while that request goes out uncached. A handle used within
+CONTEXT_CACHE_REFRESH_SECONDS of its expiry gets its TTL extended. Prefixes
+shorter than CONTEXT_CACHE_MIN_TOKENS are below the service minimum and are
+never cached. Savings show up as cached_tokens and saved_usd in the usage
+ledger.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+
+from . import config
+from .callbacks import add_callback, walk_agents
+from .instrumentation import record_cache_hit
+from .model_clients import get_genai_client
+
+# Don't hand out a handle this close to its expiry; it could lapse in flight
+EXPIRY_GUARD_SECONDS = 30
+
+# Prefix fingerprint -> live cache handle
+_entries = {}
+# Prefix fingerprint -> creation or refresh in progress
+_pending = {}
+# Prefix fingerprints that are too short or were rejected by the service
+_uncacheable = {}
+
+
+class CacheEntry:
+    """One cached content handle."""
+
+    def __init__(self, name: str, model: str, agent_name: str, expire_time: float, tokens: int):
+        self.name = name
+        self.model = model
+        self.agent_name = agent_name
+        self.expire_time = expire_time
+        self.tokens = tokens
+        self.hits = 0
+
+    def summary(self) -> dict:
+        return {
+            "name": self.name,
+            "model": self.model,
+            "agent": self.agent_name,
+            "tokens": self.tokens,
+            "hits": self.hits,
+            "expires_in_s": round(self.expire_time - time.time()),
+        }
+
+
+def _dump(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return [_dump(item) for item in value]
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return value
+
+
+def _prefix(llm_request) -> dict:
+    request_config = llm_request.config
+    return {
+        "model": llm_request.model,
+        "system_instruction": _dump(request_config.system_instruction),
+        "tools": _dump(request_config.tools),
+        "tool_config": _dump(request_config.tool_config),
+    }
+
+
+def prefix_fingerprint(llm_request) -> str:
+    payload = json.dumps(_prefix(llm_request), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _estimated_tokens(llm_request) -> int:
+    prefix = _prefix(llm_request)
+    return len(json.dumps([prefix["system_instruction"], prefix["tools"]], ensure_ascii=False)) // 4
+
+
+def _expire_time(cached_content) -> float:
+    expire_time = getattr(cached_content, "expire_time", None)
+    if expire_time is not None:
+        return expire_time.timestamp()
+    return time.time() + config.CONTEXT_CACHE_TTL_SECONDS
+
+
+def _create(agent_name: str, llm_request) -> CacheEntry:
+    from google.genai import types
+
+    request_config = llm_request.config
+    cached_content = get_genai_client().caches.create(
+        model=llm_request.model,
+        config=types.CreateCachedContentConfig(
+            display_name=f"sahayak-{agent_name}"[:128],
+            system_instruction=request_config.system_instruction,
+            tools=request_config.tools,
+            tool_config=request_config.tool_config,
+            ttl=f"{config.CONTEXT_CACHE_TTL_SECONDS}s",
+        ),
+    )
+    usage = getattr(cached_content, "usage_metadata", None)
+    tokens = getattr(usage, "total_token_count", None) or _estimated_tokens(llm_request)
+    print(f"Context cache created for {agent_name}: {cached_content.name} ({tokens} tokens)")
+    return CacheEntry(cached_content.name, llm_request.model, agent_name, _expire_time(cached_content), tokens)
+
+
+def _refresh(entry: CacheEntry) -> None:
+    from google.genai import types
+
+    cached_content = get_genai_client().caches.update(
+        name=entry.name, config=types.UpdateCachedContentConfig(ttl=f"{config.CONTEXT_CACHE_TTL_SECONDS}s")
+    )
+    entry.expire_time = _expire_time(cached_content)
+
+
+async def _create_entry(fingerprint: str, agent_name: str, llm_request) -> None:
+    try:
+        _entries[fingerprint] = await asyncio.to_thread(_create, agent_name, llm_request)
+    except Exception as e:
+        print(f"Context cache not created for {agent_name}: {e}")
+        _uncacheable[fingerprint] = str(e)
+    finally:
+        _pending.pop(fingerprint, None)
+
+
+async def _refresh_entry(fingerprint: str, entry: CacheEntry) -> None:
+    try:
+        await asyncio.to_thread(_refresh, entry)
+    except Exception as e:
+        # Let the handle lapse; the next request past it creates a new one
+        print(f"Context cache refresh failed for {entry.agent_name}: {e}")
+    finally:
+        _pending.pop(fingerprint, None)
+
+
+def _schedule(fingerprint: str, coroutine) -> None:
+    if fingerprint in _pending:
+        coroutine.close()
+        return
+    _pending[fingerprint] = asyncio.get_running_loop().create_task(coroutine)
+
+
+def prepare(agent_name: str, llm_request):
+    """Return the usable cache handle for the request's prefix, scheduling creation or refresh."""
+    request_config = llm_request.config
+    if not config.CONTEXT_CACHE_ENABLED or request_config is None or request_config.cached_content:
+        return None
+    if not request_config.system_instruction or not isinstance(llm_request.model, str):
+        return None
+
+    fingerprint = prefix_fingerprint(llm_request)
+    if fingerprint in _uncacheable:
+        return None
+    if fingerprint not in _entries and _estimated_tokens(llm_request) < config.CONTEXT_CACHE_MIN_TOKENS:
+        _uncacheable[fingerprint] = "prefix below CONTEXT_CACHE_MIN_TOKENS"
+        return None
+
+    now = time.time()
+    entry = _entries.get(fingerprint)
+    if entry is not None and entry.expire_time - now < EXPIRY_GUARD_SECONDS:
+        _entries.pop(fingerprint, None)
+        entry = None
+    if entry is None:
+        _schedule(fingerprint, _create_entry(fingerprint, agent_name, llm_request))
+        return None
+    if entry.expire_time - now < config.CONTEXT_CACHE_REFRESH_SECONDS:
+        _schedule(fingerprint, _refresh_entry(fingerprint, entry))
+    return entry
+
+
+def _use_context_cache(callback_context, llm_request):
+    entry = prepare(callback_context.agent_name, llm_request)
+    if entry is None:
+        return None
+    # The cached content carries these; the API rejects requests that repeat them
+    request_config = llm_request.config
+    request_config.cached_content = entry.name
+    request_config.system_instruction = None
+    request_config.tools = None
+    request_config.tool_config = None
+    entry.hits += 1
+    record_cache_hit("context_cache")
+    return None
+
+
+async def wait_for_context_caches() -> None:
+    """Wait until every scheduled creation and refresh has finished."""
+    while _pending:
+        await asyncio.gather(*list(_pending.values()), return_exceptions=True)
+
+
+def context_cache_status() -> dict:
+    return {
+        "enabled": config.CONTEXT_CACHE_ENABLED,
+        "entries": [entry.summary() for entry in _entries.values()],
+        "pending": len(_pending),
+        "uncacheable": len(_uncacheable),
+    }
+
+
+_cached_agents = set()
+
+
+def apply_context_cache(root_agent) -> None:
+    """Serve the static prefix of every LlmAgent in the tree from context caches when enabled."""
+    from google.adk.agents import LlmAgent
+
+    if not config.CONTEXT_CACHE_ENABLED:
+        return
+    for node in walk_agents(root_agent):
+        if isinstance(node, LlmAgent) and id(node) not in _cached_agents:
+            _cached_agents.add(id(node))
+            add_callback(node, "before_model_callback", _use_context_cache)
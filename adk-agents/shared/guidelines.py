@@ -0,0 +1,141 @@
+"""Parsed, validated guideline and policy documents shared by the fetch tools.
+
+Each JSON document is read, validated and rendered once: tools get the parsed
+object and a compact prompt string (minified JSON, runs of whitespace inside
+values collapsed) without touching the disk. The file's mtime is checked at
+most every GUIDELINES_RELOAD_SECONDS, so an edited document is picked up
+without a restart; a reload that fails to parse or validate keeps serving the
+previous version.
+"""
+
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+
+from . import config
+
+
+class GuidelineError(ValueError):
+    """Raised when a guideline document is missing, not JSON or fails validation."""
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _compact(value):
+    if isinstance(value, dict):
+        return {key: _compact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_compact(item) for item in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def render_prompt_text(data) -> str:
+    """Minified JSON for prompts: no indentation, single spaces inside values."""
+    return json.dumps(_compact(data), ensure_ascii=False, separators=(",", ":"))
+
+
+def validate_document(name: str, data, required_keys=()) -> None:
+    """Check a document is a non-empty JSON object holding the required keys."""
+    if not isinstance(data, dict) or not data:
+        raise GuidelineError(f"{name}: expected a non-empty JSON object")
+    missing = [key for key in required_keys if key not in data]
+    if missing:
+        raise GuidelineError(f"{name}: missing keys {missing}")
+
+
+class GuidelineDocument:
+    """One loaded version of a document."""
+
+    def __init__(self, name: str, path: str, mtime: float, data):
+        self.name = name
+        self.path = path
+        self.mtime = mtime
+        # Shared by every caller, so handed out read-only
+        self.data = _freeze(data)
+        self.prompt_text = render_prompt_text(data)
+
+
+class GuidelineStore:
+    """Registry of guideline documents, loaded lazily and reloaded when their file changes."""
+
+    def __init__(self, reload_seconds: float = None):
+        self.reload_seconds = config.GUIDELINES_RELOAD_SECONDS if reload_seconds is None else reload_seconds
+        self._sources = {}
+        self._documents = {}
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, path: str, required_keys=()) -> None:
+        self._sources[name] = (os.path.abspath(path), tuple(required_keys))
+
+    def _load(self, name: str, mtime: float) -> GuidelineDocument:
+        path, required_keys = self._sources[name]
+        try:
+            with open(path, "r", encoding="utf-8") as document_file:
+                data = json.load(document_file)
+        except (OSError, json.JSONDecodeError) as e:
+            raise GuidelineError(f"{name}: cannot load {path}: {e}") from e
+        validate_document(name, data, required_keys)
+        return GuidelineDocument(name, path, mtime, data)
+
+    def get(self, name: str) -> GuidelineDocument:
+        """Current version of a document; raises GuidelineError only if no version ever loaded."""
+        if name not in self._sources:
+            raise KeyError(f"Unknown guideline document: {name}")
+        document = self._documents.get(name)
+        now = time.monotonic()
+        if document is not None and (self.reload_seconds <= 0 or now - self._checked[name] < self.reload_seconds):
+            return document
+
+        with self._lock:
+            document = self._documents.get(name)
+            if document is not None and self.reload_seconds > 0 and now - self._checked[name] < self.reload_seconds:
+                return document
+            self._checked[name] = now
+            path = self._sources[name][0]
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError as e:
+                if document is None:
+                    raise GuidelineError(f"{name}: cannot load {path}: {e}") from e
+                print(f"Guideline {name} unreadable, keeping the loaded version: {e}")
+                return document
+            if document is not None and document.mtime == mtime:
+                return document
+            try:
+                document = self._load(name, mtime)
+            except GuidelineError as e:
+                if name not in self._documents:
+                    raise
+                print(f"Guideline reload failed, keeping the previous version: {e}")
+                return self._documents[name]
+            if name in self._documents:
+                print(f"Reloaded guideline {name} from {path}")
+            self._documents[name] = document
+            return document
+
+    def data(self, name: str):
+        """Parsed, read-only document."""
+        return self.get(name).data
+
+    def prompt_text(self, name: str) -> str:
+        """Compact rendering of the document for prompts and tool results."""
+        return self.get(name).prompt_text
+
+    def preload(self) -> None:
+        for name in self._sources:
+            self.get(name)
+
+
+# Process-wide store; each fetch tool module registers its document
+guidelines = GuidelineStore()
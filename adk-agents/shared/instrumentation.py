@@ -0,0 +1,394 @@
+import atexit
+import contextvars
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from . import config
+from .callbacks import add_callback, walk_agents
+
+# Session state keys holding each pipeline's loop iteration
+ITERATION_KEYS = ("loop_iteration", "content_iteration", "worksheet_iteration")
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+# Span of the tool currently executing, so model calls and cache hits made
+# inside the tool are attributed to it
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Histogram:
+    """HDR-style log-linear histogram of non-negative integer values.
+
+    Values keep SUB_BUCKET_BITS significant bits (under 1% relative error)
+    at any magnitude, with memory proportional to the number of distinct
+    buckets actually used.
+    """
+
+    SUB_BUCKET_BITS = 7
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, value):
+        shift = max(0, value.bit_length() - self.SUB_BUCKET_BITS)
+        return shift, value >> shift
+
+    def record(self, value) -> None:
+        value = max(0, int(value))
+        bucket = self._bucket(value)
+        with self._lock:
+            self.counts[bucket] = self.counts.get(bucket, 0) + 1
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+
+    def merge(self, other: "Histogram") -> None:
+        with other._lock:
+            counts = dict(other.counts)
+            count, total, largest = other.count, other.total, other.max
+        with self._lock:
+            for bucket, bucket_count in counts.items():
+                self.counts[bucket] = self.counts.get(bucket, 0) + bucket_count
+            self.count += count
+            self.total += total
+            self.max = max(self.max, largest)
+
+    def percentile(self, quantile: float) -> int:
+        """Return the value at the given quantile (0-1), or 0 when empty."""
+        with self._lock:
+            if not self.count:
+                return 0
+            rank = max(1, round(quantile * self.count))
+            seen = 0
+            for shift, sub_bucket in sorted(self.counts, key=lambda bucket: bucket[1] << bucket[0]):
+                seen += self.counts[(shift, sub_bucket)]
+                if seen >= rank:
+                    # Middle of the bucket, never above the largest recorded value
+                    return min(self.max, (sub_bucket << shift) + ((1 << shift) >> 1))
+            return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "max": self.max,
+            **{f"p{round(q * 100)}": self.percentile(q) for q in QUANTILES},
+        }
+
+
+class MetricsRegistry:
+    """Process-wide histograms and counters, keyed by (metric, labels)."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._spans_file = None
+
+    def histogram(self, metric: str, **labels) -> Histogram:
+        key = (metric, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, Histogram())
+        return histogram
+
+    def increment(self, metric: str, amount: float = 1, **labels) -> None:
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def write_span(self, span: dict) -> None:
+        if not config.METRICS_SPANS_PATH:
+            return
+        line = json.dumps(span, default=str) + "\n"
+        with self._lock:
+            if self._spans_file is None:
+                self._spans_file = open(config.METRICS_SPANS_PATH, "a", buffering=1, encoding="utf-8")
+            self._spans_file.write(line)
+
+    def snapshot(self) -> dict:
+        """Return all metrics as plain data, e.g. for a JSON dump."""
+        return {
+            "histograms": [
+                {"metric": metric, "labels": dict(labels), **histogram.summary()}
+                for (metric, labels), histogram in sorted(self.histograms.items())
+            ],
+            "counters": [
+                {"metric": metric, "labels": dict(labels), "value": value}
+                for (metric, labels), value in sorted(self.counters.items())
+            ],
+        }
+
+    def render_prometheus(self) -> str:
+        """Render histograms as Prometheus summaries and counters as counters."""
+        lines = []
+        declared = set()
+        for (metric, labels), histogram in sorted(self.histograms.items()):
+            name = f"sahayak_{metric}_microseconds"
+            if name not in declared:
+                lines.append(f"# TYPE {name} summary")
+                declared.add(name)
+            for quantile in QUANTILES:
+                label_text = _prometheus_labels(labels + (("quantile", str(quantile)),))
+                lines.append(f"{name}{label_text} {histogram.percentile(quantile)}")
+            lines.append(f"{name}_sum{_prometheus_labels(labels)} {histogram.total}")
+            lines.append(f"{name}_count{_prometheus_labels(labels)} {histogram.count}")
+        for (metric, labels), value in sorted(self.counters.items()):
+            name = f"sahayak_{metric}_total"
+            if name not in declared:
+                lines.append(f"# TYPE {name} counter")
+                declared.add(name)
+            lines.append(f"{name}{_prometheus_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+def _prometheus_labels(labels) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+metrics = MetricsRegistry()
+
+
+def write_prometheus(path: str = None) -> None:
+    """Write the current metrics in Prometheus text format."""
+    path = path or config.METRICS_PROMETHEUS_PATH
+    if path:
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(metrics.render_prometheus())
+
+
+def _payload_size(value) -> int:
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+def _iteration(state) -> int:
+    for key in ITERATION_KEYS:
+        value = state.get(key)
+        if value is not None:
+            return value
+    return 0
+
+
+def _finish_span(span: dict) -> None:
+    span["wall_ms"] = round((time.perf_counter() - span.pop("_start")) * 1000, 3)
+    labels = {"kind": span["kind"], "name": span["name"]}
+    metrics.histogram("wall_time", **labels).record(span["wall_ms"] * 1000)
+    if span.get("model_ms"):
+        metrics.histogram("model_time", **labels).record(span["model_ms"] * 1000)
+    for counter in ("bytes_in", "bytes_out", "cache_hits", "model_calls"):
+        if span.get(counter):
+            metrics.increment(counter, span[counter], **labels)
+    if span.get("status") == "error":
+        metrics.increment("errors", **labels)
+    metrics.write_span(span)
+
+
+@contextmanager
+def track_model_call(model: str):
+    """Time a direct model call and attribute it to the current tool span."""
+    span = _current_span.get()
+    if span is None and not config.METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.histogram("model_call", model=model).record(elapsed * 1_000_000)
+        if span is not None:
+            span["model_ms"] = round(span.get("model_ms", 0) + elapsed * 1000, 3)
+            span["model_calls"] = span.get("model_calls", 0) + 1
+
+
+def record_cache_hit(cache: str) -> None:
+    """Count a cache hit, attributing it to the current tool span."""
+    span = _current_span.get()
+    if span is None and not config.METRICS_ENABLED:
+        return
+    metrics.increment("cache_hit", cache=cache)
+    if span is not None:
+        span["cache_hits"] = span.get("cache_hits", 0) + 1
+
+
+# --- ADK callbacks -----------------------------------------------------------
+
+# Spans started but not finished yet, oldest first
+_open_spans = OrderedDict()
+_open_spans_lock = threading.Lock()
+
+
+def _open_span(key, span: dict) -> None:
+    """Track a started span, closing spans whose after-callback never ran."""
+    stale = []
+    with _open_spans_lock:
+        _open_spans.pop(key, None)
+        _open_spans[key] = span
+        cutoff = span["_start"] - config.METRICS_SPAN_MAX_SECONDS
+        while _open_spans:
+            oldest_key, oldest = next(iter(_open_spans.items()))
+            if oldest["_start"] > cutoff:
+                break
+            del _open_spans[oldest_key]
+            stale.append(oldest)
+    for oldest in stale:
+        oldest["status"] = "error"
+        _finish_span(oldest)
+
+
+def _close_span(key):
+    with _open_spans_lock:
+        return _open_spans.pop(key, None)
+
+
+def _before_agent(callback_context):
+    key = ("agent", callback_context.invocation_id, callback_context.agent_name)
+    _open_span(key, {
+        "kind": "agent",
+        "name": callback_context.agent_name,
+        "invocation_id": callback_context.invocation_id,
+        "iteration": _iteration(callback_context.state),
+        "_start": time.perf_counter(),
+    })
+    return None
+
+
+def _after_agent(callback_context):
+    span = _close_span(("agent", callback_context.invocation_id, callback_context.agent_name))
+    if span is not None:
+        _finish_span(span)
+    return None
+
+
+def _before_model(callback_context, llm_request):
+    key = ("model", callback_context.invocation_id, callback_context.agent_name)
+    _open_span(key, {
+        "kind": "model",
+        "name": callback_context.agent_name,
+        "model": getattr(llm_request, "model", None),
+        "invocation_id": callback_context.invocation_id,
+        "iteration": _iteration(callback_context.state),
+        "bytes_in": _payload_size([content.model_dump(exclude_none=True) for content in llm_request.contents]),
+        "model_calls": 1,
+        "_start": time.perf_counter(),
+    })
+    return None
+
+
+def _after_model(callback_context, llm_response):
+    if getattr(llm_response, "partial", False):
+        return None
+    span = _close_span(("model", callback_context.invocation_id, callback_context.agent_name))
+    if span is None:
+        return None
+    usage = getattr(llm_response, "usage_metadata", None)
+    if usage is not None:
+        span["prompt_tokens"] = usage.prompt_token_count
+        span["output_tokens"] = usage.candidates_token_count
+    if llm_response.content is not None:
+        span["bytes_out"] = _payload_size(llm_response.content.model_dump(exclude_none=True))
+    if llm_response.error_code:
+        span["status"] = "error"
+    span["model_ms"] = round((time.perf_counter() - span["_start"]) * 1000, 3)
+    _finish_span(span)
+    return None
+
+
+def _before_tool(tool, args, tool_context):
+    span = {
+        "kind": "tool",
+        "name": tool.name,
+        "agent": tool_context.agent_name,
+        "invocation_id": tool_context.invocation_id,
+        "iteration": _iteration(tool_context.state),
+        "bytes_in": _payload_size(args),
+        "_start": time.perf_counter(),
+    }
+    _open_span(("tool", tool_context.function_call_id), span)
+    _current_span.set(span)
+    return None
+
+
+def _after_tool(tool, args, tool_context, tool_response):
+    span = _close_span(("tool", tool_context.function_call_id))
+    if span is None:
+        return None
+    if _current_span.get() is span:
+        _current_span.set(None)
+    span["bytes_out"] = _payload_size(tool_response)
+    if isinstance(tool_response, dict) and tool_response.get("status") == "error":
+        span["status"] = "error"
+    _finish_span(span)
+    return None
+
+
+def _on_model_error(callback_context, llm_request, error):
+    span = _close_span(("model", callback_context.invocation_id, callback_context.agent_name))
+    if span is not None:
+        span["status"] = "error"
+        span["model_ms"] = round((time.perf_counter() - span["_start"]) * 1000, 3)
+        _finish_span(span)
+    return None
+
+
+def _on_tool_error(tool, args, tool_context, error):
+    span = _close_span(("tool", tool_context.function_call_id))
+    if span is not None:
+        if _current_span.get() is span:
+            _current_span.set(None)
+        span["status"] = "error"
+        _finish_span(span)
+    return None
+
+
+_instrumented = set()
+
+
+def instrument_agent_tree(agent) -> None:
+    """Attach span callbacks to an agent and all of its sub-agents.
+
+    Does nothing unless METRICS_ENABLED is set, so disabled instrumentation
+    adds no per-call overhead.
+    """
+    if not config.METRICS_ENABLED:
+        return
+
+    for node in walk_agents(agent):
+        if id(node) in _instrumented:
+            continue
+        _instrumented.add(id(node))
+        add_callback(node, "before_agent_callback", _before_agent)
+        add_callback(node, "after_agent_callback", _after_agent)
+        if hasattr(node, "before_tool_callback"):
+            add_callback(node, "before_model_callback", _before_model)
+            add_callback(node, "after_model_callback", _after_model)
+            add_callback(node, "on_model_error_callback", _on_model_error)
+            add_callback(node, "before_tool_callback", _before_tool)
+            add_callback(node, "after_tool_callback", _after_tool)
+            add_callback(node, "on_tool_error_callback", _on_tool_error)
+
+
+if config.METRICS_ENABLED and config.METRICS_PROMETHEUS_PATH:
+    atexit.register(write_prometheus)
@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+from .cassettes import REPLAY, current_cassette, replay_call, replay_call_async
+from .circuit_breaker import get_circuit_breaker
+from .instrumentation import record_cache_hit, track_model_call
+from .model_clients import get_genai_client
+from .rate_limiter import report_rate_limit_error
+from .response_store import get_response_store, response_key
+from .scheduler import SchedulerOverloadedError, acquire_quota, acquire_quota_blocking
+from .singleflight import model_calls
+from .usage import check_budget, record_response
+from . import config
+
+
+def generate_content(model: str, contents, generation_config=None, *, cache: bool = False,
+                     refresh: bool = False, store: bool = True, quota_class: str = "text"):
+    """Call client.models.generate_content through the shared rate limiter and response store.
+
+    cache=True opts the call site into the persistent response store;
+    refresh=True skips the lookup but still stores the fresh response;
+    store=False only looks up, leaving it to the caller to store_response()
+    once the answer has been checked.
+    Identical concurrent calls share one request. Raises CircuitOpenError
+    without calling the model while its circuit is open and
+    BudgetExceededError once the session's or user's token budget is spent;
+    other errors are re-raised after 429s have paused the model's rate limiter.
+    With the scheduler on, raises SchedulerOverloadedError when the
+    request's priority class is over its queue limits. Inside an active
+    cassette the call is recorded or replayed.
+    """
+    from google.genai import types
+
+    key = response_key(model, contents, generation_config)
+    cassette = current_cassette()
+    if cassette is not None and cassette.mode == REPLAY:
+        return replay_call(cassette, "generate_content", model, key, types.GenerateContentResponse)
+    start = time.perf_counter()
+
+    use_store = cache and config.RESPONSE_STORE_ENABLED
+    if use_store and not refresh:
+        stored = get_response_store().get(key)
+        if stored is not None:
+            record_cache_hit("response_store")
+            response = types.GenerateContentResponse.model_validate_json(stored)
+            if cassette is not None:
+                cassette.record("generate_content", model, key, [response], [time.perf_counter() - start])
+            return response
+
+    check_budget()
+
+    def call():
+        breaker = get_circuit_breaker(model)
+        breaker.before_call()
+        try:
+            acquire_quota_blocking(model, quota_class)
+        except SchedulerOverloadedError:
+            breaker.release_probe()
+            raise
+        try:
+            with track_model_call(model):
+                response = get_genai_client().models.generate_content(
+                    model=model, contents=contents, config=generation_config
+                )
+        except Exception as e:
+            breaker.record_failure(e)
+            report_rate_limit_error(model, e, quota_class)
+            raise
+        breaker.record_success()
+        record_response(model, response)
+
+        # Only complete answers are worth replaying
+        if use_store and store and response.candidates and response.candidates[0].content and response.candidates[0].content.parts:
+            get_response_store().put(key, model, response.model_dump_json(exclude_none=True))
+        return response
+
+    response, shared = model_calls.do(("generate_content", key), call)
+    if shared:
+        record_cache_hit("single_flight")
+    if cassette is not None:
+        cassette.record("generate_content", model, key, [response], [time.perf_counter() - start])
+    return response
+
+
+async def generate_content_async(model: str, contents, generation_config=None, **kwargs):
+    """generate_content for async tools and agents.
+
+    Waiting for quota and for the model happens in a worker thread, so a
+    throttled call does not stall the other sessions on the event loop.
+    Takes the same keyword arguments as generate_content.
+    """
+    return await asyncio.to_thread(generate_content, model, contents, generation_config, **kwargs)
+
+
+def store_response(model: str, contents, response, generation_config=None) -> None:
+    """Store a response for later identical generate_content(..., cache=True) calls."""
+    if config.RESPONSE_STORE_ENABLED:
+        key = response_key(model, contents, generation_config)
+        get_response_store().put(key, model, response.model_dump_json(exclude_none=True))
+
+
+async def generate_images(model: str, prompt: str, generation_config=None, *, quota_class: str = "image"):
+    """Call client.models.generate_images without blocking the event loop.
+
+    Identical concurrent requests (same model, prompt and config) share one
+    call; its result or error is fanned out to every waiter. Inside an
+    active cassette the call is recorded or replayed.
+    """
+    from google.genai import types
+
+    key = response_key(model, prompt, generation_config)
+    cassette = current_cassette()
+    if cassette is not None and cassette.mode == REPLAY:
+        return await replay_call_async(cassette, "generate_images", model, key, types.GenerateImagesResponse)
+    start = time.perf_counter()
+
+    check_budget()
+
+    async def call():
+        breaker = get_circuit_breaker(model)
+        breaker.before_call()
+        try:
+            await acquire_quota(model, quota_class)
+        except (SchedulerOverloadedError, asyncio.CancelledError):
+            breaker.release_probe()
+            raise
+        try:
+            with track_model_call(model):
+                response = await asyncio.to_thread(
+                    get_genai_client().models.generate_images,
+                    model=model, prompt=prompt, config=generation_config,
+                )
+        except Exception as e:
+            breaker.record_failure(e)
+            report_rate_limit_error(model, e, quota_class)
+            raise
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        breaker.record_success()
+        record_response(model, response)
+        return response
+
+    response, shared = await model_calls.do_async(("generate_images", key), call)
+    if shared:
+        record_cache_hit("single_flight")
+    if cassette is not None:
+        await cassette.record_async("generate_images", model, key, [response], [time.perf_counter() - start])
+    return response
@@ -0,0 +1,65 @@
+import os
+import threading
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _get_or_create(key, factory):
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = factory()
+                _clients[key] = client
+    return client
+
+
+def _genai_key(backend, project, location):
+    if backend == "vertexai":
+        project = project or os.getenv("GOOGLE_CLOUD_PROJECT")
+        location = location or os.getenv("GOOGLE_CLOUD_LOCATION")
+    return ("genai", backend, project, location)
+
+
+def get_genai_client(backend: str = "vertexai", project: str = None, location: str = None):
+    """Return the process-wide genai client for a (backend, project, location).
+
+    The client (and its credential discovery) is only created on first use.
+    backend is "vertexai" or "gemini_api".
+    """
+    key = _genai_key(backend, project, location)
+
+    def create():
+        from google import genai
+
+        if backend == "vertexai":
+            return genai.Client(vertexai=True, project=key[2], location=key[3])
+        return genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+
+    return _get_or_create(key, create)
+
+
+def register_genai_client(client, backend: str = "vertexai", project: str = None, location: str = None) -> None:
+    """Use the given client for a (backend, project, location), e.g. a stub in benchmarks."""
+    with _clients_lock:
+        _clients[_genai_key(backend, project, location)] = client
+
+
+def get_storage_client(project: str = None):
+    """Return the process-wide Cloud Storage client, importing the library on first use."""
+    project = project or os.getenv("GOOGLE_CLOUD_PROJECT")
+
+    def create():
+        from google.cloud import storage
+
+        return storage.Client(project=project)
+
+    return _get_or_create(("storage", project), create)
+
+
+def reset_clients() -> None:
+    """Drop all cached clients so the next call builds fresh ones."""
+    with _clients_lock:
+        _clients.clear()
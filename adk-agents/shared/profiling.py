@@ -0,0 +1,203 @@
+"""Sampled cProfile and tracemalloc capture for individual tools.
+
+Enabled by PROFILE_TOOLS; a PROFILE_SAMPLE_PERCENT share of matching tool
+invocations is profiled and dumped to PROFILE_DIR/<tool>/<session>-<call>.
+Merge the dumps into a hot-function report with:
+    python -m shared.profiling PROFILE_DIR --tool generate_differentiated_worksheets
+"""
+
+import argparse
+import cProfile
+import glob
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import tracemalloc
+
+from . import config
+from .callbacks import add_callback, walk_agents
+
+MEMORY_TOP = 50
+
+# Allocations made by the profilers themselves are left out of the memory report
+_PROFILER_FILTERS = [
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+]
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+# cProfile allows one active profiler per thread, so samples never overlap
+_active_lock = threading.Lock()
+_active = {}
+
+
+def _should_profile(tool_name: str) -> bool:
+    if not config.PROFILE_TOOLS:
+        return False
+    if "*" not in config.PROFILE_TOOLS and tool_name not in config.PROFILE_TOOLS:
+        return False
+    return random.random() * 100 < config.PROFILE_SAMPLE_PERCENT
+
+
+def _dump_path(tool_name: str, session_id: str, call_id: str) -> str:
+    directory = os.path.join(config.PROFILE_DIR, _SAFE_NAME.sub("_", tool_name))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, _SAFE_NAME.sub("_", f"{session_id}-{call_id}"))
+
+
+def _before_tool(tool, args, tool_context):
+    if not _should_profile(tool.name):
+        return None
+    with _active_lock:
+        if _active:
+            return None
+        sample = {"call_id": tool_context.function_call_id, "started_tracemalloc": False}
+        _active[threading.get_ident()] = sample
+
+    if config.PROFILE_MEMORY:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            sample["started_tracemalloc"] = True
+        tracemalloc.reset_peak()
+        sample["snapshot"] = tracemalloc.take_snapshot()
+
+    sample["profiler"] = profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler (e.g. a debugger) is already active on this thread
+        sample.pop("profiler")
+    return None
+
+
+def _after_tool(tool, args, tool_context, tool_response):
+    with _active_lock:
+        sample = _active.get(threading.get_ident())
+        if sample is None or sample["call_id"] != tool_context.function_call_id:
+            return None
+        del _active[threading.get_ident()]
+
+    profiler = sample.get("profiler")
+    if profiler is not None:
+        profiler.disable()
+    path = _dump_path(tool.name, tool_context.session.id, tool_context.function_call_id)
+    if profiler is not None:
+        profiler.dump_stats(path + ".prof")
+
+    if "snapshot" in sample:
+        _, peak = tracemalloc.get_traced_memory()
+        growth = tracemalloc.take_snapshot().filter_traces(_PROFILER_FILTERS).compare_to(
+            sample["snapshot"].filter_traces(_PROFILER_FILTERS), "lineno"
+        )
+        if sample["started_tracemalloc"]:
+            tracemalloc.stop()
+        with open(path + ".mem.json", "w", encoding="utf-8") as memory_file:
+            json.dump({
+                "tool": tool.name,
+                "peak_bytes": peak,
+                "allocations": [
+                    {"location": str(stat.traceback[0]), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                    for stat in growth[:MEMORY_TOP]
+                ],
+            }, memory_file)
+    print(f"Profiled {tool.name} to {path}")
+    return None
+
+
+def _on_tool_error(tool, args, tool_context, error):
+    # Stop and dump the sample of a failed call too, or the profiler would stay on
+    return _after_tool(tool, args, tool_context, None)
+
+
+_profiled = set()
+
+
+def profile_tools(agent) -> None:
+    """Attach the sampling profiler callbacks to every LLM agent in the tree.
+
+    Does nothing unless PROFILE_TOOLS is set.
+    """
+    if not config.PROFILE_TOOLS:
+        return
+    for node in walk_agents(agent):
+        if id(node) in _profiled or not hasattr(node, "before_tool_callback"):
+            continue
+        _profiled.add(id(node))
+        add_callback(node, "before_tool_callback", _before_tool)
+        add_callback(node, "after_tool_callback", _after_tool)
+        if hasattr(node, "on_tool_error_callback"):
+            add_callback(node, "on_tool_error_callback", _on_tool_error)
+
+
+# --- Report ------------------------------------------------------------------
+
+def merge_profiles(paths):
+    """Merge cProfile dumps into one pstats.Stats, or None if there are none."""
+    stats = None
+    for path in paths:
+        if stats is None:
+            stats = pstats.Stats(path)
+        else:
+            stats.add(path)
+    return stats
+
+
+def merge_memory(paths) -> dict:
+    """Sum allocation growth per source line across tracemalloc dumps."""
+    peaks = []
+    locations = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as memory_file:
+            dump = json.load(memory_file)
+        peaks.append(dump["peak_bytes"])
+        for allocation in dump["allocations"]:
+            entry = locations.setdefault(allocation["location"], {"size_diff": 0, "count_diff": 0})
+            entry["size_diff"] += allocation["size_diff"]
+            entry["count_diff"] += allocation["count_diff"]
+    return {
+        "samples": len(peaks),
+        "max_peak_bytes": max(peaks, default=0),
+        "mean_peak_bytes": round(sum(peaks) / len(peaks)) if peaks else 0,
+        "allocations": sorted(locations.items(), key=lambda item: item[1]["size_diff"], reverse=True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge sampled tool profiles into a hot-function report")
+    parser.add_argument("directory", nargs="?", default=config.PROFILE_DIR, help="Profile dump directory")
+    parser.add_argument("--tool", action="append", help="Tool to report (repeatable, default all)")
+    parser.add_argument("--sort", default="cumulative", choices=("cumulative", "tottime", "ncalls"),
+                        help="pstats sort key")
+    parser.add_argument("--top", type=int, default=30, help="Functions and allocation sites to show")
+    args = parser.parse_args()
+
+    tools = args.tool or sorted(
+        name for name in os.listdir(args.directory) if os.path.isdir(os.path.join(args.directory, name))
+    )
+    for tool in tools:
+        directory = os.path.join(args.directory, _SAFE_NAME.sub("_", tool))
+        profiles = sorted(glob.glob(os.path.join(directory, "*.prof")))
+        memory = sorted(glob.glob(os.path.join(directory, "*.mem.json")))
+        print(f"=== {tool}: {len(profiles)} profiles, {len(memory)} memory snapshots")
+
+        stats = merge_profiles(profiles)
+        if stats is not None:
+            # Skip pstats' listing of every merged file
+            stats.files = []
+            stats.strip_dirs().sort_stats(args.sort).print_stats(args.top)
+
+        if memory:
+            summary = merge_memory(memory)
+            print(f"Peak traced memory: max {summary['max_peak_bytes'] / 1024:.1f} KiB, "
+                  f"mean {summary['mean_peak_bytes'] / 1024:.1f} KiB")
+            for location, entry in summary["allocations"][:args.top]:
+                print(f"  {entry['size_diff'] / 1024:10.1f} KiB {entry['count_diff']:8} blocks  {location}")
+
+
+if __name__ == "__main__":
+    main()
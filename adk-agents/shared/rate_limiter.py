@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from . import config
+
+
+class TokenBucket:
+    """Token bucket shared by every caller of one (model, quota class) pair.
+
+    Callers reserve a token up front and only wait when the bucket is empty,
+    so an idle process never sleeps. A 429 pushes the bucket's refill point
+    into the future, which makes every caller honour the Retry-After window.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int):
+        self.rate = max(requests_per_minute, 0.001) / 60.0
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            if now > self.updated:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+            self.tokens -= 1
+            deficit = max(0.0, -self.tokens)
+            return (self.updated - now) + deficit / self.rate
+
+    def try_acquire(self, keep: int = 0) -> float:
+        """Take a token only if one is free with `keep` more left over.
+
+        Returns 0 when a token was taken, otherwise the seconds until one
+        would be. Used by the scheduler, which decides who waits.
+        """
+        keep = min(keep, int(self.capacity) - 1)
+        with self._lock:
+            now = time.monotonic()
+            if now < self.updated:
+                return self.updated - now + (1 + keep) / self.rate
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1 + keep:
+                self.tokens -= 1
+                return 0.0
+            return (1 + keep - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Wait asynchronously until a token is available."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self) -> None:
+        """Wait in the calling thread until a token is available."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def block_for(self, seconds: float) -> None:
+        """Stop handing out tokens for the given number of seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = max(self.updated, now + seconds)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str, quota_class: str = "text") -> TokenBucket:
+    """Return the process-wide bucket for a model and quota class."""
+    key = (model, quota_class)
+    bucket = _buckets.get(key)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.get(key)
+            if bucket is None:
+                rpm, burst = config.RATE_LIMITS.get(quota_class, config.RATE_LIMITS["text"])
+                bucket = TokenBucket(rpm, burst)
+                _buckets[key] = bucket
+    return bucket
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check whether an exception is a quota exhaustion (HTTP 429) error."""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    message = str(error)
+    return code == 429 or "429" in message or "RESOURCE_EXHAUSTED" in message
+
+
+def retry_after_seconds(error: Exception):
+    """Return the back-off requested by a 429 error, or None for other errors."""
+    if not is_rate_limit_error(error):
+        return None
+
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(value)
+                return max(0.0, retry_at.timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return config.DEFAULT_RETRY_AFTER_SECONDS
+
+
+def report_rate_limit_error(model: str, error: Exception, quota_class: str = "text") -> bool:
+    """Pause the model's bucket if the error is a 429. Returns True when it was."""
+    delay = retry_after_seconds(error)
+    if delay is None:
+        return False
+    print(f"Rate limit hit for {model}, pausing {quota_class} requests for {delay:.1f}s")
+    get_rate_limiter(model, quota_class).block_for(delay)
+    return True
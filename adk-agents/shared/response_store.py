@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from . import config
+
+# Fraction of the size cap to shrink to once it is exceeded, so eviction is not run on every put
+EVICTION_TARGET = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def _canonical(value):
+    """Convert contents/config (strings, pydantic models, bytes, lists) to JSON-safe data."""
+    if hasattr(value, "model_dump"):
+        return _canonical(value.model_dump(mode="json", exclude_none=True))
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, bytes):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    return value
+
+
+def response_key(model: str, contents, generation_config=None) -> str:
+    """Stable key for (model, canonicalized contents, generation config hash)."""
+    config_hash = hashlib.sha256(
+        json.dumps(_canonical(generation_config), sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    payload = json.dumps(
+        {"model": model, "contents": _canonical(contents), "config": config_hash},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseStore:
+    """On-disk response store with a size cap, LRU eviction and a TTL.
+
+    Backed by SQLite in WAL mode so several worker processes can share one
+    file and entries survive restarts. Every failure is logged and treated
+    as a miss; the store never breaks a model call.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str):
+        """Return the stored text for a key, or None when missing or expired."""
+        try:
+            connection = self._connection()
+            now = time.time()
+            row = connection.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if now - created > self.ttl_seconds:
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return zlib.decompress(value).decode("utf-8")
+        except (sqlite3.Error, OSError, zlib.error) as e:
+            print(f"Response store read failed: {e}")
+            return None
+
+    def put(self, key: str, model: str, text: str) -> None:
+        try:
+            value = zlib.compress(text.encode("utf-8"))
+            if len(value) > self.max_bytes:
+                return
+            connection = self._connection()
+            now = time.time()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, model, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, value, len(value), now, now),
+            )
+            self._evict(connection, now)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Response store write failed: {e}")
+
+    def _evict(self, connection, now):
+        connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICTION_TARGET
+        rows = connection.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall()
+        expired = []
+        for key, size in rows:
+            if total <= target:
+                break
+            expired.append((key,))
+            total -= size
+        connection.executemany("DELETE FROM responses WHERE key = ?", expired)
+
+    def stats(self) -> dict:
+        connection = self._connection()
+        count, size = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return {"entries": count, "bytes": size, "max_bytes": self.max_bytes, "path": self.path}
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM responses")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_response_store() -> ResponseStore:
+    """Return the process-wide response store configured from the environment."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResponseStore(
+                    config.RESPONSE_STORE_PATH,
+                    config.RESPONSE_STORE_MAX_BYTES,
+                    config.RESPONSE_STORE_TTL_SECONDS,
+                )
+    return _store
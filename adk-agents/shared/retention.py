@@ -0,0 +1,64 @@
+"""Retention for long-running servers, so stored sessions and artifacts stay bounded.
+
+Each sweep deletes the sessions of every served app that have not been
+updated for RETENTION_SESSION_HOURS, together with their session-scoped
+artifacts; user-scoped ("user:") artifacts are kept. With the local artifact
+store it then evicts the oldest session artifacts past
+RETENTION_ARTIFACT_MAX_MB and removes blobs nothing refers to anymore.
+Works with any ADK session and artifact service.
+"""
+
+import asyncio
+import time
+
+from . import config
+from .artifact_store import LocalArtifactService
+
+
+async def expire_sessions(session_service, artifact_service, app_names, max_age_seconds: float) -> int:
+    """Delete sessions idle for longer than max_age_seconds; return how many."""
+    cutoff = time.time() - max_age_seconds
+    expired = 0
+    for app_name in app_names:
+        listed = await session_service.list_sessions(app_name=app_name)
+        for session in listed.sessions:
+            if session.last_update_time >= cutoff:
+                continue
+            if artifact_service is not None:
+                keys = await artifact_service.list_artifact_keys(
+                    app_name=app_name, user_id=session.user_id, session_id=session.id
+                )
+                for filename in keys:
+                    if not filename.startswith("user:"):
+                        await artifact_service.delete_artifact(
+                            app_name=app_name, user_id=session.user_id, filename=filename, session_id=session.id
+                        )
+            await session_service.delete_session(app_name=app_name, user_id=session.user_id, session_id=session.id)
+            expired += 1
+    return expired
+
+
+async def sweep(session_service, artifact_service, app_names) -> dict:
+    """Run one retention pass and return what it removed."""
+    result = {"expired_sessions": 0}
+    if config.RETENTION_SESSION_HOURS > 0:
+        result["expired_sessions"] = await expire_sessions(
+            session_service, artifact_service, app_names, config.RETENTION_SESSION_HOURS * 3600
+        )
+    if isinstance(artifact_service, LocalArtifactService):
+        max_bytes = int(config.RETENTION_ARTIFACT_MAX_MB * 1024 * 1024)
+        result.update(await asyncio.to_thread(artifact_service.collect_garbage, max_bytes))
+    return result
+
+
+async def run_retention(session_service, artifact_service, app_names) -> None:
+    """Sweep every RETENTION_SWEEP_SECONDS until cancelled."""
+    while True:
+        await asyncio.sleep(config.RETENTION_SWEEP_SECONDS)
+        try:
+            result = await sweep(session_service, artifact_service, app_names)
+        except Exception as e:
+            print(f"Retention sweep failed: {e}")
+            continue
+        if any(result.values()):
+            print(f"Retention sweep: {result}")
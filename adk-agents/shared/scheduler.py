@@ -0,0 +1,269 @@
+"""Priority and fair-share scheduling of model quota.
+
+With SCHEDULER_ENABLED every model call (agent turns through ScheduledLlm,
+tool-side calls through model_calls) waits for its token from the shared
+rate limiter in one queue per (model, quota class) instead of racing for it:
+
+- interactive calls always go before batch calls, and batch calls leave
+  SCHEDULER_BATCH_RESERVE tokens in the bucket for interactive bursts;
+- within a class, tenants share tokens by weighted fair queuing
+  (SCHEDULER_TENANT_WEIGHTS, default weight 1);
+- a call is rejected with SchedulerOverloadedError when its class queue is
+  full or it waited longer than the class allows (SCHEDULER_QUEUE_LIMITS).
+
+A request's class comes from the "priority" session state key, else from
+SCHEDULER_APP_PRIORITIES by app; its tenant from the "tenant" state key, else
+the user id. Without SCHEDULER_ENABLED calls take tokens first come, first
+served as before.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from typing import AsyncGenerator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+
+from . import config
+from .callbacks import add_callback, walk_agents
+from .instrumentation import Histogram, metrics
+from .rate_limiter import get_rate_limiter
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = {INTERACTIVE: 0, BATCH: 1}
+
+# Longest single sleep of a waiter, so deadlines and new arrivals are noticed
+POLL_SECONDS = 0.05
+
+# (priority class, tenant) of the request being served
+_current_request = contextvars.ContextVar("scheduler_request", default=None)
+
+
+class SchedulerOverloadedError(Exception):
+    """Raised instead of queueing a model call when its class is over its limits."""
+
+
+class _Ticket:
+    __slots__ = ("priority", "tenant", "finish", "enqueued", "granted", "cancelled")
+
+    def __init__(self, priority: str, tenant: str, finish: float):
+        self.priority = priority
+        self.tenant = tenant
+        self.finish = finish
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+
+
+class FairScheduler:
+    """Hands out the tokens of one rate-limit bucket in priority, then weighted-fair order.
+
+    Whichever waiter finds a token free grants it to the head of the queue,
+    so a caller blocked in a thread (or blocking the event loop) can never
+    stall waiters ahead of it.
+    """
+
+    def __init__(self, name: str, bucket):
+        self.name = name
+        self.bucket = bucket
+        self._heap = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._tenant_finish = {}
+        self._lock = threading.Lock()
+        self._granted = threading.Condition(self._lock)
+        self.queued = {priority: 0 for priority in PRIORITIES}
+        self.counts = {priority: {"granted": 0, "rejected": 0} for priority in PRIORITIES}
+        self.waits = {priority: Histogram() for priority in PRIORITIES}
+
+    def _reject(self, priority: str, reason: str):
+        self.counts[priority]["rejected"] += 1
+        metrics.increment("scheduler_rejected", scheduler=self.name, priority=priority)
+        return SchedulerOverloadedError(f"{self.name} {priority} queue {reason}")
+
+    def _enqueue(self, priority: str, tenant: str) -> _Ticket:
+        with self._lock:
+            max_queue, _ = config.SCHEDULER_QUEUE_LIMITS[priority]
+            if self.queued[priority] >= max_queue:
+                raise self._reject(priority, f"is full ({max_queue} waiting)")
+            weight = config.SCHEDULER_TENANT_WEIGHTS.get(tenant, 1.0)
+            start = max(self._virtual_time, self._tenant_finish.get(tenant, 0.0))
+            ticket = _Ticket(priority, tenant, start + 1.0 / weight)
+            self._tenant_finish[tenant] = ticket.finish
+            heapq.heappush(self._heap, (PRIORITIES[priority], ticket.finish, next(self._sequence), ticket))
+            self.queued[priority] += 1
+            return ticket
+
+    def _dispatch(self) -> float:
+        """Grant free tokens to the queue head; return the seconds until the next one (lock held)."""
+        while self._heap:
+            ticket = self._heap[0][3]
+            if ticket.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            keep = config.SCHEDULER_BATCH_RESERVE if ticket.priority == BATCH else 0
+            wait = self.bucket.try_acquire(keep)
+            if wait > 0:
+                return wait
+            heapq.heappop(self._heap)
+            ticket.granted = True
+            self._virtual_time = max(self._virtual_time, ticket.finish - 1.0 / config.SCHEDULER_TENANT_WEIGHTS.get(ticket.tenant, 1.0))
+            self.queued[ticket.priority] -= 1
+            self.counts[ticket.priority]["granted"] += 1
+            waited = time.monotonic() - ticket.enqueued
+            self.waits[ticket.priority].record(waited * 1_000_000)
+            metrics.histogram("scheduler_wait", scheduler=self.name, priority=ticket.priority).record(waited * 1_000_000)
+            self._granted.notify_all()
+        return POLL_SECONDS
+
+    def _poll(self, ticket: _Ticket) -> float:
+        """Dispatch and return 0 once the ticket is granted, else how long to sleep (lock held)."""
+        wait = self._dispatch()
+        if ticket.granted:
+            return 0.0
+        _, max_wait = config.SCHEDULER_QUEUE_LIMITS[ticket.priority]
+        remaining = ticket.enqueued + max_wait - time.monotonic()
+        if remaining <= 0:
+            ticket.cancelled = True
+            self.queued[ticket.priority] -= 1
+            raise self._reject(ticket.priority, f"wait exceeded {max_wait}s")
+        return max(0.001, min(wait, remaining, POLL_SECONDS))
+
+    def acquire_blocking(self, priority: str, tenant: str) -> None:
+        ticket = self._enqueue(priority, tenant)
+        with self._lock:
+            while True:
+                delay = self._poll(ticket)
+                if not delay:
+                    return
+                self._granted.wait(delay)
+
+    async def acquire(self, priority: str, tenant: str) -> None:
+        ticket = self._enqueue(priority, tenant)
+        try:
+            while True:
+                with self._lock:
+                    delay = self._poll(ticket)
+                if not delay:
+                    return
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            with self._lock:
+                if not ticket.granted and not ticket.cancelled:
+                    ticket.cancelled = True
+                    self.queued[ticket.priority] -= 1
+            raise
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                priority: {
+                    "queued": self.queued[priority],
+                    **self.counts[priority],
+                    "wait_ms_p50": round(self.waits[priority].percentile(0.5) / 1000, 1),
+                    "wait_ms_p95": round(self.waits[priority].percentile(0.95) / 1000, 1),
+                }
+                for priority in PRIORITIES
+            }
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(model: str, quota_class: str = "text") -> FairScheduler:
+    """Return the process-wide scheduler in front of a model's rate limiter."""
+    key = (model, quota_class)
+    scheduler = _schedulers.get(key)
+    if scheduler is None:
+        with _schedulers_lock:
+            scheduler = _schedulers.get(key)
+            if scheduler is None:
+                scheduler = FairScheduler(f"{model}/{quota_class}", get_rate_limiter(model, quota_class))
+                _schedulers[key] = scheduler
+    return scheduler
+
+
+def current_request():
+    """(priority class, tenant) of the current request; interactive and anonymous outside one."""
+    return _current_request.get() or (INTERACTIVE, "default")
+
+
+def acquire_quota_blocking(model: str, quota_class: str = "text") -> None:
+    """Wait in the calling thread for a model quota token."""
+    if not config.SCHEDULER_ENABLED:
+        get_rate_limiter(model, quota_class).acquire_blocking()
+        return
+    get_scheduler(model, quota_class).acquire_blocking(*current_request())
+
+
+async def acquire_quota(model: str, quota_class: str = "text") -> None:
+    """Wait asynchronously for a model quota token."""
+    if not config.SCHEDULER_ENABLED:
+        await get_rate_limiter(model, quota_class).acquire()
+        return
+    await get_scheduler(model, quota_class).acquire(*current_request())
+
+
+def scheduler_status() -> dict:
+    return {
+        "enabled": config.SCHEDULER_ENABLED,
+        "schedulers": {scheduler.name: scheduler.snapshot() for scheduler in list(_schedulers.values())},
+    }
+
+
+# --- ADK integration ---------------------------------------------------------
+
+def _classify_request(callback_context):
+    state = callback_context.state
+    priority = state.get("priority")
+    if priority not in PRIORITIES:
+        priority = config.SCHEDULER_APP_PRIORITIES.get(callback_context.session.app_name, INTERACTIVE)
+    tenant = state.get("tenant") or callback_context.session.user_id
+    _current_request.set((priority, str(tenant)))
+    return None
+
+
+class ScheduledLlm(BaseLlm):
+    """Model wrapper that waits for a scheduled quota token before each agent turn."""
+
+    inner: Optional[BaseLlm] = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        try:
+            await acquire_quota(self.model)
+        except SchedulerOverloadedError as e:
+            from google.genai import types
+
+            print(f"Model call rejected: {e}")
+            yield LlmResponse(
+                error_code="SCHEDULER_OVERLOADED",
+                error_message=str(e),
+                content=types.Content(role="model", parts=[types.Part(text="The service is busy, please retry.")]),
+            )
+            return
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            yield response
+
+
+_scheduled = set()
+
+
+def apply_scheduler(root_agent) -> None:
+    """Schedule every model call of the tree when SCHEDULER_ENABLED is set."""
+    from google.adk.agents import LlmAgent
+
+    if not config.SCHEDULER_ENABLED or id(root_agent) in _scheduled:
+        return
+    _scheduled.add(id(root_agent))
+    add_callback(root_agent, "before_agent_callback", _classify_request)
+    for node in walk_agents(root_agent):
+        if isinstance(node, LlmAgent) and not isinstance(node.model, ScheduledLlm):
+            inner = node.canonical_model
+            node.model = ScheduledLlm(model=inner.model, inner=inner)
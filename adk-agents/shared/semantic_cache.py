@@ -0,0 +1,124 @@
+import copy
+import re
+import threading
+import unicodedata
+import zlib
+
+import numpy as np
+
+from . import config
+from .instrumentation import record_cache_hit
+
+NGRAM_SIZES = (2, 3, 4)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", str(text)).lower()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def vectorize(text: str, dimensions: int) -> np.ndarray:
+    """Hash character n-grams of a text into a unit-length vector (no model call).
+
+    Works on any script, so Devanagari and Latin requests are handled alike.
+    A hash-derived sign keeps colliding n-grams from always adding up.
+    """
+    text = f" {normalize_text(text)} "
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for size in NGRAM_SIZES:
+        for start in range(len(text) - size + 1):
+            digest = zlib.crc32(text[start:start + size].encode("utf-8"))
+            vector[digest % dimensions] += 1.0 if digest & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """Bounded cosine-similarity cache over request texts.
+
+    Entries live in a fixed-size matrix, so memory is capped at
+    capacity x dimensions floats plus the stored results; inserts overwrite
+    the oldest slot once the cache is full. A lookup only compares against
+    entries whose partition (e.g. language, region, grade) matches exactly.
+    """
+
+    def __init__(self, name: str, capacity: int, dimensions: int, threshold: float):
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.dimensions = dimensions
+        self.threshold = threshold
+        self.vectors = np.zeros((self.capacity, dimensions), dtype=np.float32)
+        self.values = [None] * self.capacity
+        self.partitions = [None] * self.capacity
+        self._slots = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, text: str, partition):
+        """Return (stored value copy, similarity) for the closest match, or (None, best similarity)."""
+        vector = vectorize(text, self.dimensions)
+        with self._lock:
+            slots = self._slots.get(partition)
+            if not slots:
+                return None, 0.0
+            indexes = np.fromiter(slots, dtype=np.intp, count=len(slots))
+            similarities = self.vectors[indexes] @ vector
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                return None, similarity
+            value = self.values[indexes[best]]
+        record_cache_hit(self.name)
+        return copy.deepcopy(value), similarity
+
+    def insert(self, text: str, partition, value) -> None:
+        vector = vectorize(text, self.dimensions)
+        value = copy.deepcopy(value)
+        with self._lock:
+            slot = self._next
+            self._next = (self._next + 1) % self.capacity
+            previous = self.partitions[slot]
+            if previous is not None:
+                self._slots[previous].discard(slot)
+                if not self._slots[previous]:
+                    del self._slots[previous]
+            self.vectors[slot] = vector
+            self.values[slot] = value
+            self.partitions[slot] = partition
+            self._slots.setdefault(partition, set()).add(slot)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(slots) for slots in self._slots.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self.vectors.fill(0)
+            self.values = [None] * self.capacity
+            self.partitions = [None] * self.capacity
+            self._slots.clear()
+            self._next = 0
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_semantic_cache(name: str):
+    """Return the named process-wide semantic cache, or None when disabled."""
+    if not config.SEMANTIC_CACHE_ENABLED:
+        return None
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                cache = SemanticCache(
+                    name,
+                    config.SEMANTIC_CACHE_CAPACITY,
+                    config.SEMANTIC_CACHE_DIMENSIONS,
+                    config.SEMANTIC_CACHE_THRESHOLD,
+                )
+                _caches[name] = cache
+    return cache
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one in-flight call.
+
+    The first caller (the leader) runs the function; callers arriving while
+    it runs wait for and share its result or exception. Nothing is kept once
+    the call finishes, so later callers always trigger a fresh call.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._tasks = {}
+
+    def do(self, key, fn):
+        """Run fn() once per key across threads; returns (result, shared).
+
+        shared is True for callers that received another caller's result.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            # Waiters must not hang, even on KeyboardInterrupt/SystemExit
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def do_async(self, key, coroutine_fn):
+        """Await coroutine_fn() once per key within the event loop; returns (result, shared).
+
+        Cancelling one waiter does not cancel the shared call; it is only
+        cancelled when every waiter has gone away.
+        """
+        key = (id(asyncio.get_running_loop()), key)
+        entry = self._tasks.get(key)
+        shared = entry is not None
+        if entry is None:
+            entry = {"task": asyncio.ensure_future(coroutine_fn()), "waiters": 0}
+            self._tasks[key] = entry
+            entry["task"].add_done_callback(lambda _: self._forget(key, entry))
+
+        task = entry["task"]
+        entry["waiters"] += 1
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if not task.done() and entry["waiters"] == 1:
+                task.cancel()
+            raise
+        finally:
+            entry["waiters"] -= 1
+
+    def _forget(self, key, entry):
+        if self._tasks.get(key) is entry:
+            del self._tasks[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._tasks)
+
+
+# One process-wide group for model calls
+model_calls = SingleFlight()
@@ -0,0 +1,87 @@
+import json
+import re
+import zlib
+
+from . import config
+from .callbacks import add_callback, walk_agents
+
+# State keys written once per loop iteration as <prefix>_<iteration>
+ITERATION_PAYLOAD_PREFIXES = ("generated_content", "generated_worksheets")
+_ITERATION_KEY = re.compile(r"^(%s)_(\d+)$" % "|".join(ITERATION_PAYLOAD_PREFIXES))
+
+ARTIFACT_MIME_TYPE = "application/json+zlib"
+
+
+def is_offloaded(value) -> bool:
+    return isinstance(value, dict) and value.keys() == {"artifact", "version", "bytes"}
+
+
+def truncate_text(text, limit: int = None) -> str:
+    """Cap free text echoed into session state."""
+    limit = limit or config.STATE_TEXT_MAX_CHARS
+    text = str(text)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+async def offload_state_value(tool_context, key: str, value) -> dict:
+    """Save a state value as a compressed JSON artifact and store a reference in its place."""
+    from google.genai import types
+
+    data = json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+    artifact_name = f"state_{key}.json"
+    version = await tool_context.save_artifact(
+        artifact_name, types.Part.from_bytes(data=zlib.compress(data), mime_type=ARTIFACT_MIME_TYPE)
+    )
+    reference = {"artifact": artifact_name, "version": version, "bytes": len(data)}
+    tool_context.state[key] = reference
+    return reference
+
+
+async def load_state_value(context, key: str):
+    """Return a state value, loading it from its artifact if it was offloaded."""
+    value = context.state.get(key)
+    if not is_offloaded(value):
+        return value
+    part = await context.load_artifact(value["artifact"], version=value["version"])
+    if part is None or part.inline_data is None:
+        return None
+    return json.loads(zlib.decompress(part.inline_data.data).decode("utf-8"))
+
+
+async def enforce_state_budget(tool, args, tool_context, tool_response):
+    """After-tool callback keeping per-iteration payloads out of session state.
+
+    Large <prefix>_<n> values written by the tool go to artifacts before the
+    state delta is persisted, and references older than STATE_KEEP_ITERATIONS
+    iterations are evicted, so state size does not grow with the loop count.
+    """
+    delta = tool_context.actions.state_delta
+    for key in [key for key in delta if _ITERATION_KEY.match(key)]:
+        prefix, iteration = _ITERATION_KEY.match(key).groups()
+        value = delta[key]
+        if value is not None and not is_offloaded(value):
+            size = len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+            if size > config.STATE_INLINE_MAX_BYTES:
+                try:
+                    await offload_state_value(tool_context, key, value)
+                except ValueError as e:
+                    # No artifact service configured; the value stays inline
+                    print(f"Could not offload {key} to an artifact: {e}")
+
+        for previous in range(int(iteration) - config.STATE_KEEP_ITERATIONS):
+            previous_key = f"{prefix}_{previous}"
+            if tool_context.state.get(previous_key) is not None:
+                tool_context.state[previous_key] = None
+    return None
+
+
+_budgeted = set()
+
+
+def apply_state_budget(agent) -> None:
+    """Install enforce_state_budget on every LLM agent in the tree."""
+    for node in walk_agents(agent):
+        if id(node) in _budgeted or not hasattr(node, "after_tool_callback"):
+            continue
+        _budgeted.add(id(node))
+        add_callback(node, "after_tool_callback", enforce_state_budget)
@@ -0,0 +1,143 @@
+"""Deterministic pipeline stages that call their tools without a model turn.
+
+Several sub-agents only ask the model to call pure-Python tools in a fixed
+order and relay the result, which costs at least two model turns per stage.
+A ToolStage runs the same tools directly, in the same place in the
+SequentialAgent and under the same name, and emits the function call and
+response events an LlmAgent would, so session state, eval trajectories and
+the shared tool callbacks (usage, spans, profiling, state budget) behave the
+same. It also accepts model callbacks so the shared installers can treat it
+like an LlmAgent; they never fire.
+"""
+
+import inspect
+import uuid
+from typing import Any, AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event, EventActions
+from google.adk.tools import FunctionTool, ToolContext
+from google.genai import types
+
+from . import config
+
+
+def user_text(ctx) -> str:
+    """Text of the user message that started the invocation."""
+    content = ctx.user_content
+    return "".join(part.text or "" for part in (content.parts or [])) if content else ""
+
+
+def find_value(responses, key: str):
+    """First value under key in the tool responses so far, searching nested dicts."""
+    stack = list(reversed(responses))
+    while stack:
+        payload = stack.pop()
+        if isinstance(payload, dict):
+            if key in payload:
+                return payload[key]
+            stack.extend(reversed([value for value in payload.values() if isinstance(value, dict)]))
+    return None
+
+
+async def _run_callbacks(callbacks, **kwargs):
+    if callbacks is None:
+        return None
+    for callback in callbacks if isinstance(callbacks, list) else [callbacks]:
+        result = callback(**kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        if result is not None:
+            return result
+    return None
+
+
+class ToolStage(BaseAgent):
+    """Calls a fixed sequence of tools and stores a summary under output_key.
+
+    steps is a list of (function, arguments) pairs; arguments is None or a
+    callable (ctx, responses) -> dict building the tool arguments from the
+    invocation and the responses of the earlier steps.
+    """
+
+    steps: list[Any]
+    output_key: Optional[str] = None
+    before_model_callback: Any = None
+    after_model_callback: Any = None
+    before_tool_callback: Any = None
+    after_tool_callback: Any = None
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self.steps = [
+            (step if isinstance(step, FunctionTool) else FunctionTool(func=step), arguments)
+            for step, arguments in self.steps
+        ]
+
+    async def _call_tool(self, tool, args: dict, tool_context) -> dict:
+        response = await _run_callbacks(
+            self.before_tool_callback, tool=tool, args=args, tool_context=tool_context
+        )
+        if response is None:
+            response = await tool.run_async(args=args, tool_context=tool_context)
+            if not isinstance(response, dict):
+                response = {"result": response}
+            replaced = await _run_callbacks(
+                self.after_tool_callback, tool=tool, args=args, tool_context=tool_context, tool_response=response
+            )
+            if replaced is not None:
+                response = replaced
+        return response
+
+    async def _run_async_impl(self, ctx) -> AsyncGenerator[Event, None]:
+        responses = []
+        for tool, arguments in self.steps:
+            args = arguments(ctx, responses) if arguments else {}
+            call_id = f"stage-{uuid.uuid4()}"
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                content=types.Content(role="model", parts=[
+                    types.Part(function_call=types.FunctionCall(id=call_id, name=tool.name, args=args))
+                ]),
+            )
+
+            tool_context = ToolContext(ctx, function_call_id=call_id)
+            response = await self._call_tool(tool, args, tool_context)
+            responses.append(response)
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                content=types.Content(role="user", parts=[
+                    types.Part(function_response=types.FunctionResponse(id=call_id, name=tool.name, response=response))
+                ]),
+                actions=tool_context.actions,
+            )
+            if tool_context.actions.escalate:
+                return
+
+        summary = " ".join(str(response["message"]) for response in responses if response.get("message"))
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=summary or "Done.")]),
+            actions=EventActions(state_delta={self.output_key: summary} if self.output_key else {}),
+        )
+
+
+def tool_stage(agent, steps) -> ToolStage:
+    """ToolStage standing in for an LlmAgent: same name, description and output_key."""
+    return ToolStage(name=agent.name, description=agent.description or "", steps=steps, output_key=agent.output_key)
+
+
+def fast_path(agent, stages: dict):
+    """The deterministic replacement for agent when FAST_PATH_ENABLED, else agent.
+
+    stages maps agent names to their (function, arguments) steps.
+    """
+    if not config.FAST_PATH_ENABLED or agent.name not in stages:
+        return agent
+    return tool_stage(agent, stages[agent.name])
@@ -0,0 +1,379 @@
+"""Token, image and cost ledger per session.
+
+Agent turns are recorded from ADK model callbacks and tool-side model calls
+from the shared model_calls gateway. The session and stage of a call come
+from context variables set by the callbacks, so tools need no changes.
+
+Offline report from a USAGE_LEDGER_PATH file:
+    python -m shared.usage ledger.jsonl
+"""
+
+import argparse
+import contextvars
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from . import config
+from .callbacks import add_callback, walk_agents
+
+# USD per 1M tokens (input, cached input, output) or per generated image, matched by model prefix
+DEFAULT_PRICES = {
+    "gemini-2.0-flash-lite": {"input": 0.075, "cached_input": 0.01875, "output": 0.30},
+    "gemini-2.0-flash": {"input": 0.10, "cached_input": 0.025, "output": 0.40},
+    "gemini-2.5-flash": {"input": 0.30, "cached_input": 0.075, "output": 2.50},
+    "gemini-2.5-pro": {"input": 1.25, "cached_input": 0.31, "output": 10.00},
+    "imagen-3.0": {"image": 0.04},
+    "imagen-4.0": {"image": 0.04},
+}
+PRICES = {**DEFAULT_PRICES, **config.MODEL_PRICES}
+
+COUNTERS = ("calls", "prompt_tokens", "output_tokens", "cached_tokens", "images")
+
+# (app_name, user_id, session_id) of the invocation being served
+_current_session = contextvars.ContextVar("usage_session", default=None)
+# Agent or tool name that model calls are attributed to
+_current_stage = contextvars.ContextVar("usage_stage", default=None)
+# Model named in the agent's pending LLM request
+_current_model = contextvars.ContextVar("usage_model", default=None)
+
+
+class BudgetExceededError(Exception):
+    """Raised instead of calling a model once a session or its user has spent a token budget."""
+
+    def __init__(self, session_id: str, used: int, budget: int, user_id: str = None):
+        if user_id is None:
+            super().__init__(f"Session {session_id} used {used} of {budget} tokens")
+        else:
+            super().__init__(f"User {user_id} used {used} of {budget} tokens in {config.USAGE_USER_WINDOW_HOURS:g}h")
+        self.session_id = session_id
+        self.user_id = user_id
+        self.used = used
+        self.budget = budget
+
+
+def _price(model: str):
+    matches = [prefix for prefix in PRICES if model and model.startswith(prefix)]
+    return PRICES[max(matches, key=len)] if matches else None
+
+
+def call_cost(model: str, prompt_tokens: int, output_tokens: int, images: int, cached_tokens: int = 0) -> float:
+    """Estimated USD cost of one call; 0 for models without a price.
+
+    cached_tokens are the part of prompt_tokens served from a context cache.
+    """
+    price = _price(model)
+    if price is None:
+        return 0.0
+    cached_tokens = min(cached_tokens, prompt_tokens)
+    return (
+        (prompt_tokens - cached_tokens) * price.get("input", 0) / 1_000_000
+        + cached_tokens * price.get("cached_input", price.get("input", 0)) / 1_000_000
+        + output_tokens * price.get("output", 0) / 1_000_000
+        + images * price.get("image", 0)
+    )
+
+
+def cache_savings(model: str, cached_tokens: int) -> float:
+    """USD saved by serving cached_tokens from a context cache instead of as input."""
+    price = _price(model)
+    if price is None or not cached_tokens:
+        return 0.0
+    return cached_tokens * (price.get("input", 0) - price.get("cached_input", price.get("input", 0))) / 1_000_000
+
+
+def _empty_totals() -> dict:
+    return {**{counter: 0 for counter in COUNTERS}, "cost_usd": 0.0, "saved_usd": 0.0}
+
+
+def _add(totals: dict, record: dict) -> None:
+    for counter in COUNTERS:
+        totals[counter] += record.get(counter, 0)
+    totals["cost_usd"] += record.get("cost_usd", 0.0)
+    totals["saved_usd"] += record.get("saved_usd", 0.0)
+
+
+class UsageLedger:
+    """Aggregates model usage per session, per stage and per model.
+
+    User totals cover the current window of window_seconds and are dropped
+    with the window; past max_users the least recently active user goes first.
+    """
+
+    def __init__(self, max_sessions: int, max_users: int = 10000, window_seconds: float = 86400):
+        self.max_sessions = max_sessions
+        self.max_users = max_users
+        self.window_seconds = window_seconds
+        self._sessions = OrderedDict()
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _user_window(self, user_id: str, now: float, create: bool):
+        """The user's totals for the window containing now (lock held)."""
+        window = self._users.get(user_id)
+        if window is not None and now - window["start"] >= self.window_seconds:
+            del self._users[user_id]
+            window = None
+        if window is None and create:
+            window = {"start": now, "totals": _empty_totals()}
+            self._users[user_id] = window
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        elif window is not None:
+            self._users.move_to_end(user_id)
+        return window
+
+    def record(self, model: str, prompt_tokens: int = 0, output_tokens: int = 0, cached_tokens: int = 0,
+               images: int = 0, stage: str = None, session=None) -> dict:
+        """Add one model call to the ledger of the current (or given) session."""
+        app_name, user_id, session_id = session or _current_session.get() or (None, None, None)
+        record = {
+            "ts": time.time(),
+            "app": app_name,
+            "user_id": user_id,
+            "session_id": session_id,
+            "stage": stage or _current_stage.get() or "unattributed",
+            "model": model,
+            "calls": 1,
+            "prompt_tokens": prompt_tokens or 0,
+            "output_tokens": output_tokens or 0,
+            "cached_tokens": cached_tokens or 0,
+            "images": images or 0,
+        }
+        record["cost_usd"] = call_cost(model, record["prompt_tokens"], record["output_tokens"], record["images"],
+                                       record["cached_tokens"])
+        record["saved_usd"] = cache_savings(model, record["cached_tokens"])
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                entry = {"app": app_name, "user_id": user_id, "totals": _empty_totals(), "stages": {}}
+                self._sessions[session_id] = entry
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            _add(entry["totals"], record)
+            stage_key = (record["stage"], model)
+            _add(entry["stages"].setdefault(stage_key, _empty_totals()), record)
+            _add(self._user_window(user_id, record["ts"], create=True)["totals"], record)
+
+        if config.USAGE_LEDGER_PATH:
+            with self._lock, open(config.USAGE_LEDGER_PATH, "a", encoding="utf-8") as ledger_file:
+                ledger_file.write(json.dumps(record) + "\n")
+        return record
+
+    def tokens_used(self, session_id: str) -> int:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return 0
+            return entry["totals"]["prompt_tokens"] + entry["totals"]["output_tokens"]
+
+    def session_summary(self, session_id: str) -> dict:
+        """Totals and the per-stage breakdown of one session, most expensive stage first."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return {"session_id": session_id, "totals": _empty_totals(), "stages": []}
+            stages = [
+                {"stage": stage, "model": model, **dict(totals)}
+                for (stage, model), totals in entry["stages"].items()
+            ]
+            totals = dict(entry["totals"])
+        stages.sort(key=lambda stage: (stage["cost_usd"], stage["prompt_tokens"] + stage["output_tokens"]),
+                    reverse=True)
+        return {"session_id": session_id, "app": entry["app"], "user_id": entry["user_id"],
+                "totals": totals, "stages": stages}
+
+    def user_totals(self, user_id: str) -> dict:
+        """Totals of the user's current window."""
+        with self._lock:
+            window = self._user_window(user_id, time.time(), create=False)
+            return dict(window["totals"]) if window else _empty_totals()
+
+    def user_tokens_used(self, user_id: str) -> int:
+        totals = self.user_totals(user_id)
+        return totals["prompt_tokens"] + totals["output_tokens"]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self._users.clear()
+
+
+ledger = UsageLedger(config.USAGE_MAX_SESSIONS, config.USAGE_MAX_USERS, config.USAGE_USER_WINDOW_HOURS * 3600)
+
+
+def check_budget() -> None:
+    """Raise BudgetExceededError if the current session or its user has spent a token budget."""
+    session = _current_session.get()
+    if session is None:
+        return
+    _, user_id, session_id = session
+    budget = config.USAGE_SESSION_TOKEN_BUDGET
+    if budget:
+        used = ledger.tokens_used(session_id)
+        if used >= budget:
+            raise BudgetExceededError(session_id, used, budget)
+    budget = config.USAGE_USER_TOKEN_BUDGET
+    if budget and user_id is not None:
+        used = ledger.user_tokens_used(user_id)
+        if used >= budget:
+            raise BudgetExceededError(session_id, used, budget, user_id=user_id)
+
+
+def record_response(model: str, response) -> None:
+    """Record a google.genai generate_content or generate_images response."""
+    usage = getattr(response, "usage_metadata", None)
+    images = len(getattr(response, "generated_images", None) or [])
+    ledger.record(
+        model,
+        prompt_tokens=getattr(usage, "prompt_token_count", 0),
+        output_tokens=getattr(usage, "candidates_token_count", 0),
+        cached_tokens=getattr(usage, "cached_content_token_count", 0),
+        images=images,
+    )
+
+
+# --- ADK callbacks -----------------------------------------------------------
+
+def _session_of(context):
+    session = context.session
+    return session.app_name, session.user_id, session.id
+
+
+def _before_agent(callback_context):
+    _current_session.set(_session_of(callback_context))
+    return None
+
+
+def _before_model(callback_context, llm_request):
+    _current_session.set(_session_of(callback_context))
+    _current_model.set(getattr(llm_request, "model", None))
+    try:
+        check_budget()
+    except BudgetExceededError as e:
+        from google.adk.models import LlmResponse
+        from google.genai import types
+
+        print(f"Token budget exceeded: {e}")
+        return LlmResponse(
+            error_code="TOKEN_BUDGET_EXCEEDED",
+            error_message=str(e),
+            content=types.Content(role="model", parts=[types.Part(text="The token budget is used up.")]),
+        )
+    return None
+
+
+def _after_model(callback_context, llm_response):
+    if getattr(llm_response, "partial", False) or llm_response.error_code == "TOKEN_BUDGET_EXCEEDED":
+        return None
+    usage = llm_response.usage_metadata
+    ledger.record(
+        llm_response.model_version or _current_model.get() or "unknown",
+        prompt_tokens=getattr(usage, "prompt_token_count", 0),
+        output_tokens=getattr(usage, "candidates_token_count", 0),
+        cached_tokens=getattr(usage, "cached_content_token_count", 0),
+        stage=callback_context.agent_name,
+        session=_session_of(callback_context),
+    )
+    return None
+
+
+def _before_tool(tool, args, tool_context):
+    _current_session.set(_session_of(tool_context))
+    _current_stage.set(tool.name)
+    return None
+
+
+def _after_tool(tool, args, tool_context, tool_response):
+    _current_stage.set(None)
+    return None
+
+
+_tracked = set()
+
+
+def track_usage(agent) -> None:
+    """Attach the usage ledger callbacks to an agent and all of its sub-agents."""
+    for node in walk_agents(agent):
+        if id(node) in _tracked:
+            continue
+        _tracked.add(id(node))
+        add_callback(node, "before_agent_callback", _before_agent)
+        if hasattr(node, "before_tool_callback"):
+            add_callback(node, "before_model_callback", _before_model)
+            add_callback(node, "after_model_callback", _after_model)
+            add_callback(node, "before_tool_callback", _before_tool)
+            add_callback(node, "after_tool_callback", _after_tool)
+
+
+# --- Offline report ----------------------------------------------------------
+
+def load_ledger(path: str):
+    with open(path, encoding="utf-8") as ledger_file:
+        for line in ledger_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def build_report(records) -> dict:
+    """Aggregate ledger records by stage, model, app and user."""
+    report = {"totals": _empty_totals(), "sessions": set()}
+    groups = {"stage": {}, "model": {}, "app": {}, "user_id": {}}
+    for record in records:
+        _add(report["totals"], record)
+        report["sessions"].add(record.get("session_id"))
+        for field, group in groups.items():
+            _add(group.setdefault(str(record.get(field)), _empty_totals()), record)
+
+    sessions = len(report["sessions"]) or 1
+    report["sessions"] = len(report["sessions"])
+    report["per_session"] = {
+        counter: round(report["totals"][counter] / sessions, 4) for counter in (*COUNTERS, "cost_usd", "saved_usd")
+    }
+    for field, group in groups.items():
+        report[f"by_{field}"] = dict(sorted(group.items(), key=lambda item: item[1]["cost_usd"], reverse=True))
+    return report
+
+
+def _print_report(report: dict) -> None:
+    totals = report["totals"]
+    print(
+        f"{report['sessions']} sessions, {totals['calls']} model calls, "
+        f"{totals['prompt_tokens']} prompt + {totals['output_tokens']} output tokens, "
+        f"{totals['images']} images, ${totals['cost_usd']:.4f}"
+    )
+    if totals["cached_tokens"]:
+        print(f"Context cache: {totals['cached_tokens']} prompt tokens cached, ${totals['saved_usd']:.4f} saved")
+    print(f"Per session: ${report['per_session']['cost_usd']:.4f}, "
+          f"{report['per_session']['prompt_tokens'] + report['per_session']['output_tokens']:.0f} tokens")
+    for field in ("app", "stage", "model"):
+        print(f"\nBy {field}:")
+        for name, group in report[f"by_{field}"].items():
+            print(
+                f"  {name:40} {group['calls']:6} calls {group['prompt_tokens']:10} in "
+                f"{group['output_tokens']:9} out {group['cached_tokens']:9} cached {group['images']:4} img  "
+                f"${group['cost_usd']:.4f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a model usage ledger")
+    parser.add_argument("ledger", nargs="?", default=config.USAGE_LEDGER_PATH, help="Ledger JSONL file")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    if not args.ledger:
+        parser.error("no ledger file given and USAGE_LEDGER_PATH is not set")
+
+    report = build_report(load_ledger(args.ledger))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
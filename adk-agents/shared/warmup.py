@@ -0,0 +1,147 @@
+"""Warm start for a served root agent.
+
+warm_up() runs once per process before it takes traffic: it calls the agent
+package's preload() (guidelines, templates, plan tables), builds the model
+and storage clients, pushes one synthetic request through the full ADK
+pipeline with canned model replies, creating the context caches of its agents
+on the way, and optionally sends one tiny real model request so credentials
+and the HTTP connection are ready.
+"""
+
+import asyncio
+import contextvars
+import importlib
+import time
+
+from . import config
+from .callbacks import add_callback, walk_agents
+from .context_cache import prepare as prepare_context_cache, wait_for_context_caches
+from .model_calls import generate_content
+from .model_clients import get_genai_client, get_storage_client
+
+WARMUP_USER = "warmup"
+WARMUP_MESSAGE = "Warm-up request"
+WARMUP_TIMEOUT_SECONDS = 60
+
+# Set while the synthetic request runs; model calls then get a canned reply
+_warming_up = contextvars.ContextVar("warming_up", default=False)
+
+
+def _canned_response(callback_context, llm_request):
+    if not _warming_up.get():
+        return None
+    from google.adk.models import LlmResponse
+    from google.genai import types
+
+    # Create the agent's context cache from its real request prefix
+    prepare_context_cache(callback_context.agent_name, llm_request)
+    # Let each loop run one full pass, then stop it from its last step
+    if callback_context.agent_name in _loop_exits:
+        callback_context.actions.escalate = True
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Warm-up.")]))
+
+
+_canned = set()
+_loop_exits = set()
+
+
+def _install_canned_responses(root_agent) -> None:
+    from google.adk.agents import LoopAgent
+
+    for node in walk_agents(root_agent):
+        if isinstance(node, LoopAgent) and node.sub_agents:
+            _loop_exits.update(agent.name for agent in walk_agents(node.sub_agents[-1]))
+        if id(node) not in _canned and hasattr(node, "before_model_callback"):
+            _canned.add(id(node))
+            add_callback(node, "before_model_callback", _canned_response)
+
+
+def _first_model(root_agent):
+    for node in walk_agents(root_agent):
+        model = getattr(node, "model", None)
+        if isinstance(model, str) and model:
+            return model
+    return None
+
+
+def preload(root_agent) -> None:
+    """Call <package>.agent.preload() for the root agent's package, if it has one."""
+    try:
+        module = importlib.import_module(f"{root_agent.name}.agent")
+    except ImportError:
+        return
+    if hasattr(module, "preload"):
+        module.preload()
+
+
+async def run_synthetic_request(root_agent, session_service=None, artifact_service=None) -> int:
+    """Run one request through the pipeline with canned model replies; returns the event count."""
+    from google.adk.runners import InMemoryRunner, Runner
+    from google.genai import types
+
+    _install_canned_responses(root_agent)
+    if session_service is None:
+        runner = InMemoryRunner(agent=root_agent, app_name=root_agent.name)
+    else:
+        runner = Runner(app_name=root_agent.name, agent=root_agent,
+                        session_service=session_service, artifact_service=artifact_service)
+
+    session = await runner.session_service.create_session(app_name=root_agent.name, user_id=WARMUP_USER)
+    message = types.Content(role="user", parts=[types.Part(text=WARMUP_MESSAGE)])
+    token = _warming_up.set(True)
+    events = 0
+    try:
+        async for _ in runner.run_async(user_id=WARMUP_USER, session_id=session.id, new_message=message):
+            events += 1
+    finally:
+        _warming_up.reset(token)
+        await runner.session_service.delete_session(
+            app_name=root_agent.name, user_id=WARMUP_USER, session_id=session.id
+        )
+    return events
+
+
+def ping_model(model: str) -> None:
+    """Send a one-token request so auth and the connection pool are ready.
+
+    Goes through model_calls, so it is rate limited and shows up in the usage ledger.
+    """
+    from google.genai import types
+
+    generate_content(model, "ping", types.GenerateContentConfig(max_output_tokens=1))
+
+
+async def warm_up_async(root_agent, session_service=None, artifact_service=None) -> dict:
+    """Warm up one root agent; returns the seconds spent per step. Failures are logged, not raised."""
+    timings = {}
+
+    async def step(name, function, *args):
+        start = time.perf_counter()
+        try:
+            result = function(*args)
+            if asyncio.iscoroutine(result):
+                await asyncio.wait_for(result, WARMUP_TIMEOUT_SECONDS)
+        except Exception as e:
+            print(f"Warm-up step {name} failed for {root_agent.name}: {e}")
+        timings[name] = round(time.perf_counter() - start, 3)
+
+    if not config.WARMUP_ENABLED:
+        return timings
+
+    await step("preload", preload, root_agent)
+    await step("genai_client", get_genai_client)
+    if root_agent.name == "image_scoring":
+        await step("storage_client", get_storage_client)
+    await step("synthetic_request", run_synthetic_request, root_agent, session_service, artifact_service)
+    if config.CONTEXT_CACHE_ENABLED:
+        await step("context_caches", wait_for_context_caches)
+    model = _first_model(root_agent)
+    if config.WARMUP_MODEL_PING and model:
+        await step("model_ping", asyncio.to_thread, ping_model, model)
+    print(f"Warm-up for {root_agent.name} finished: {timings}")
+    return timings
+
+
+def warm_up(root_agent) -> dict:
+    """Synchronous warm_up_async for init hooks that run outside an event loop."""
+    return asyncio.run(warm_up_async(root_agent))